@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""Fold run deltas from ``data/deltas/`` into the materialized JSON views.
+
+Runs started with ``EMIT_DELTA=1`` (or ``--delta``) only write a small delta
+file: the entries they built, the seen records for those links and any link
+hashes to drop.  This reducer applies every pending delta in file-name
+(creation) order, then writes posts.json, the seen DB, the partitions and
+the archive once.  Applying is idempotent: links already in the seen DB are
+skipped, dropped links stay in the seen DB so they never come back, and the
+ids of applied deltas are recorded in ``data/deltas/applied.json`` only
+after the outputs are written, so an interrupted run can simply be repeated.
+
+Run:
+  python3 autopost/apply_deltas.py
+  python3 autopost/apply_deltas.py --prune            # delete applied deltas
+  python3 autopost/apply_deltas.py --drop https://example.com/story
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import pathlib
+import sys
+from typing import Optional, Sequence
+
+if __package__ in (None, ""):
+    sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+
+from autopost import pull_news
+from autopost.jsonio import atomic_write_text
+from autopost.pull_news import PullNewsConfig, PullNewsResult
+
+APPLIED_STATE_NAME = "applied.json"
+
+
+def _load_applied(delta_dir: pathlib.Path) -> list[str]:
+    path = delta_dir / APPLIED_STATE_NAME
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return []
+    applied = data.get("applied") if isinstance(data, dict) else None
+    return [str(item) for item in applied] if isinstance(applied, list) else []
+
+
+def _write_applied(delta_dir: pathlib.Path, applied: list[str]) -> None:
+    delta_dir.mkdir(parents=True, exist_ok=True)
+    atomic_write_text(
+        delta_dir / APPLIED_STATE_NAME,
+        json.dumps({"applied": applied}, ensure_ascii=False, indent=2),
+    )
+
+
+def pending_deltas(delta_dir: pathlib.Path) -> list[pathlib.Path]:
+    """Return the delta files in ``delta_dir`` that were not applied yet, in order."""
+
+    applied = set(_load_applied(delta_dir))
+    return [
+        path
+        for path in sorted(pathlib.Path(delta_dir).glob("*.json"))
+        if path.name != APPLIED_STATE_NAME and path.stem not in applied
+    ]
+
+
+def apply_deltas(
+    config: Optional[PullNewsConfig] = None,
+    delta_dir: Optional[pathlib.Path] = None,
+) -> PullNewsResult:
+    """Apply all pending deltas in ``delta_dir`` to ``config``'s outputs.
+
+    ``delta_dir`` defaults to ``config.delta_dir``; the limits in ``config``
+    are not re-applied because each run already enforced its own.
+    """
+
+    settings = pull_news._resolve_settings(config or PullNewsConfig())
+    delta_dir = pathlib.Path(delta_dir or settings.delta_dir)
+    paths = pending_deltas(delta_dir)
+    seen, posts_idx = pull_news._prepare_run(settings)
+
+    new_entries: dict[str, dict] = {}
+    dropped: set[str] = set()
+    applied_ids: list[str] = []
+    for path in paths:
+        try:
+            delta = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError) as exc:
+            print(f"[WARN] skipping delta {path.name}: {exc}")
+            continue
+        for record in delta.get("records") or []:
+            entry = record.get("entry") if isinstance(record, dict) else None
+            if not isinstance(entry, dict):
+                continue
+            key = record.get("link_hash") or pull_news.link_hash(entry.get("source") or "")
+            if not key or key in seen:
+                continue
+            entry = pull_news._normalize_post_entry(entry)
+            if entry is None:
+                continue
+            new_entries[key] = entry
+            seen[key] = record.get("seen") or {
+                "title": entry.get("title"),
+                "url": entry.get("source"),
+                "created": entry.get("date"),
+            }
+        for key in delta.get("dropped") or []:
+            if not isinstance(key, str) or not key:
+                continue
+            dropped.add(key)
+            new_entries.pop(key, None)
+            seen.setdefault(key, {"dropped": True})
+        applied_ids.append(path.stem)
+
+    if not applied_ids:
+        print("No pending deltas.")
+        return PullNewsResult(added_count=0, new_entries=[], posts_index=posts_idx)
+
+    added = list(new_entries.values())
+    posts_idx = pull_news._write_run_outputs(
+        settings, added, posts_idx, seen, dropped=frozenset(dropped)
+    )
+    _write_applied(delta_dir, _load_applied(delta_dir) + applied_ids)
+    print(f"Deltas applied: {len(applied_ids)}; new posts: {len(added)}; dropped: {len(dropped)}")
+
+    return PullNewsResult(
+        added_count=len(added),
+        new_entries=added,
+        posts_index=posts_idx,
+    )
+
+
+def prune_applied(delta_dir: pathlib.Path) -> int:
+    """Delete applied delta files and forget their ids; return how many went."""
+
+    delta_dir = pathlib.Path(delta_dir)
+    applied = _load_applied(delta_dir)
+    removed = 0
+    for delta_id in applied:
+        try:
+            (delta_dir / f"{delta_id}.json").unlink()
+            removed += 1
+        except OSError:
+            pass
+    if applied:
+        _write_applied(delta_dir, [])
+    return removed
+
+
+def main(argv: Optional[Sequence[str]] = None) -> PullNewsResult:
+    """CLI entry point that folds the pending deltas of ``DELTA_DIR``."""
+
+    parser = argparse.ArgumentParser(description="Apply run deltas to the published JSON.")
+    parser.add_argument(
+        "--drop",
+        action="append",
+        default=[],
+        metavar="URL",
+        help="record a delta removing this article before applying (repeatable)",
+    )
+    parser.add_argument("--prune", action="store_true", help="delete deltas once applied")
+    args = parser.parse_args(argv)
+
+    config = PullNewsConfig()
+    if args.drop:
+        pull_news.write_delta(
+            config.delta_dir,
+            [],
+            dropped=[pull_news.link_hash(url.strip()) for url in args.drop if url.strip()],
+        )
+    result = apply_deltas(config)
+    if args.prune:
+        prune_applied(pathlib.Path(config.delta_dir))
+    return result
+
+
+if __name__ == "__main__":
+    main()
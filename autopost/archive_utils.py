@@ -3,14 +3,27 @@
 from __future__ import annotations
 
 import datetime
+import gzip
 import hashlib
+import heapq
 import json
+import os
 import pathlib
 import re
-from typing import Callable, Iterable, Mapping
+from typing import Callable, Iterable, Iterator, Mapping, Optional
+
+from autopost.jsonio import atomic_write_text
 
 _MONTH_PATTERN = re.compile(r"^(\d{4}-\d{2})\.json$")
 
+# Cold months are packed into one gzip bundle per year.  Every month is its own
+# gzip member holding JSON Lines, so a reader can seek to ``offset`` and inflate
+# ``length`` bytes without touching the rest of the bundle.  Bundles are named
+# after their content (``<year>-<digest>.jsonl.gz``) and never rewritten in
+# place, so the manifest always points at offsets of the bundle it names.
+COLD_DIRNAME = "cold"
+COLD_MANIFEST_NAME = "index.json"
+
 
 def _utc_timestamp() -> str:
     return datetime.datetime.utcnow().replace(microsecond=0).isoformat() + "Z"
@@ -57,38 +70,354 @@ def _entry_identity(entry: Mapping, normalize_date: Callable[[str], str]) -> str
     return hashlib.sha1(payload.encode("utf-8")).hexdigest()
 
 
-def _sort_entries(entries: list[dict], normalize_date: Callable[[str], str]) -> None:
+def _sort_key_factory(normalize_date: Callable[[str], str]) -> Callable[[Mapping], tuple[str, str]]:
     def _key(item: Mapping) -> tuple[str, str]:
         raw = str(item.get("date") or "").strip()
         normalized = normalize_date(raw) or raw
         secondary = str(item.get("title") or item.get("slug") or "").strip()
         return normalized, secondary
 
-    entries.sort(key=_key, reverse=True)
+    return _key
+
+
+def _sort_entries(entries: list[dict], normalize_date: Callable[[str], str]) -> None:
+    entries.sort(key=_sort_key_factory(normalize_date), reverse=True)
+
+
+def merge_sorted(
+    existing: list,
+    additions: list,
+    key: Callable,
+    *,
+    prefer_existing: bool = False,
+) -> list:
+    """Merge ``additions`` into ``existing`` (both newest first by ``key``).
+
+    ``existing`` is normally already sorted, so ``additions`` are sorted on
+    their own and merged in linearly.  If ``existing`` turns out to be out of
+    order, the combined list is fully sorted instead.  The result is the same
+    as a stable reverse sort of ``additions + existing`` (or of
+    ``existing + additions`` with ``prefer_existing``).
+    """
+
+    existing_keys = [key(item) for item in existing]
+    in_order = all(
+        existing_keys[idx] >= existing_keys[idx + 1]
+        for idx in range(len(existing_keys) - 1)
+    )
+    if not in_order:
+        if prefer_existing:
+            combined = list(existing) + list(additions)
+        else:
+            combined = list(additions) + list(existing)
+        combined.sort(key=key, reverse=True)
+        return combined
+
+    keyed_additions = sorted(
+        ((key(item), item) for item in additions),
+        key=lambda pair: pair[0],
+        reverse=True,
+    )
+    keyed_existing = zip(existing_keys, existing)
+    sources = (keyed_existing, keyed_additions) if prefer_existing else (keyed_additions, keyed_existing)
+    # heapq.merge yields equal keys from earlier sources first.
+    merged = heapq.merge(*sources, key=lambda pair: pair[0], reverse=True)
+    return [item for _, item in merged]
 
 
 def _write_month_file(path: pathlib.Path, entries: list[dict], normalize_date: Callable[[str], str]) -> None:
-    existing = _load_existing(path)
-    combined: list[dict] = []
+    existing: list[dict] = []
     seen: set[str] = set()
+    for item in _load_existing(path):
+        key = _entry_identity(item, normalize_date)
+        if key in seen:
+            continue
+        seen.add(key)
+        existing.append(dict(item))
 
-    for item in existing + entries:
+    additions: list[dict] = []
+    for item in entries:
         if not isinstance(item, Mapping):
             continue
         key = _entry_identity(item, normalize_date)
         if key in seen:
             continue
         seen.add(key)
-        combined.append(dict(item))
+        additions.append(dict(item))
 
-    _sort_entries(combined, normalize_date)
+    combined = merge_sorted(
+        existing,
+        additions,
+        _sort_key_factory(normalize_date),
+        prefer_existing=True,
+    )
     path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(json.dumps(combined, ensure_ascii=False, indent=2), encoding="utf-8")
+    atomic_write_text(path, json.dumps(combined, ensure_ascii=False, indent=2))
+
+
+def _month_ordinal(month_key: str) -> int:
+    year, month = month_key.split("-")
+    return int(year) * 12 + int(month) - 1
+
+
+def _is_cold_month(month_key: str, cold_after_months: int, current_month: str) -> bool:
+    if cold_after_months <= 0:
+        return False
+    return _month_ordinal(current_month) - _month_ordinal(month_key) > cold_after_months
+
+
+def _cold_dir(archive_root: pathlib.Path) -> pathlib.Path:
+    return archive_root / COLD_DIRNAME
+
+
+def _load_cold_manifest(archive_root: pathlib.Path) -> dict[str, dict]:
+    path = _cold_dir(archive_root) / COLD_MANIFEST_NAME
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return {}
+    months = data.get("months") if isinstance(data, Mapping) else None
+    if not isinstance(months, Mapping):
+        return {}
+    return {
+        key: dict(value)
+        for key, value in months.items()
+        if _sanitize_month(key) == key and isinstance(value, Mapping)
+    }
+
+
+def _write_cold_manifest(archive_root: pathlib.Path, months: Mapping[str, Mapping], timestamp: str) -> None:
+    payload = {
+        "generated_at": timestamp,
+        "months": {key: dict(months[key]) for key in sorted(months, reverse=True)},
+    }
+    path = _cold_dir(archive_root) / COLD_MANIFEST_NAME
+    path.parent.mkdir(parents=True, exist_ok=True)
+    atomic_write_text(path, json.dumps(payload, ensure_ascii=False, indent=2))
+
+
+def _read_cold_member(archive_root: pathlib.Path, info: Mapping) -> list[dict]:
+    bundle = archive_root / str(info.get("bundle") or "")
+    try:
+        offset = int(info.get("offset", 0))
+        length = int(info.get("length", 0))
+    except (TypeError, ValueError):
+        return []
+    if length <= 0:
+        return []
+    try:
+        with bundle.open("rb") as handle:
+            handle.seek(offset)
+            compressed = handle.read(length)
+        payload = gzip.decompress(compressed).decode("utf-8")
+    except (OSError, EOFError, UnicodeDecodeError):
+        return []
+
+    entries: list[dict] = []
+    for line in payload.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            item = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        if isinstance(item, Mapping):
+            entries.append(dict(item))
+    return entries
+
+
+def _encode_cold_member(entries: Iterable[Mapping]) -> bytes:
+    lines = "".join(
+        json.dumps(entry, ensure_ascii=False) + "\n" for entry in entries
+    )
+    # ``mtime=0`` keeps bundles byte-for-byte reproducible between runs.
+    return gzip.compress(lines.encode("utf-8"), mtime=0)
+
+
+def _merge_unique(
+    sources: Iterable[Iterable[Mapping]], normalize_date: Callable[[str], str]
+) -> list[dict]:
+    combined: list[dict] = []
+    seen: set[str] = set()
+    for source in sources:
+        for item in source:
+            if not isinstance(item, Mapping):
+                continue
+            key = _entry_identity(item, normalize_date)
+            if key in seen:
+                continue
+            seen.add(key)
+            combined.append(dict(item))
+    _sort_entries(combined, normalize_date)
+    return combined
+
+
+def _skip_date_normalization(value: str) -> str:
+    return ""
+
+
+def list_archive_months(archive_root: pathlib.Path) -> list[str]:
+    """Return every archived month key (newest first) across both tiers."""
+
+    archive_root = pathlib.Path(archive_root)
+    months = set(_load_cold_manifest(archive_root))
+    for path in archive_root.glob("*.json"):
+        match = _MONTH_PATTERN.match(path.name)
+        if match and path.is_file():
+            months.add(match.group(1))
+    return sorted(months, reverse=True)
+
+
+def read_archive_month(
+    archive_root: pathlib.Path,
+    month_key: str,
+    *,
+    normalize_date: Optional[Callable[[str], str]] = None,
+) -> list[dict]:
+    """Return the archived entries for ``month_key`` from the hot and cold tiers.
+
+    A month that was compacted and later received late entries lives in both
+    tiers; the two halves are merged, deduplicated and sorted newest first.
+    """
+
+    archive_root = pathlib.Path(archive_root)
+    sanitized = _sanitize_month(month_key)
+    if not sanitized:
+        return []
+    normalize = normalize_date or _skip_date_normalization
+
+    hot_entries = _load_existing(archive_root / f"{sanitized}.json")
+    cold_info = _load_cold_manifest(archive_root).get(sanitized)
+    if not cold_info:
+        return [dict(item) for item in hot_entries]
+    cold_entries = _read_cold_member(archive_root, cold_info)
+    if not hot_entries:
+        return cold_entries
+    return _merge_unique((hot_entries, cold_entries), normalize)
+
+
+def iter_archive_entries(
+    archive_root: pathlib.Path,
+    *,
+    normalize_date: Optional[Callable[[str], str]] = None,
+) -> Iterator[dict]:
+    """Yield every archived entry, month by month (newest month first)."""
+
+    for month_key in list_archive_months(archive_root):
+        yield from read_archive_month(archive_root, month_key, normalize_date=normalize_date)
+
+
+def _bundle_name(year: str, payload: bytes) -> str:
+    digest = hashlib.sha1(payload).hexdigest()[:12]
+    return f"{COLD_DIRNAME}/{year}-{digest}.jsonl.gz"
+
+
+def _write_bundle(path: pathlib.Path, payload: bytes) -> None:
+    if path.exists():
+        return
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_bytes(payload)
+    os.replace(tmp_path, path)
+
+
+def _remove_unreferenced_bundles(archive_root: pathlib.Path, cold_manifest: Mapping[str, Mapping]) -> None:
+    referenced = {str(info.get("bundle") or "") for info in cold_manifest.values()}
+    for path in _cold_dir(archive_root).glob("*.jsonl.gz*"):
+        if f"{COLD_DIRNAME}/{path.name}" in referenced:
+            continue
+        try:
+            path.unlink()
+        except OSError:
+            pass
+
+
+def compact_archive(
+    archive_root: pathlib.Path,
+    *,
+    cold_after_months: int,
+    normalize_date: Callable[[str], str],
+    current_month: str = "",
+) -> list[str]:
+    """Move hot months older than ``cold_after_months`` into yearly gzip bundles.
+
+    Returns the month keys that were compacted.  Months already in a bundle
+    that received late entries are merged back into their bundle.  A changed
+    year is written to a new bundle; the manifest is then replaced atomically
+    and only afterwards are the bundles it no longer names deleted, so a crash
+    at any point leaves a manifest whose offsets match its bundles.
+    """
+
+    archive_root = pathlib.Path(archive_root)
+    current = _sanitize_month(current_month) or datetime.datetime.utcnow().strftime("%Y-%m")
+    if cold_after_months <= 0 or not archive_root.is_dir():
+        return []
+
+    pending: dict[str, pathlib.Path] = {}
+    for path in archive_root.glob("*.json"):
+        match = _MONTH_PATTERN.match(path.name)
+        if not match or not path.is_file():
+            continue
+        month_key = match.group(1)
+        if _is_cold_month(month_key, cold_after_months, current):
+            pending[month_key] = path
+    if not pending:
+        return []
+
+    cold_manifest = _load_cold_manifest(archive_root)
+    cold_dir = _cold_dir(archive_root)
+    cold_dir.mkdir(parents=True, exist_ok=True)
+
+    years = sorted({month_key[:4] for month_key in pending})
+    for year in years:
+        year_months = sorted(
+            {key for key in cold_manifest if key.startswith(year)}
+            | {key for key in pending if key.startswith(year)},
+            reverse=True,
+        )
+
+        members: list[tuple[str, bytes, int]] = []
+        for month_key in year_months:
+            info = cold_manifest.get(month_key)
+            if month_key not in pending and info:
+                # Untouched month: copy the compressed member verbatim.
+                with (archive_root / str(info["bundle"])).open("rb") as handle:
+                    handle.seek(int(info["offset"]))
+                    raw = handle.read(int(info["length"]))
+                members.append((month_key, raw, int(info.get("count", 0))))
+                continue
+            cold_entries = _read_cold_member(archive_root, info) if info else []
+            hot_entries = _load_existing(pending[month_key])
+            combined = _merge_unique((hot_entries, cold_entries), normalize_date)
+            members.append((month_key, _encode_cold_member(combined), len(combined)))
+
+        payload = b"".join(raw for _, raw, _ in members)
+        bundle_name = _bundle_name(year, payload)
+        _write_bundle(archive_root / bundle_name, payload)
+        offset = 0
+        for month_key, raw, count in members:
+            cold_manifest[month_key] = {
+                "bundle": bundle_name,
+                "offset": offset,
+                "length": len(raw),
+                "count": count,
+            }
+            offset += len(raw)
+
+    timestamp = _utc_timestamp()
+    _write_cold_manifest(archive_root, cold_manifest, timestamp)
+    for path in pending.values():
+        try:
+            path.unlink()
+        except OSError:
+            pass
+    _update_manifest(archive_root, timestamp)
+    _remove_unreferenced_bundles(archive_root, cold_manifest)
+    return sorted(pending, reverse=True)
 
 
 def _update_manifest(directory: pathlib.Path, timestamp: str) -> None:
-    months: list[tuple[str, int]] = []
-    total = 0
+    hot_counts: dict[str, int] = {}
 
     for path in directory.glob("*.json"):
         if not path.is_file():
@@ -99,24 +428,39 @@ def _update_manifest(directory: pathlib.Path, timestamp: str) -> None:
         if not match:
             continue
         month_key = match.group(1)
-        entries = _load_existing(path)
-        months.append((month_key, len(entries)))
-        total += len(entries)
+        hot_counts[month_key] = len(_load_existing(path))
+
+    cold_manifest = _load_cold_manifest(directory)
+    months: list[dict] = []
+    total = 0
+    for month_key in sorted(set(hot_counts) | set(cold_manifest), reverse=True):
+        cold_info = cold_manifest.get(month_key)
+        if cold_info is None:
+            record = {"key": month_key, "count": hot_counts[month_key], "tier": "hot"}
+        else:
+            record = {
+                "key": month_key,
+                "count": int(cold_info.get("count", 0)),
+                "tier": "cold",
+                "bundle": cold_info.get("bundle"),
+                "offset": cold_info.get("offset"),
+                "length": cold_info.get("length"),
+            }
+            if month_key in hot_counts:
+                # Late entries for a compacted month wait in the hot tier until
+                # the next compaction folds them into the bundle.
+                record["tier"] = "mixed"
+                record["count"] = len(read_archive_month(directory, month_key))
+        months.append(record)
+        total += record["count"]
 
-    months.sort(key=lambda item: item[0], reverse=True)
     manifest = {
         "generated_at": timestamp,
-        "months": [
-            {"key": key, "count": count}
-            for key, count in months
-        ],
+        "months": months,
         "total_entries": total,
     }
     manifest_path = directory / "index.json"
-    manifest_path.write_text(
-        json.dumps(manifest, ensure_ascii=False, indent=2),
-        encoding="utf-8",
-    )
+    atomic_write_text(manifest_path, json.dumps(manifest, ensure_ascii=False, indent=2))
 
 
 def append_entries_to_archive(
@@ -125,7 +469,14 @@ def append_entries_to_archive(
     *,
     normalize_date: Callable[[str], str],
     default_month: str,
+    cold_after_months: int = 0,
 ) -> None:
+    """Merge ``entries`` into the hot month files under ``archive_root``.
+
+    When ``cold_after_months`` is positive, hot months older than that many
+    months are afterwards packed into the cold tier (see :func:`compact_archive`).
+    """
+
     sanitized_default = _sanitize_month(default_month)
     if not sanitized_default:
         sanitized_default = datetime.datetime.utcnow().strftime("%Y-%m")
@@ -143,16 +494,28 @@ def append_entries_to_archive(
         archive_entry.setdefault("archived_at", timestamp)
         prepared.setdefault(month_key, []).append(archive_entry)
 
-    if not prepared:
-        return
+    if prepared:
+        archive_root.mkdir(parents=True, exist_ok=True)
 
-    archive_root.mkdir(parents=True, exist_ok=True)
+        for month_key, month_entries in prepared.items():
+            month_path = archive_root / f"{month_key}.json"
+            _write_month_file(month_path, month_entries, normalize_date)
 
-    for month_key, month_entries in prepared.items():
-        month_path = archive_root / f"{month_key}.json"
-        _write_month_file(month_path, month_entries, normalize_date)
+        _update_manifest(archive_root, timestamp)
 
-    _update_manifest(archive_root, timestamp)
+    if cold_after_months > 0:
+        compact_archive(
+            archive_root,
+            cold_after_months=cold_after_months,
+            normalize_date=normalize_date,
+        )
 
 
-__all__ = ["append_entries_to_archive"]
+__all__ = [
+    "append_entries_to_archive",
+    "compact_archive",
+    "iter_archive_entries",
+    "list_archive_months",
+    "merge_sorted",
+    "read_archive_month",
+]
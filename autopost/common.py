@@ -5,18 +5,25 @@
 import os
 import re
 import datetime
+import functools
 import urllib.request
 import urllib.error
 import socket
+import time
 from html import unescape, escape
 from html.parser import HTMLParser
 from typing import List, Optional, Tuple
 from urllib.parse import urljoin
-from urllib.parse import urlparse, parse_qsl, urlencode, urlunparse
+from urllib.parse import urlparse
 from xml.etree import ElementTree as ET
 
+from autopost.cover_urls import SIZE_RULES, rewrite_cover_url
+
 HTTP_TIMEOUT = int(os.getenv("HTTP_TIMEOUT", "18"))
 UA = os.getenv("AP_USER_AGENT", "Mozilla/5.0 (AventurOO Autoposter)")
+# trafilatura's MIN_FILE_SIZE / MAX_FILE_SIZE defaults.
+TRAFILATURA_MIN_BYTES = 10
+TRAFILATURA_MAX_BYTES = 20_000_000
 
 IMG_ALLOWED_ATTRS = {
     "src",
@@ -90,27 +97,79 @@ def _sanitize_img_tag(match: re.Match) -> str:
     closing = " />" if parser.self_closing or raw.rstrip().endswith("/>") else ">"
     return f"<img{attr_str}{closing}"
 
-try:
-    import trafilatura
-except Exception:
-    trafilatura = None
+@functools.lru_cache(maxsize=None)
+def _load_trafilatura():
+    """Import trafilatura on first use; it drags in lxml, justext, courlan, ..."""
+
+    try:
+        import trafilatura
+    except Exception:
+        return None
+    return trafilatura
 
-try:
-    from readability import Document
-except Exception:
-    Document = None
 
+@functools.lru_cache(maxsize=None)
+def _load_readability_document():
+    """Import readability's ``Document`` on first use."""
+
+    try:
+        from readability import Document
+    except Exception:
+        return None
+    return Document
+
+
+def __getattr__(name: str):
+    # Keep ``from autopost.common import trafilatura`` working without paying
+    # for the import when the module itself is loaded.
+    if name == "trafilatura":
+        return _load_trafilatura()
+    if name == "Document":
+        return _load_readability_document()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def http_get_page(url: str) -> Tuple[str, str]:
+    """Return the decoded page at ``url`` and the URL it redirected to."""
 
-def http_get(url: str) -> str:
     req = urllib.request.Request(url, headers={"User-Agent": UA})
     with urllib.request.urlopen(req, timeout=HTTP_TIMEOUT) as r:
         raw = r.read()
+        final_url = r.geturl() or url
     for enc in ("utf-8", "utf-16", "iso-8859-1"):
         try:
-            return raw.decode(enc)
+            return raw.decode(enc), final_url
         except Exception:
             continue
-    return raw.decode("utf-8", "ignore")
+    return raw.decode("utf-8", "ignore"), final_url
+
+
+def http_get(url: str) -> str:
+    return http_get_page(url)[0]
+
+
+_CANONICAL_TAG_RE = re.compile(r"<link\b[^>]*\brel=[\"']?canonical\b[^>]*>", re.I)
+_HREF_RE = re.compile(r"\bhref=(?:\"([^\"]*)\"|'([^']*)'|([^\s>]+))", re.I)
+
+
+def canonical_url(html: str, base_url: str = "") -> str:
+    """Return the absolute ``<link rel="canonical">`` URL of ``html`` (or "")."""
+
+    head = (html or "")[:200_000]
+    end = head.lower().find("</head>")
+    if end != -1:
+        head = head[:end]
+    tag = _CANONICAL_TAG_RE.search(head)
+    if not tag:
+        return ""
+    href = _HREF_RE.search(tag.group(0))
+    if not href:
+        return ""
+    value = unescape(next(group for group in href.groups() if group is not None)).strip()
+    if not value:
+        return ""
+    value = urljoin(base_url, value) if base_url else value
+    return value if urlparse(value).scheme in ("http", "https") else ""
 
 
 def fetch_bytes(url: str) -> bytes:
@@ -241,58 +300,7 @@ def find_cover_from_item(it_elem, page_url: str = "") -> str:
             return 0
 
     def _upgrade_size_in_url(url: str) -> str:
-        url = (url or "").strip()
-        if not url:
-            return url
-        try:
-            parsed = urlparse(url)
-        except Exception:
-            return url
-
-        # Upgrade common size query params (?width=240 → ?width=1200)
-        query_changed = False
-        if parsed.query:
-            params = parse_qsl(parsed.query, keep_blank_values=True)
-            new_params = []
-            for k, v in params:
-                lv = str(v)
-                key = (k or "").lower()
-                if key in {"width", "w"} and lv.isdigit():
-                    num = int(lv)
-                    if num and num < TARGET_WIDTH:
-                        v = str(TARGET_WIDTH)
-                        query_changed = True
-                new_params.append((k, v))
-            if query_changed:
-                parsed = parsed._replace(query=urlencode(new_params, doseq=True))
-
-        # Upgrade path segments like /240/ when they likely encode size.
-        path = parsed.path or ""
-        segments = path.split("/")
-        path_changed = False
-        size_keywords = {"img", "image", "images", "thumb", "thumbnail", "resize", "resized", "size", "sizes", "width", "w", "crop"}
-        for idx, seg in enumerate(segments):
-            if not re.fullmatch(r"\d{2,4}", seg):
-                continue
-            value = int(seg)
-            if value >= TARGET_WIDTH or value == 0:
-                continue
-            prev_seg = segments[idx - 1].lower() if idx > 0 else ""
-            next_seg = segments[idx + 1].lower() if idx + 1 < len(segments) else ""
-            looks_like_size = False
-            if any(key in prev_seg for key in size_keywords) or any(key in next_seg for key in size_keywords):
-                looks_like_size = True
-            if re.search(r"\.(jpe?g|png|gif|webp|avif)", next_seg):
-                looks_like_size = True
-            if looks_like_size:
-                segments[idx] = str(TARGET_WIDTH)
-                path_changed = True
-        if path_changed:
-            parsed = parsed._replace(path="/".join(segments))
-
-        if not (query_changed or path_changed):
-            return url
-        return urlunparse(parsed)
+        return rewrite_cover_url((url or "").strip(), TARGET_WIDTH, SIZE_RULES)
 
     def _score_candidate(width: int, height: int, fallback: int = 0) -> int:
         if width and height:
@@ -392,45 +400,99 @@ def sanitize_article_html(html: str) -> str:
     html = re.sub(r"(?is)<img\b[^>]*>", _sanitize_img_tag, html)
     return html.strip()
 
-def extract_body_html(url: str) -> tuple[str, str]:
+def _trafilatura_download(trafilatura, url: str) -> Tuple[Optional[str], str]:
+    fetch_response = getattr(trafilatura, "fetch_response", None)
+    if fetch_response is None:  # trafilatura < 1.7 does not expose the final URL
+        return trafilatura.fetch_url(url), url
+    response = fetch_response(url, decode=True)
+    # Accept what fetch_url would: a 200 within trafilatura's default size limits.
+    if not response or getattr(response, "status", None) != 200:
+        return None, url
+    html = getattr(response, "html", None)
+    data = getattr(response, "data", None)
+    size = len(data) if data is not None else len((html or "").encode("utf-8", "replace"))
+    if not TRAFILATURA_MIN_BYTES <= size <= TRAFILATURA_MAX_BYTES:
+        return None, url
+    return html, getattr(response, "url", None) or url
+
+
+def _first_image(html: str) -> str:
+    m = re.search(r'<img[^>]+src=["\'](http[^"\']+)["\']', html, flags=re.I)
+    return m.group(1) if m else ""
+
+
+def extract_article_html(page_html: str) -> tuple[str, str]:
+    """Return the article body HTML of a downloaded page and its first image.
+
+    Tries trafilatura, then readability, then the page's plain text.
+    """
+
     body_html = ""
     first_img = ""
+    if not page_html:
+        return "", ""
+    trafilatura = _load_trafilatura()
+    Document = _load_readability_document()
     if trafilatura is not None:
         try:
-            downloaded = trafilatura.fetch_url(url)
-            if downloaded:
-                th = trafilatura.extract(
-                    downloaded,
-                    output_format="html",
-                    include_images=True,
-                    include_links=True,
-                    include_formatting=True,
-                )
-                if th:
-                    body_html = th
-                    m = re.search(r'<img[^>]+src=["\'](http[^"\']+)["\']', th, flags=re.I)
-                    if m:
-                        first_img = m.group(1)
+            th = trafilatura.extract(
+                page_html,
+                output_format="html",
+                include_images=True,
+                include_links=True,
+                include_formatting=True,
+            )
+            if th:
+                body_html = th
+                first_img = _first_image(th)
         except Exception as e:
             print("trafilatura error:", e)
     if not body_html and Document is not None:
         try:
-            raw = http_get(url)
-            doc = Document(raw)
-            body_html = doc.summary(html_partial=True)
+            body_html = Document(page_html).summary(html_partial=True)
             if body_html and not first_img:
-                m = re.search(r'<img[^>]+src=["\'](http[^"\']+)["\']', body_html, flags=re.I)
-                if m:
-                    first_img = m.group(1)
+                first_img = _first_image(body_html)
         except Exception as e:
             print("readability error:", e)
     if not body_html:
+        body_html = f"<p>{strip_text(page_html)}</p>"
+    return body_html, first_img
+
+
+def extract_body_html(url: str, meta: Optional[dict] = None) -> tuple[str, str]:
+    """Download ``url`` and return its article body HTML and first image.
+
+    When ``meta`` is given it receives ``final_url`` (after redirects) and
+    ``canonical_url`` (the page's ``<link rel="canonical">``, or "") from the
+    page that was downloaded anyway, the page size in ``bytes`` and the
+    ``(wall, cpu)`` seconds of the download and the extraction in
+    ``timings``.
+    """
+
+    started = (time.perf_counter(), time.process_time())
+    page_html, final_url = "", url
+    trafilatura = _load_trafilatura()
+    if trafilatura is not None:
+        try:
+            downloaded, final_url = _trafilatura_download(trafilatura, url)
+            page_html = downloaded or ""
+        except Exception as e:
+            print("trafilatura error:", e)
+    if not page_html:
         try:
-            raw = http_get(url)
-            txt = strip_text(raw)
-            return f"<p>{txt}</p>", ""
+            page_html, final_url = http_get_page(url)
         except Exception:
             return "", ""
+    fetched = (time.perf_counter(), time.process_time())
+    body_html, first_img = extract_article_html(page_html)
+    if meta is not None:
+        meta["final_url"] = final_url
+        meta["canonical_url"] = canonical_url(page_html, final_url)
+        meta["bytes"] = len(page_html.encode("utf-8", "replace"))
+        meta["timings"] = {
+            "article_fetch": (fetched[0] - started[0], fetched[1] - started[1]),
+            "extraction": (time.perf_counter() - fetched[0], time.process_time() - fetched[1]),
+        }
     return body_html, first_img
 
 
@@ -0,0 +1,214 @@
+"""Rule-table driven upgrades of cover image URLs to a larger rendition.
+
+Feeds usually point at a thumbnail.  Each :class:`CoverRule` describes, for
+the hosts it covers (all hosts when ``hosts`` is empty), how a CDN encodes
+the image size and how to ask for ``target`` pixels instead:
+
+* ``query_raise`` - query keys whose first number is raised to ``target``;
+* ``query_require`` - query keys set to at least ``target`` even if absent;
+* ``query_defaults`` - query parameters added when missing;
+* ``path_strip`` - regex removed from the path to reach the original image
+  (e.g. WordPress' ``-300x200`` suffix or a sized Cloudinary transformation);
+* ``path_keywords`` - numeric path segments next to one of these words (or
+  before the file name) are treated as a width, date paths excepted.
+
+:func:`rewrite_cover_url` parses the URL once, applies every matching rule
+in table order and rebuilds it once; results are memoized.  Supporting a new
+CDN means adding a rule to :data:`DEFAULT_RULES`.
+"""
+
+from __future__ import annotations
+
+import functools
+import re
+from dataclasses import dataclass
+from typing import Optional
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
+
+_NUMERIC_SEGMENT_RE = re.compile(r"\d{2,4}")
+_YEAR_RE = re.compile(r"\d{4}")
+_MONTH_RE = re.compile(r"\d{2}")
+_IMAGE_NAME_RE = re.compile(r"\.(?:jpe?g|png|gif|webp|avif)(?:\?.*)?$")
+_FIRST_NUMBER_RE = re.compile(r"\d+")
+
+
+@dataclass(frozen=True)
+class CoverRule:
+    """How one family of image hosts encodes the rendition size."""
+
+    name: str
+    hosts: tuple[str, ...] = ()
+    query_raise: tuple[str, ...] = ()
+    query_require: tuple[str, ...] = ()
+    query_defaults: tuple[tuple[str, str], ...] = ()
+    path_strip: str = ""
+    path_keywords: frozenset = frozenset()
+
+    def matches(self, netloc: str) -> bool:
+        return not self.hosts or any(host in netloc for host in self.hosts)
+
+
+GUARDIAN = CoverRule(
+    "guardian",
+    hosts=("i.guim.co.uk",),
+    query_require=("width",),
+    query_defaults=(("quality", "85"), ("auto", "format"), ("fit", "max")),
+)
+# Drop the transformation that sizes the image (c_fill,w_400,h_300/...).
+CLOUDINARY = CoverRule(
+    "cloudinary",
+    hosts=("res.cloudinary.com",),
+    path_strip=r"(?<=/upload/)[^/]*\b[wh]_\d+[^/]*/",
+)
+SHOPIFY = CoverRule(
+    "shopify",
+    hosts=("cdn.shopify.com",),
+    path_strip=r"(?i)_\d{2,4}x\d{0,4}(?=(?:@\dx)?\.[a-z]{3,4}$)",
+)
+# WordPress' -{w}x{h} rendition suffix; used on many non-WordPress CDNs too.
+WORDPRESS = CoverRule(
+    "wordpress",
+    path_strip=r"(?i)-\d{2,4}x\d{2,4}(?=\.[a-z]{3,4}$)",
+)
+GENERIC_PATH = CoverRule(
+    "generic-path",
+    path_keywords=frozenset({
+        "img", "image", "images", "media", "thumb", "thumbnail", "resize", "resized",
+        "size", "sizes", "standard", "width", "w", "crop", "quality",
+    }),
+)
+GENERIC_QUERY = CoverRule(
+    "generic-query",
+    query_raise=("w", "width", "maxwidth", "px", "sz", "s"),
+)
+
+DEFAULT_RULES: tuple[CoverRule, ...] = (
+    GUARDIAN,
+    CLOUDINARY,
+    SHOPIFY,
+    WORDPRESS,
+    GENERIC_PATH,
+    GENERIC_QUERY,
+)
+# Size upgrades only, for callers that keep the URL otherwise untouched.
+SIZE_RULES: tuple[CoverRule, ...] = (GENERIC_PATH, GENERIC_QUERY)
+
+MEMO_SIZE = 4096
+
+
+def _is_date_segment(segments: list[str], idx: int, value: int) -> bool:
+    prev_raw = segments[idx - 1] if idx > 0 else ""
+    if _YEAR_RE.fullmatch(prev_raw) and 1900 <= int(prev_raw) <= 2100 and 1 <= value <= 12:
+        return True
+    prev_prev = segments[idx - 2] if idx > 1 else ""
+    return bool(
+        _MONTH_RE.fullmatch(prev_raw)
+        and _YEAR_RE.fullmatch(prev_prev)
+        and 1900 <= int(prev_prev) <= 2100
+        and 1 <= int(prev_raw) <= 12
+        and 1 <= value <= 31
+    )
+
+
+def _raise_path_segments(path: str, keywords: frozenset, target: int) -> str:
+    segments = path.split("/")
+    changed = False
+    for idx, seg in enumerate(segments):
+        if not _NUMERIC_SEGMENT_RE.fullmatch(seg or ""):
+            continue
+        value = int(seg)
+        if value >= target or value == 0 or _is_date_segment(segments, idx, value):
+            continue
+        prev_seg = (segments[idx - 1] if idx > 0 else "").lower()
+        next_seg = (segments[idx + 1] if idx + 1 < len(segments) else "").lower()
+        next_next = (segments[idx + 2] if idx + 2 < len(segments) else "").lower()
+        if (
+            any(key in prev_seg for key in keywords)
+            or any(key in next_seg for key in keywords)
+            or _IMAGE_NAME_RE.search(next_seg)
+            or _IMAGE_NAME_RE.search(next_next)
+        ):
+            segments[idx] = str(target)
+            changed = True
+    return "/".join(segments) if changed else path
+
+
+class _ParsedCover:
+    """One parse of a URL that the rules edit in place."""
+
+    def __init__(self, url: str):
+        self.parsed = urlparse(url)
+        self.path = self.parsed.path or ""
+        self._query: Optional[dict[str, str]] = None
+        self.query_changed = False
+
+    @property
+    def query(self) -> dict[str, str]:
+        if self._query is None:
+            self._query = dict(parse_qsl(self.parsed.query, keep_blank_values=True))
+        return self._query
+
+    def apply(self, rule: CoverRule, target: int) -> None:
+        if rule.query_require:
+            query = dict(self.query)
+            try:
+                for key in rule.query_require:
+                    query[key] = str(max(int(query.get(key, "0") or 0), target))
+            except ValueError:
+                return  # leave hosts with unexpected size values alone
+            for key, value in rule.query_defaults:
+                query.setdefault(key, value)
+            self._query = query
+            self.query_changed = True
+        elif rule.query_defaults:
+            for key, value in rule.query_defaults:
+                if key not in self.query:
+                    self.query[key] = value
+                    self.query_changed = True
+        if rule.path_strip:
+            self.path = re.sub(rule.path_strip, "", self.path, count=1)
+        if rule.path_keywords and self.path:
+            self.path = _raise_path_segments(self.path, rule.path_keywords, target)
+        for key in rule.query_raise:
+            if key in self.query:
+                value = str(self.query[key])
+                match = _FIRST_NUMBER_RE.search(value)
+                if match and int(match.group(0)) >= target:
+                    continue
+                if match:
+                    start, end = match.span()
+                    self.query[key] = f"{value[:start]}{target}{value[end:]}"
+                else:
+                    self.query[key] = str(target)
+                self.query_changed = True
+
+    def geturl(self, original: str) -> str:
+        if not self.query_changed and self.path == (self.parsed.path or ""):
+            return original
+        query = urlencode(self.query) if self.query_changed else self.parsed.query
+        return urlunparse(self.parsed._replace(path=self.path, query=query))
+
+
+@functools.lru_cache(maxsize=MEMO_SIZE)
+def rewrite_cover_url(url: str, target: int, rules: tuple[CoverRule, ...] = DEFAULT_RULES) -> str:
+    """Return ``url`` with every matching rule applied for a ``target`` width."""
+
+    if not url:
+        return url
+    try:
+        cover = _ParsedCover(url)
+    except ValueError:
+        return url
+    netloc = cover.parsed.netloc
+    for rule in rules:
+        if rule.matches(netloc):
+            cover.apply(rule, target)
+    return cover.geturl(url)
+
+
+__all__ = [
+    "CoverRule",
+    "DEFAULT_RULES",
+    "SIZE_RULES",
+    "rewrite_cover_url",
+]
@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""Long-running autoposter that polls each feed on its own schedule.
+
+Cron runs start cold and poll every feed on the same cadence.  The daemon
+keeps the seen DB, the posts index, the taxonomy and the extraction caches
+in memory and gives every feed a next-due time.  After each poll the feed's
+publish rate (new items per second, smoothed) is updated and the next
+interval is chosen so that roughly one new item is waiting, clamped to
+``DAEMON_MIN_INTERVAL``..``DAEMON_MAX_INTERVAL`` seconds; feeds that stay
+quiet back off exponentially, as do feeds whose poll raised an error.
+New entries are buffered and flushed to posts.json, partitions, archive and
+the seen DB every ``DAEMON_FLUSH_INTERVAL`` seconds.  The per-category,
+per-feed and total limits apply per ``DAEMON_QUOTA_WINDOW`` seconds (three
+hours, the cadence of the cron runs the daemon replaces), not per flush; the
+window survives restarts.  The near-duplicate index is rebuilt from the last
+``NEAR_DUP_DAYS`` days on every flush.
+
+Run:
+  python3 autopost/daemon.py
+  FEEDS_FILE=autopost/feeds_crypto.txt CATEGORY=Crypto python3 autopost/daemon.py
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import pathlib
+import sys
+import time
+from dataclasses import asdict, dataclass
+from typing import Callable, Optional, Sequence
+
+if __package__ in (None, ""):
+    sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+
+from autopost import pull_news
+from autopost.jsonio import atomic_write_text
+from autopost.pull_news import FeedSpec, PullNewsConfig
+
+MIN_INTERVAL = pull_news._env_int("DAEMON_MIN_INTERVAL", 600)
+MAX_INTERVAL = pull_news._env_int("DAEMON_MAX_INTERVAL", 6 * 3600)
+FLUSH_INTERVAL = pull_news._env_int("DAEMON_FLUSH_INTERVAL", 900)
+QUOTA_WINDOW = pull_news._env_int("DAEMON_QUOTA_WINDOW", 3 * 3600)
+SCHEDULE_FILENAME = "daemon_schedule.json"
+# Weight of the latest poll in the smoothed publish rate.
+RATE_SMOOTHING = 0.5
+
+
+@dataclass
+class FeedState:
+    """Polling state of one feed URL."""
+
+    url: str
+    interval: float
+    next_due: float = 0.0
+    last_polled: float = 0.0
+    rate: float = 0.0
+    links: tuple[str, ...] = ()
+
+
+def next_interval(state: FeedState, new_items: int, elapsed: float, min_interval: float, max_interval: float) -> float:
+    """Update ``state.rate`` from one poll and return the next polling interval."""
+
+    if elapsed <= 0:  # first poll: nothing to compare against yet
+        return max(min_interval, min(max_interval, state.interval))
+    observed = new_items / elapsed
+    state.rate = observed if not state.rate else (
+        RATE_SMOOTHING * observed + (1 - RATE_SMOOTHING) * state.rate
+    )
+    if new_items == 0:
+        interval = state.interval * 2
+    elif state.rate > 0:
+        interval = 1.0 / state.rate
+    else:
+        interval = state.interval
+    return max(min_interval, min(max_interval, interval))
+
+
+class AutopostDaemon:
+    """Scheduler plus warm run state around the ``run_pull_news`` machinery."""
+
+    def __init__(
+        self,
+        config: Optional[PullNewsConfig] = None,
+        *,
+        min_interval: float = MIN_INTERVAL,
+        max_interval: float = MAX_INTERVAL,
+        flush_interval: float = FLUSH_INTERVAL,
+        quota_window: float = QUOTA_WINDOW,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.settings = pull_news._resolve_settings(config or PullNewsConfig())
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.flush_interval = flush_interval
+        self.quota_window = quota_window
+        self.clock = clock
+        self.schedule_path = self.settings.data_dir / SCHEDULE_FILENAME
+
+        self.seen, self.posts_idx = pull_news._prepare_run(self.settings)
+        self.pending: list[dict] = []
+        self.quota = pull_news._Quota.from_settings(self.settings)
+        self.quota_started = clock()
+        self.prefilter = None
+        if self.settings.prefilter:
+            self.prefilter = pull_news.Prefilter.for_feeds(self.settings.feeds_file, self.settings.prefilter_rules)
+        self.negative = pull_news._negative_cache_for(self.settings, "daemon")
+        self.near_dups = pull_news._near_dup_index_for(self.settings, self.posts_idx, self.seen)
+        self.urls = pull_news._url_cache_for(self.settings, "daemon")
+        self.covers = pull_news._image_prober_for(self.settings, "daemon")
+        self.last_flush = clock()
+        self.specs: dict[str, FeedSpec] = {}
+        self.states: dict[str, FeedState] = self._load_schedule()
+        self._feeds_mtime: Optional[int] = None
+        self.reload_feeds()
+
+    def _load_schedule(self) -> dict[str, FeedState]:
+        try:
+            raw = json.loads(self.schedule_path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return {}
+        quota = raw.get("quota") if isinstance(raw, dict) else None
+        if isinstance(quota, dict):
+            try:
+                self.quota_started = float(quota["started"])
+                self.quota.per_cat = {str(k): int(v) for k, v in (quota.get("per_cat") or {}).items()}
+                self.quota.per_feed = {str(k): int(v) for k, v in (quota.get("per_feed") or {}).items()}
+                self.quota.added_total = int(quota.get("added_total") or 0)
+            except (KeyError, TypeError, ValueError, AttributeError):
+                self.quota = pull_news._Quota.from_settings(self.settings)
+        states = {}
+        for url, data in (raw.get("feeds") or {}).items() if isinstance(raw, dict) else ():
+            try:
+                states[url] = FeedState(
+                    url=url,
+                    interval=float(data["interval"]),
+                    next_due=float(data.get("next_due", 0.0)),
+                    last_polled=float(data.get("last_polled", 0.0)),
+                    rate=float(data.get("rate", 0.0)),
+                    links=tuple(data.get("links") or ()),
+                )
+            except (KeyError, TypeError, ValueError):
+                continue
+        return states
+
+    def _save_schedule(self) -> None:
+        feeds = {}
+        for url, state in self.states.items():
+            data = asdict(state)
+            data.pop("url")
+            data["links"] = list(state.links)
+            feeds[url] = data
+        quota = {
+            "started": self.quota_started,
+            "per_cat": self.quota.per_cat,
+            "per_feed": self.quota.per_feed,
+            "added_total": self.quota.added_total,
+        }
+        atomic_write_text(
+            self.schedule_path,
+            json.dumps({"feeds": feeds, "quota": quota}, indent=2, sort_keys=True),
+        )
+
+    def reload_feeds(self) -> None:
+        """Re-read the feeds file when it changed; new feeds are due at once."""
+
+        try:
+            mtime = self.settings.feeds_file.stat().st_mtime_ns
+        except OSError:
+            print("ERROR: feeds file not found:", self.settings.feeds_file)
+            return
+        if mtime == self._feeds_mtime:
+            return
+        self._feeds_mtime = mtime
+        specs = pull_news.load_feed_specs(self.settings.feeds_file, self.settings.category_filter)
+        self.specs = {}
+        for spec in specs:
+            self.specs.setdefault(spec.url, spec)
+            self.states.setdefault(spec.url, FeedState(url=spec.url, interval=self.min_interval))
+        for url in list(self.states):
+            if url not in self.specs:
+                del self.states[url]
+
+    def due_feeds(self, now: float) -> list[FeedState]:
+        return sorted(
+            (state for state in self.states.values() if state.next_due <= now),
+            key=lambda state: (state.next_due, state.url),
+        )
+
+    def poll(self, state: FeedState, now: float) -> int:
+        """Fetch one feed, collect its new entries and reschedule it.
+
+        An error while polling is logged and the feed backs off as if it had
+        been quiet; entries completed before the error are kept.
+        """
+
+        spec = self.specs[state.url]
+        added_before = len(self.pending)
+        try:
+            items = pull_news.fetch_feed_items(spec) or []
+            links = tuple(
+                pull_news.link_hash((it.get("link") or "").strip())
+                for it in items
+                if (it.get("link") or "").strip()
+            )
+            previous = set(state.links)
+            new_items = sum(1 for key in links if key not in previous) if state.last_polled else 0
+            elapsed = now - state.last_polled if state.last_polled else 0.0
+
+            if items:
+                pull_news.collect_feed_entries(
+                    spec,
+                    items,
+                    seen=self.seen,
+                    quota=self.quota,
+                    target_words=self.settings.target_words,
+                    new_entries=self.pending,
+                    prefilter=self.prefilter,
+                    negative=self.negative,
+                    near_dups=self.near_dups,
+                    urls=self.urls,
+                    covers=self.covers,
+                )
+        except Exception as exc:
+            print(f"[ERROR] polling {state.url} failed: {exc!r}")
+            state.interval = max(self.min_interval, min(self.max_interval, state.interval * 2))
+            state.next_due = now + state.interval
+            return len(self.pending) - added_before
+
+        state.interval = next_interval(state, new_items, elapsed, self.min_interval, self.max_interval)
+        state.links = links
+        state.last_polled = now
+        state.next_due = now + state.interval
+        return len(self.pending) - added_before
+
+    def flush(self) -> int:
+        """Write buffered entries and the schedule; return how many were written."""
+
+        written = len(self.pending)
+        if self.pending:
+            self.posts_idx = pull_news._write_run_outputs(
+                self.settings, self.pending, self.posts_idx, self.seen
+            )
+            print(f"[FLUSH] {written} new posts")
+            self.near_dups = pull_news._near_dup_index_for(self.settings, self.posts_idx, self.seen)
+        self.pending = []
+        self.last_flush = self.clock()
+        self._save_schedule()
+        if self.negative is not None:
+            self.negative.save()
+        if self.urls is not None:
+            self.urls.save(self.seen)
+        if self.covers is not None:
+            self.covers.save()
+        return written
+
+    def tick(self) -> float:
+        """Poll every due feed, flush if the batch is due; return seconds to sleep."""
+
+        now = self.clock()
+        if now - self.quota_started >= self.quota_window:
+            self.quota = pull_news._Quota.from_settings(self.settings)
+            self.quota_started = now
+        for state in self.due_feeds(now):
+            self.poll(state, now)
+        now = self.clock()
+        if now - self.last_flush >= self.flush_interval:
+            self.flush()
+            pull_news.refresh_taxonomy()
+            self.reload_feeds()
+        next_feed = min((state.next_due for state in self.states.values()), default=now + self.max_interval)
+        next_flush = self.last_flush + self.flush_interval
+        return max(0.0, min(next_feed, next_flush) - now)
+
+    def run_forever(self, sleep: Callable[[float], None] = time.sleep, max_ticks: Optional[int] = None) -> None:
+        ticks = 0
+        try:
+            while max_ticks is None or ticks < max_ticks:
+                sleep(self.tick())
+                ticks += 1
+        finally:
+            self.flush()
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    """CLI entry point that uses environment driven defaults."""
+
+    parser = argparse.ArgumentParser(description="Run the autoposter as a long-lived daemon.")
+    parser.add_argument("--min-interval", type=float, default=MIN_INTERVAL)
+    parser.add_argument("--max-interval", type=float, default=MAX_INTERVAL)
+    parser.add_argument("--flush-interval", type=float, default=FLUSH_INTERVAL)
+    parser.add_argument("--quota-window", type=float, default=QUOTA_WINDOW)
+    args = parser.parse_args(argv)
+
+    daemon = AutopostDaemon(
+        min_interval=args.min_interval,
+        max_interval=args.max_interval,
+        flush_interval=args.flush_interval,
+        quota_window=args.quota_window,
+    )
+    try:
+        daemon.run_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
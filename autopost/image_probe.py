@@ -0,0 +1,242 @@
+"""Read real image dimensions from the first bytes of candidate cover URLs.
+
+Feeds rarely give width/height for their media, and the URL rewrites in
+:func:`autopost.pull_news.sanitize_img_url` (WordPress size suffixes, width
+path segments and query parameters) are guesses that can point at a missing
+file.  :class:`ImageProber` fetches only the first ``range_bytes`` of each
+URL with an HTTP ``Range`` request, reads the dimensions from the PNG, GIF,
+JPEG or WebP header, and remembers the outcome per URL::
+
+    {"https://example.com/a.jpg": {"ok": true, "width": 1600, "height": 900,
+                                   "format": "jpeg", "checked": 1717000000.0}}
+
+A URL that answered with an error is cached with ``"ok": false``.  Network
+failures (timeouts, DNS) are not cached, so they are retried next run.
+"""
+
+from __future__ import annotations
+
+import json
+import pathlib
+import struct
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Iterable, Optional
+
+from autopost.common import UA
+from autopost.jsonio import atomic_write_text
+
+RANGE_BYTES = 32 * 1024
+PROBE_TIMEOUT = 6
+MAX_WORKERS = 8
+# Re-check cached results after this long.
+CACHE_TTL = 30 * 24 * 3600
+
+
+@dataclass(frozen=True)
+class ProbeResult:
+    """Outcome of probing one URL; ``width``/``height`` are 0 when unknown."""
+
+    ok: bool
+    width: int = 0
+    height: int = 0
+    format: str = ""
+
+    @property
+    def area(self) -> int:
+        return self.width * self.height
+
+
+class ProbeError(Exception):
+    """The URL could not be reached; the outcome is not cached."""
+
+
+def _jpeg_size(data: bytes) -> Optional[tuple[int, int]]:
+    pos = 2
+    while pos + 4 <= len(data):
+        if data[pos] != 0xFF:
+            pos += 1
+            continue
+        marker = data[pos + 1]
+        if marker == 0xFF:  # fill byte
+            pos += 1
+            continue
+        if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7:  # no length field
+            pos += 2
+            continue
+        (length,) = struct.unpack(">H", data[pos + 2:pos + 4])
+        # SOF0..SOF15 except DHT (C4), JPG (C8) and DAC (CC) carry the size.
+        if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+            if pos + 9 > len(data):
+                return None
+            height, width = struct.unpack(">HH", data[pos + 5:pos + 9])
+            return width, height
+        pos += 2 + length
+    return None
+
+
+def image_size(data: bytes) -> Optional[tuple[int, int, str]]:
+    """Return ``(width, height, format)`` from an image header, or ``None``."""
+
+    if data.startswith(b"\x89PNG\r\n\x1a\n") and len(data) >= 24 and data[12:16] == b"IHDR":
+        width, height = struct.unpack(">II", data[16:24])
+        return width, height, "png"
+    if data[:6] in (b"GIF87a", b"GIF89a") and len(data) >= 10:
+        width, height = struct.unpack("<HH", data[6:10])
+        return width, height, "gif"
+    if data.startswith(b"\xff\xd8"):
+        size = _jpeg_size(data)
+        return (size[0], size[1], "jpeg") if size else None
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP" and len(data) >= 30:
+        chunk = data[12:16]
+        if chunk == b"VP8 " and data[23:26] == b"\x9d\x01\x2a":
+            width, height = struct.unpack("<HH", data[26:30])
+            return width & 0x3FFF, height & 0x3FFF, "webp"
+        if chunk == b"VP8L" and data[20] == 0x2F:
+            bits = int.from_bytes(data[21:25], "little")
+            return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1, "webp"
+        if chunk == b"VP8X":
+            width = int.from_bytes(data[24:27], "little") + 1
+            height = int.from_bytes(data[27:30], "little") + 1
+            return width, height, "webp"
+    return None
+
+
+def fetch_head(url: str, range_bytes: int = RANGE_BYTES, timeout: float = PROBE_TIMEOUT) -> Optional[bytes]:
+    """Return the first ``range_bytes`` of ``url``; ``None`` on an HTTP error.
+
+    Raises :class:`ProbeError` when the server could not be reached at all.
+    """
+
+    req = urllib.request.Request(url, headers={"User-Agent": UA, "Range": f"bytes=0-{range_bytes - 1}"})
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as response:
+            # Servers that ignore Range send the whole file; stop reading early.
+            return response.read(range_bytes)
+    except urllib.error.HTTPError:
+        return None
+    except (urllib.error.URLError, OSError, ValueError) as exc:
+        raise ProbeError(str(exc)) from exc
+
+
+class ImageProber:
+    """Concurrent, cached header probes of image URLs."""
+
+    def __init__(
+        self,
+        path: Optional[pathlib.Path] = None,
+        *,
+        fetch: Callable[[str], Optional[bytes]] = fetch_head,
+        max_workers: int = MAX_WORKERS,
+        ttl: float = CACHE_TTL,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.path = pathlib.Path(path) if path else None
+        self.fetch = fetch
+        self.max_workers = max(1, max_workers)
+        self.ttl = ttl
+        self.clock = clock
+        self.cache: dict[str, dict] = {}
+        # URLs answered from the cache / fetched, and the bytes those fetches read.
+        self.hits = 0
+        self.probed = 0
+        self.bytes_read = 0
+        self._dirty = False
+        if self.path is not None:
+            try:
+                data = json.loads(self.path.read_text(encoding="utf-8"))
+            except (OSError, json.JSONDecodeError):
+                data = {}
+            if isinstance(data, dict):
+                self.cache = {url: record for url, record in data.items() if isinstance(record, dict)}
+
+    def _cached(self, url: str) -> Optional[ProbeResult]:
+        record = self.cache.get(url)
+        if record is None or self.clock() - float(record.get("checked") or 0) > self.ttl:
+            return None
+        return ProbeResult(
+            ok=bool(record.get("ok")),
+            width=int(record.get("width") or 0),
+            height=int(record.get("height") or 0),
+            format=str(record.get("format") or ""),
+        )
+
+    def _probe(self, url: str) -> tuple[Optional[ProbeResult], int]:
+        try:
+            data = self.fetch(url)
+        except ProbeError:
+            return None, 0
+        if data is None:
+            return ProbeResult(ok=False), 0
+        size = image_size(data)
+        if size is None:
+            # An HTML error page served with 200, or a format without a
+            # parser here (AVIF, ...) that is accepted with an unknown size.
+            return ProbeResult(ok=not data.lstrip().startswith(b"<")), len(data)
+        return ProbeResult(ok=True, width=size[0], height=size[1], format=size[2]), len(data)
+
+    def probe_many(self, urls: Iterable[str]) -> dict[str, ProbeResult]:
+        """Probe every URL (uncached ones concurrently); unreachable ones are left out."""
+
+        results: dict[str, ProbeResult] = {}
+        pending = []
+        for url in dict.fromkeys(urls):
+            cached = self._cached(url)
+            if cached is not None:
+                results[url] = cached
+                self.hits += 1
+            else:
+                pending.append(url)
+        if not pending:
+            return results
+        if len(pending) == 1 or self.max_workers == 1:
+            fresh = [self._probe(url) for url in pending]
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(pending))) as pool:
+                fresh = list(pool.map(self._probe, pending))
+        self.probed += len(pending)
+        self.bytes_read += sum(size for _, size in fresh)
+        now = self.clock()
+        for url, (result, _) in zip(pending, fresh):
+            if result is None:
+                continue
+            results[url] = result
+            self.cache[url] = {
+                "ok": result.ok,
+                "width": result.width,
+                "height": result.height,
+                "format": result.format,
+                "checked": now,
+            }
+            self._dirty = True
+        return results
+
+    def best(self, urls: Iterable[str]) -> str:
+        """Return the reachable URL with the largest real area (earliest on ties)."""
+
+        urls = list(dict.fromkeys(urls))
+        results = self.probe_many(urls)
+        best_url, best_key = "", None
+        for position, url in enumerate(urls):
+            result = results.get(url)
+            if result is None or not result.ok:
+                continue
+            key = (result.area, -position)
+            if best_key is None or key > best_key:
+                best_url, best_key = url, key
+        return best_url
+
+    def save(self) -> None:
+        if self.path is None or not self._dirty:
+            return
+        cutoff = self.clock() - self.ttl
+        self.cache = {url: record for url, record in self.cache.items() if float(record.get("checked") or 0) >= cutoff}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write_text(self.path, json.dumps(self.cache, ensure_ascii=False, indent=2, sort_keys=True))
+        self._dirty = False
+
+
+__all__ = ["ImageProber", "ProbeError", "ProbeResult", "fetch_head", "image_size"]
@@ -0,0 +1,153 @@
+"""Incremental JSON array reading/writing and atomic file replacement."""
+
+from __future__ import annotations
+
+import json
+import os
+import pathlib
+from typing import Any, Iterator, Optional
+
+_WHITESPACE = " \t\n\r"
+_DELIMITERS = _WHITESPACE + ",]"
+_CHUNK_SIZE = 1 << 16
+
+
+def atomic_write_text(path: pathlib.Path, text: str) -> None:
+    """Write ``text`` to ``path`` through a temp file and ``os.replace``."""
+
+    path = pathlib.Path(path)
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    tmp_path.write_text(text, encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+def iter_json_array(path: pathlib.Path, chunk_size: int = _CHUNK_SIZE) -> Iterator[Any]:
+    """Yield the items of the top-level JSON array stored at ``path``.
+
+    Only one item (plus at most one read chunk) is held in memory at a time.
+    Missing files and documents that are not arrays yield nothing; malformed
+    arrays raise :class:`json.JSONDecodeError` at the offending item.
+    """
+
+    decoder = json.JSONDecoder()
+    try:
+        handle = pathlib.Path(path).open("r", encoding="utf-8")
+    except OSError:
+        return
+
+    with handle:
+        buffer = ""
+        pos = 0
+        eof = False
+
+        def fill() -> bool:
+            nonlocal buffer, pos, eof
+            if eof:
+                return False
+            chunk = handle.read(chunk_size)
+            if not chunk:
+                eof = True
+                return False
+            buffer = buffer[pos:] + chunk
+            pos = 0
+            return True
+
+        def skip_whitespace() -> bool:
+            nonlocal pos
+            while True:
+                while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+                    pos += 1
+                if pos < len(buffer):
+                    return True
+                if not fill():
+                    return False
+
+        if not skip_whitespace() or buffer[pos] != "[":
+            return
+        pos += 1
+        expect_item = True
+
+        while True:
+            if not skip_whitespace():
+                raise json.JSONDecodeError("Unterminated array", buffer, pos)
+            char = buffer[pos]
+            if char == "]":
+                return
+            if not expect_item:
+                if char != ",":
+                    raise json.JSONDecodeError("Expecting ',' delimiter", buffer, pos)
+                pos += 1
+                expect_item = True
+                continue
+
+            while True:
+                try:
+                    item, end = decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    if fill():
+                        continue
+                    raise
+                # A number cut by the chunk edge decodes "successfully" but short.
+                truncated = end >= len(buffer) or buffer[end] not in _DELIMITERS
+                if truncated and fill():
+                    continue
+                break
+            pos = end
+            expect_item = False
+            yield item
+
+
+class JsonArrayWriter:
+    """Write a JSON array item by item into a temp file, then swap it in.
+
+    The output matches ``json.dumps(items, ensure_ascii=False, indent=2)``
+    byte for byte, so streamed and in-memory runs produce identical files.
+    """
+
+    def __init__(self, path: pathlib.Path):
+        self.path = pathlib.Path(path)
+        self._tmp_path = self.path.with_name(f".{self.path.name}.tmp")
+        self._handle: Optional[Any] = self._tmp_path.open("w", encoding="utf-8")
+        self.count = 0
+
+    def write(self, item: Any) -> None:
+        if self._handle is None:
+            raise ValueError("write to closed JsonArrayWriter")
+        encoded = json.dumps(item, ensure_ascii=False, indent=2)
+        self._handle.write(",\n" if self.count else "[\n")
+        self._handle.write("\n".join("  " + line for line in encoded.split("\n")))
+        self.count += 1
+
+    def close(self) -> None:
+        """Finish the array and atomically replace the destination file."""
+
+        if self._handle is None:
+            return
+        self._handle.write("\n]" if self.count else "[]")
+        self._handle.close()
+        self._handle = None
+        os.replace(self._tmp_path, self.path)
+
+    def abort(self) -> None:
+        """Discard everything written so far and leave the destination intact."""
+
+        if self._handle is None:
+            return
+        self._handle.close()
+        self._handle = None
+        try:
+            self._tmp_path.unlink()
+        except OSError:
+            pass
+
+    def __enter__(self) -> "JsonArrayWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+__all__ = ["JsonArrayWriter", "atomic_write_text", "iter_json_array"]
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""Merge shard result files written by ``pull_news.py --shard i/N``.
+
+Each shard only fetches the feeds hashed into it and leaves the shared
+outputs alone.  This reducer folds every shard's new entries into
+posts.json, the seen DB, the partitions and the archive in one pass:
+entries are de-duplicated on their link hash, then offered to the
+per-category and total limits in the order an unsharded run would have
+collected them (feeds-file line, then rank within the feed, or freshest
+first in freshness mode; link hash breaks any remaining tie), so the outcome
+does not depend on which shard finished first.  Per-feed limits are already final because every feed belongs to
+exactly one shard.
+
+Run:
+  python3 autopost/merge_shards.py                      # data/shards/*.json
+  python3 autopost/merge_shards.py --keep data/shards/news-shard-*.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import pathlib
+import sys
+from typing import Iterable, Optional, Sequence, Tuple
+
+if __package__ in (None, ""):
+    sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+
+from autopost import pull_news
+from autopost.pull_news import PullNewsConfig, PullNewsResult
+
+
+def load_shard_records(paths: Iterable[pathlib.Path]) -> Tuple[list[dict], list[pathlib.Path]]:
+    """Return the records of every readable shard file in ``paths`` and the files read.
+
+    Unreadable files (truncated, or still being written) are left out of
+    both, so they can be merged by a later run.
+    """
+
+    records: list[dict] = []
+    read: list[pathlib.Path] = []
+    for path in paths:
+        try:
+            payload = json.loads(pathlib.Path(path).read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError) as exc:
+            print(f"[WARN] skipping shard result {path}: {exc}")
+            continue
+        if not isinstance(payload, dict):
+            print(f"[WARN] skipping shard result {path}: not a shard result")
+            continue
+        read.append(pathlib.Path(path))
+        for record in payload.get("records") or []:
+            if isinstance(record, dict) and isinstance(record.get("entry"), dict):
+                records.append(record)
+    return records, read
+
+
+def _record_order(record: dict) -> tuple:
+    order = record.get("order")
+    if not (isinstance(order, list) and order and all(isinstance(v, int) for v in order)):
+        order = [sys.maxsize]
+    return (*order, record["link_hash"])
+
+
+def select_records(records: Sequence[dict], seen: dict, quota: "pull_news._Quota") -> list[dict]:
+    """Pick the records to publish, deterministically and within ``quota``."""
+
+    unique: dict[str, dict] = {}
+    for record in records:
+        key = record.get("link_hash") or pull_news.link_hash(record["entry"].get("source") or "")
+        if not key or key in seen:
+            continue
+        record = dict(record, link_hash=key)
+        current = unique.get(key)
+        # Keep one copy per link regardless of the order the shards were read in.
+        if current is None or _record_order(record) < _record_order(current):
+            unique[key] = record
+
+    ordered = sorted(unique.values(), key=_record_order)
+
+    selected = []
+    for record in ordered:
+        if quota.total_reached():
+            break
+        limit_key = pull_news.entry_limit_key(record["entry"])
+        if not quota.allows(limit_key, ""):
+            continue
+        quota.record(limit_key, "")
+        selected.append(record)
+    return selected
+
+
+def merge_shard_results(
+    paths: Sequence[pathlib.Path],
+    config: Optional[PullNewsConfig] = None,
+    merged: Optional[list] = None,
+) -> PullNewsResult:
+    """Fold the shard result files at ``paths`` into the shared outputs.
+
+    ``config`` supplies the output paths and the per-category/total limits;
+    its ``shard`` field is ignored.  ``merged`` receives the paths of the
+    files that could be read.
+    """
+
+    settings = pull_news._resolve_settings(config or PullNewsConfig())
+    seen, posts_idx = pull_news._prepare_run(settings)
+    quota = pull_news._Quota(settings.max_per_cat, 0, settings.max_total)
+
+    records, read = load_shard_records(paths)
+    selected = select_records(records, seen, quota)
+    new_entries = []
+    for record in selected:
+        entry = pull_news._normalize_post_entry(record["entry"])
+        seen[record["link_hash"]] = record.get("seen") or {
+            "title": entry.get("title"),
+            "url": entry.get("source"),
+            "category": entry.get("category_slug") or "",
+            "subcategory": entry.get("subcategory") or "",
+            "created": entry.get("date"),
+        }
+        new_entries.append(entry)
+
+    posts_idx = pull_news._write_run_outputs(settings, new_entries, posts_idx, seen)
+    if merged is not None:
+        merged.extend(read)
+    print(f"Shards merged: {len(read)} of {len(paths)}; new posts: {len(new_entries)}")
+
+    return PullNewsResult(
+        added_count=len(new_entries),
+        new_entries=new_entries,
+        posts_index=posts_idx,
+    )
+
+
+def main(argv: Optional[Sequence[str]] = None) -> PullNewsResult:
+    """CLI entry point; merged shard files are removed unless ``--keep``.
+
+    Files that could not be read are always kept.
+    """
+
+    parser = argparse.ArgumentParser(description="Merge pull_news.py shard results.")
+    parser.add_argument("paths", nargs="*", type=pathlib.Path, help="shard result files")
+    parser.add_argument("--keep", action="store_true", help="keep shard files after merging")
+    args = parser.parse_args(argv)
+
+    paths = args.paths or sorted(pull_news.SHARD_DIR.glob("*.json"))
+    merged: list[pathlib.Path] = []
+    result = merge_shard_results(paths, merged=merged)
+    if not args.keep:
+        for path in merged:
+            try:
+                path.unlink()
+            except OSError:
+                pass
+    return result
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""Near-duplicate detection for syndicated stories, before their fetch.
+
+Wire copy is republished by many of our feeds under different URLs, so the
+link-hash check in the seen DB does not catch it.  This module keeps MinHash
+signatures of normalized titles and summaries (word bigram shingles) in an
+LSH index: 64 hash permutations split into 16 bands of 4 rows, so two texts
+whose estimated Jaccard similarity reaches the threshold (0.7 by default)
+almost always share a band.  Candidates sharing a band are confirmed on the
+full signature.
+
+The index is seeded with the titles and excerpts of recent posts and the
+titles of recent seen records, then grows as a run adds entries.  Bulk
+signatures are computed with NumPy when it is installed; the pure Python
+path gives identical signatures.
+"""
+
+from __future__ import annotations
+
+import functools
+import random
+import re
+import unicodedata
+import zlib
+from collections import defaultdict
+from typing import Iterable, Optional, Sequence
+
+NUM_PERM = 64
+BANDS = 16
+DEFAULT_THRESHOLD = 0.7
+# Shorter texts ("Live updates", "Morning briefing") collide too easily.
+MIN_TOKENS = 5
+
+_PRIME = (1 << 61) - 1
+_MASK64 = (1 << 64) - 1
+_rng = random.Random(0x5EED)
+# (a*h + b) is taken modulo 2**64 before the prime, exactly what NumPy's
+# wrapping uint64 arithmetic does, so both paths give the same signatures.
+_PERM_A = tuple(_rng.randrange(1, _PRIME) for _ in range(NUM_PERM))
+_PERM_B = tuple(_rng.randrange(0, _PRIME) for _ in range(NUM_PERM))
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_WORD_RE = re.compile(r"\w+")
+
+
+@functools.lru_cache(maxsize=None)
+def _load_numpy():
+    try:
+        import numpy
+    except Exception:
+        return None
+    return numpy
+
+
+def normalize_text(text: str) -> list[str]:
+    """Lower-case word tokens of ``text`` without markup or accents."""
+
+    text = unicodedata.normalize("NFKD", _TAG_RE.sub(" ", text or ""))
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return _WORD_RE.findall(text.lower())
+
+
+def shingles(text: str) -> set[int]:
+    """Hashes of the word bigrams of ``text``; empty if it is too short."""
+
+    tokens = normalize_text(text)
+    if len(tokens) < MIN_TOKENS:
+        return set()
+    return {
+        zlib.crc32(f"{first} {second}".encode("utf-8"))
+        for first, second in zip(tokens, tokens[1:])
+    }
+
+
+def _signature_py(hashes: set[int]) -> tuple[int, ...]:
+    return tuple(
+        min(((a * h + b) & _MASK64) % _PRIME for h in hashes)
+        for a, b in zip(_PERM_A, _PERM_B)
+    )
+
+
+def signatures(texts: Sequence[str]) -> list[Optional[tuple[int, ...]]]:
+    """MinHash signature of every text (``None`` for texts that are too short)."""
+
+    shingle_sets = [shingles(text) for text in texts]
+    result: list[Optional[tuple[int, ...]]] = [None] * len(texts)
+    present = [idx for idx, hashes in enumerate(shingle_sets) if hashes]
+    np = _load_numpy()
+    if np is None or len(present) < 2:
+        for idx in present:
+            result[idx] = _signature_py(shingle_sets[idx])
+        return result
+
+    lengths = np.array([len(shingle_sets[idx]) for idx in present])
+    hashes = np.fromiter(
+        (h for idx in present for h in shingle_sets[idx]), dtype=np.uint64, count=int(lengths.sum())
+    )
+    a = np.array(_PERM_A, dtype=np.uint64)
+    b = np.array(_PERM_B, dtype=np.uint64)
+    permuted = (hashes[:, None] * a + b) % np.uint64(_PRIME)
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    minima = np.minimum.reduceat(permuted, starts, axis=0)
+    for row, idx in enumerate(present):
+        result[idx] = tuple(int(value) for value in minima[row])
+    return result
+
+
+def similarity(first: Sequence[int], second: Sequence[int]) -> float:
+    """Estimated Jaccard similarity of two signatures."""
+
+    return sum(1 for x, y in zip(first, second) if x == y) / NUM_PERM
+
+
+class NearDuplicateIndex:
+    """LSH index of title and summary signatures mapping to a story label."""
+
+    def __init__(self, threshold: float = DEFAULT_THRESHOLD):
+        self.threshold = threshold
+        self._rows = NUM_PERM // BANDS
+        self._buckets: dict[str, dict[tuple, list[int]]] = {
+            "title": defaultdict(list),
+            "summary": defaultdict(list),
+        }
+        self._signatures: list[tuple[int, ...]] = []
+        self._labels: list[str] = []
+        self.hits = 0
+
+    def __len__(self) -> int:
+        return len(self._labels)
+
+    def _bands(self, signature: tuple[int, ...]):
+        for band in range(BANDS):
+            yield (band,) + signature[band * self._rows:(band + 1) * self._rows]
+
+    def _insert(self, kind: str, signature: Optional[tuple[int, ...]], label: str) -> None:
+        if signature is None:
+            return
+        self._signatures.append(signature)
+        self._labels.append(label)
+        position = len(self._signatures) - 1
+        buckets = self._buckets[kind]
+        for band in self._bands(signature):
+            buckets[band].append(position)
+
+    def _lookup(self, kind: str, signature: Optional[tuple[int, ...]]) -> Optional[str]:
+        if signature is None:
+            return None
+        checked = set()
+        buckets = self._buckets[kind]
+        for band in self._bands(signature):
+            for position in buckets.get(band, ()):
+                if position in checked:
+                    continue
+                checked.add(position)
+                if similarity(signature, self._signatures[position]) >= self.threshold:
+                    return self._labels[position]
+        return None
+
+    def add_many(self, stories: Iterable[tuple[str, str, str]]) -> None:
+        """Index ``(label, title, summary)`` triples in one vectorized pass."""
+
+        stories = list(stories)
+        titles = signatures([title for _, title, _ in stories])
+        summaries = signatures([summary for _, _, summary in stories])
+        for (label, _, _), title_sig, summary_sig in zip(stories, titles, summaries):
+            self._insert("title", title_sig, label)
+            self._insert("summary", summary_sig, label)
+
+    def add(self, label: str, title: str, summary: str = "") -> None:
+        self.add_many([(label, title, summary)])
+
+    def match(self, title: str, summary: str = "") -> Optional[str]:
+        """Return the label of an indexed story similar to this one (and count it)."""
+
+        title_sig, summary_sig = signatures([title, summary])
+        label = self._lookup("title", title_sig) or self._lookup("summary", summary_sig)
+        if label is not None:
+            self.hits += 1
+        return label
+
+    @classmethod
+    def from_history(
+        cls,
+        posts: Iterable[dict],
+        seen: dict,
+        *,
+        since: str = "",
+        threshold: float = DEFAULT_THRESHOLD,
+    ) -> "NearDuplicateIndex":
+        """Seed an index with posts and seen records dated ``since`` or later."""
+
+        stories = []
+        indexed = set()
+        for post in posts:
+            if (post.get("date") or "") < since:
+                continue
+            label = post.get("source") or post.get("slug") or ""
+            indexed.add(label)
+            stories.append((label, post.get("title") or "", post.get("excerpt") or ""))
+        for record in seen.values():
+            if not isinstance(record, dict) or (record.get("created") or "") < since:
+                continue
+            label = record.get("url") or ""
+            if label not in indexed:
+                stories.append((label, record.get("title") or "", ""))
+        index = cls(threshold)
+        index.add_many(stories)
+        return index
+
+
+__all__ = [
+    "DEFAULT_THRESHOLD",
+    "NearDuplicateIndex",
+    "normalize_text",
+    "signatures",
+    "similarity",
+]
@@ -0,0 +1,155 @@
+"""Persisted negative cache for feed items that could not be published.
+
+Items whose article yields nothing when fetched and extracted (reason
+``"extract"``: an error status, a timeout or a page without article text)
+or is skipped as unavailable content (``"unavailable"``) never reach the
+seen DB, so every scheduled run used to download them again for as long as
+they stayed in the feed.  The cache remembers each such link by
+:func:`autopost.pull_news.link_hash` together with the failure reason and a
+retry time that doubles with every further failure::
+
+    {
+      "<link hash>": {
+        "url": "https://example.com/story",
+        "reason": "unavailable",
+        "failures": 2,
+        "failed_at": 1717000000.0,
+        "retry_at": 1717021600.0
+      }
+    }
+
+Until ``retry_at`` the item is skipped before any work is done on it and
+the skip is counted per host in :attr:`NegativeCache.suppressed`.  A
+successful retry removes the record; records untouched for ``ttl`` seconds
+are dropped when the cache is saved.
+
+An exception raised while building an entry is not recorded: it aborts the
+run, and the next run (resumed or not) fetches the item again.  Queue mode
+(:mod:`autopost.work_queue`) records units that failed there as
+``"failed"``.
+"""
+
+from __future__ import annotations
+
+import json
+import pathlib
+import time
+from collections import Counter
+from typing import Callable, Optional
+from urllib.parse import urlparse
+
+from autopost.jsonio import atomic_write_text
+
+# First retry after one scheduled run (3 hours), then 6h, 12h, ... up to a week.
+DEFAULT_BACKOFF = 3 * 3600
+DEFAULT_MAX_BACKOFF = 7 * 24 * 3600
+# Items are long gone from their feeds after this long.
+DEFAULT_TTL = 30 * 24 * 3600
+
+
+class NegativeCache:
+    """Backoff records keyed by link hash, loaded from and saved to ``path``."""
+
+    def __init__(
+        self,
+        path: Optional[pathlib.Path] = None,
+        *,
+        backoff: float = DEFAULT_BACKOFF,
+        max_backoff: float = DEFAULT_MAX_BACKOFF,
+        ttl: float = DEFAULT_TTL,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.path = pathlib.Path(path) if path else None
+        self.backoff = max(1.0, float(backoff))
+        self.max_backoff = max(self.backoff, float(max_backoff))
+        self.ttl = float(ttl)
+        self.clock = clock
+        self.entries: dict[str, dict] = {}
+        self.suppressed: Counter = Counter()
+        self._dirty = False
+        if self.path is not None:
+            self.entries = self._load(self.path)
+
+    @staticmethod
+    def _load(path: pathlib.Path) -> dict[str, dict]:
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return {}
+        if not isinstance(data, dict):
+            return {}
+        return {key: record for key, record in data.items() if isinstance(record, dict)}
+
+    def blocked(self, key: str, link: str) -> Optional[str]:
+        """Return the failure reason if ``key`` is still backing off (and count it)."""
+
+        record = self.entries.get(key)
+        if record is None:
+            return None
+        try:
+            retry_at = float(record.get("retry_at") or 0)
+        except (TypeError, ValueError):
+            retry_at = 0.0
+        if self.clock() >= retry_at:
+            return None
+        self.suppressed[(urlparse(link).hostname or "").lower()] += 1
+        return str(record.get("reason") or "failed")
+
+    def record_failure(self, key: str, link: str, reason: str) -> float:
+        """Remember a failed attempt at ``key``; return its next retry time."""
+
+        now = self.clock()
+        record = self.entries.get(key) or {}
+        try:
+            failures = int(record.get("failures") or 0) + 1
+        except (TypeError, ValueError):
+            failures = 1
+        delay = min(self.max_backoff, self.backoff * 2 ** min(failures - 1, 32))
+        self.entries[key] = {
+            "url": link,
+            "reason": reason,
+            "failures": failures,
+            "failed_at": now,
+            "retry_at": now + delay,
+        }
+        self._dirty = True
+        return now + delay
+
+    def clear(self, key: str) -> None:
+        """Forget ``key`` after it was published."""
+
+        if self.entries.pop(key, None) is not None:
+            self._dirty = True
+
+    def prune(self) -> int:
+        """Drop records whose last failure is older than ``ttl``; return how many."""
+
+        cutoff = self.clock() - self.ttl
+        stale = [
+            key
+            for key, record in self.entries.items()
+            if not isinstance(record.get("failed_at"), (int, float)) or record["failed_at"] < cutoff
+        ]
+        for key in stale:
+            del self.entries[key]
+        if stale:
+            self._dirty = True
+        return len(stale)
+
+    def save(self) -> None:
+        self.prune()
+        if self.path is None or not self._dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write_text(self.path, json.dumps(self.entries, ensure_ascii=False, indent=2, sort_keys=True))
+        self._dirty = False
+
+    def report(self) -> None:
+        if not self.suppressed:
+            return
+        print(f"[BACKOFF] skipped {sum(self.suppressed.values())} items still backing off:")
+        for host, count in self.suppressed.most_common():
+            print(f"  {count:5d}  {host or '-'}")
+
+
+__all__ = ["NegativeCache"]
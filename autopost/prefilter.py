@@ -0,0 +1,194 @@
+"""Cheap rules that reject feed items before their article is downloaded.
+
+The unavailable-content check in :func:`autopost.pull_news.build_entry` only
+runs after the page was fetched and extracted.  These rules look at what the
+feed already told us (link, title, description, enclosure, date) and skip
+items that would never be published, so neither the download nor the
+extraction is paid for.
+
+Rules come from :data:`DEFAULT_RULES` plus an optional JSON sidecar next to
+the feeds file (``feeds_news.txt`` -> ``feeds_news.rules.json``)::
+
+    {
+      "use_defaults": true,
+      "url_patterns": ["/sponsored/", "/live(?:/|$)", "/galler(?:y|ies)/", "/photos?/"],
+      "title_patterns": ["^WATCH:"],
+      "domains": ["paywalled.example"],
+      "enclosure_types": ["audio/"],
+      "require_description": false,
+      "max_age_days": 7
+    }
+
+Patterns are case-insensitive regular expressions; ``domains`` also match
+subdomains.  The defaults only cover video and podcast paths and audio/video
+enclosures: live, gallery and photo paths hold ordinary articles at many
+publishers, so they belong in the sidecar of the feeds that need them.  Every rejection is counted per rule in :attr:`Prefilter.hits`.
+"""
+
+from __future__ import annotations
+
+import datetime
+import json
+import pathlib
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+from urllib.parse import urlparse
+
+# Link paths that never hold a readable article, whoever the publisher.
+DEFAULT_URL_PATTERNS = (
+    r"/videos?/",
+    r"/podcasts?/",
+)
+DEFAULT_ENCLOSURE_TYPES = ("audio/", "video/")
+
+RULES_SUFFIX = ".rules.json"
+
+
+@dataclass(frozen=True)
+class PrefilterRules:
+    """Rule set; see the module docstring for the sidecar file format."""
+
+    url_patterns: tuple[str, ...] = ()
+    title_patterns: tuple[str, ...] = ()
+    domains: tuple[str, ...] = ()
+    enclosure_types: tuple[str, ...] = ()
+    require_description: bool = False
+    max_age_days: int = 0
+
+    def merged(self, other: "PrefilterRules") -> "PrefilterRules":
+        return PrefilterRules(
+            url_patterns=self.url_patterns + other.url_patterns,
+            title_patterns=self.title_patterns + other.title_patterns,
+            domains=self.domains + other.domains,
+            enclosure_types=self.enclosure_types + other.enclosure_types,
+            require_description=self.require_description or other.require_description,
+            max_age_days=other.max_age_days or self.max_age_days,
+        )
+
+
+DEFAULT_RULES = PrefilterRules(
+    url_patterns=DEFAULT_URL_PATTERNS,
+    enclosure_types=DEFAULT_ENCLOSURE_TYPES,
+)
+
+
+def rules_path_for(feeds_file: pathlib.Path) -> pathlib.Path:
+    feeds_file = pathlib.Path(feeds_file)
+    return feeds_file.with_name(feeds_file.stem + RULES_SUFFIX)
+
+
+def load_rules(feeds_file: Optional[pathlib.Path] = None, rules_file: Optional[pathlib.Path] = None) -> PrefilterRules:
+    """Return the defaults combined with ``rules_file`` (or the feeds sidecar)."""
+
+    path = pathlib.Path(rules_file) if rules_file else (rules_path_for(feeds_file) if feeds_file else None)
+    if path is None or not path.exists():
+        return DEFAULT_RULES
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError) as exc:
+        print(f"[WARN] ignoring prefilter rules {path}: {exc}")
+        return DEFAULT_RULES
+    if not isinstance(data, dict):
+        return DEFAULT_RULES
+
+    def _strings(name: str) -> tuple[str, ...]:
+        values = data.get(name) or []
+        return tuple(str(value) for value in values if str(value).strip())
+
+    try:
+        max_age_days = int(data.get("max_age_days") or 0)
+    except (TypeError, ValueError):
+        max_age_days = 0
+    custom = PrefilterRules(
+        url_patterns=_strings("url_patterns"),
+        title_patterns=_strings("title_patterns"),
+        domains=tuple(domain.lower().lstrip(".") for domain in _strings("domains")),
+        enclosure_types=tuple(kind.lower() for kind in _strings("enclosure_types")),
+        require_description=bool(data.get("require_description")),
+        max_age_days=max_age_days,
+    )
+    if data.get("use_defaults", True):
+        return DEFAULT_RULES.merged(custom)
+    return custom
+
+
+@dataclass
+class Prefilter:
+    """Compiled rules plus per-rule hit counts for one run."""
+
+    rules: PrefilterRules = DEFAULT_RULES
+    today: Optional[datetime.date] = None
+    hits: Counter = field(default_factory=Counter)
+
+    def __post_init__(self):
+        self._url = [(f"url:{p}", re.compile(p, re.I)) for p in self.rules.url_patterns]
+        self._title = [(f"title:{p}", re.compile(p, re.I)) for p in self.rules.title_patterns]
+        if self.today is None:
+            self.today = datetime.datetime.utcnow().date()
+
+    @classmethod
+    def for_feeds(cls, feeds_file: pathlib.Path, rules_file: Optional[pathlib.Path] = None) -> "Prefilter":
+        return cls(load_rules(feeds_file, rules_file))
+
+    def _match(self, item: dict, link: str, item_date: Optional[Callable[[], str]]) -> Optional[str]:
+        parsed = urlparse(link)
+        target = parsed.path + (f"?{parsed.query}" if parsed.query else "")
+        for name, pattern in self._url:
+            if pattern.search(target):
+                return name
+
+        host = (parsed.hostname or "").lower()
+        for domain in self.rules.domains:
+            if host == domain or host.endswith("." + domain):
+                return f"domain:{domain}"
+
+        title = (item.get("title") or "").strip()
+        for name, pattern in self._title:
+            if pattern.search(title):
+                return name
+
+        if self.rules.require_description and not (item.get("summary") or "").strip():
+            return "empty_description"
+
+        element = item.get("element")
+        if self.rules.enclosure_types and element is not None:
+            for enclosure in element.findall("enclosure"):
+                kind = (enclosure.get("type") or "").lower()
+                for prefix in self.rules.enclosure_types:
+                    if kind.startswith(prefix):
+                        return f"enclosure:{prefix}"
+
+        if self.rules.max_age_days > 0 and item_date is not None:
+            try:
+                published = datetime.date.fromisoformat((item_date() or "")[:10])
+            except ValueError:
+                published = None
+            if published and (self.today - published).days > self.rules.max_age_days:
+                return f"max_age_days:{self.rules.max_age_days}"
+        return None
+
+    def reject(self, item: dict, link: str, item_date: Optional[Callable[[], str]] = None) -> Optional[str]:
+        """Return the name of the first rule rejecting ``item`` (and count it)."""
+
+        rule = self._match(item, link, item_date)
+        if rule is not None:
+            self.hits[rule] += 1
+        return rule
+
+    def report(self) -> None:
+        if not self.hits:
+            return
+        print(f"[PREFILTER] rejected {sum(self.hits.values())} items before download:")
+        for rule, count in self.hits.most_common():
+            print(f"  {count:5d}  {rule}")
+
+
+__all__ = [
+    "DEFAULT_RULES",
+    "Prefilter",
+    "PrefilterRules",
+    "load_rules",
+    "rules_path_for",
+]
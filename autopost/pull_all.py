@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""Run every category autoposter in a single process.
+
+The per-category wrappers (``pull_news.py``, ``pull_crypto.py`` ...) each load
+and rewrite the shared posts.json/seen DB and fetch their own copy of feeds
+that appear in several ``feeds_*.txt`` files.  This entry point loads the
+shared state once, fetches every unique feed URL once, offers its items to each
+category that lists it (in job order, each job keeping its own per-category,
+per-feed and total limits) and writes all outputs in one pass.
+
+Run:
+  python3 autopost/pull_all.py
+  python3 autopost/pull_all.py --job "Crypto=autopost/feeds_crypto.txt:5" --job ...
+"""
+
+from __future__ import annotations
+
+import argparse
+import pathlib
+import sys
+from collections import Counter
+from dataclasses import dataclass, replace
+from typing import Optional, Sequence
+
+if __package__ in (None, ""):
+    sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+
+from autopost import pull_news
+from autopost.pull_news import PullNewsConfig, PullNewsResult
+from autopost.run_report import RunReport
+
+ROOT = pathlib.Path(__file__).resolve().parent
+
+
+@dataclass
+class CategoryJob:
+    """One category run: its feeds file plus optional limit overrides."""
+
+    category: str
+    feeds: pathlib.Path
+    max_per_category: Optional[int] = None
+    max_per_feed: Optional[int] = None
+    max_total: Optional[int] = None
+
+
+# Mirrors the per-category matrix the scheduled workflow used to fan out.
+DEFAULT_JOBS: tuple[CategoryJob, ...] = (
+    CategoryJob("News", ROOT / "feeds_news.txt", 10),
+    CategoryJob("Crypto", ROOT / "feeds_crypto.txt", 5),
+    CategoryJob("Culture & Arts", ROOT / "feeds_cultute_arts.txt", 10),
+    CategoryJob("Entertainment", ROOT / "feeds_entertainment.txt", 10),
+    CategoryJob("Food & Drink", ROOT / "feeds_food_drink.txt", 10),
+    CategoryJob("Lifestyle", ROOT / "feeds_lifestyle.txt", 10),
+    CategoryJob("Tech & AI", ROOT / "feeds_tech_ai.txt", 10),
+    CategoryJob("Travel", ROOT / "feeds_travel.txt", 10),
+)
+
+
+def _job_settings(job: CategoryJob, base: PullNewsConfig) -> pull_news._RunSettings:
+    overrides = {"feeds": job.feeds, "category": job.category}
+    if job.max_per_category is not None:
+        overrides["max_per_category"] = job.max_per_category
+    if job.max_per_feed is not None:
+        overrides["max_per_feed"] = job.max_per_feed
+    if job.max_total is not None:
+        overrides["max_total"] = job.max_total
+    return pull_news._resolve_settings(replace(base, **overrides))
+
+
+def run_pull_all(
+    jobs: Sequence[CategoryJob] = DEFAULT_JOBS,
+    config: Optional[PullNewsConfig] = None,
+) -> PullNewsResult:
+    """Run ``jobs`` against shared state loaded once from ``config``'s paths.
+
+    ``config`` supplies the output paths and the defaults for limits a job
+    does not override; its ``feeds`` and ``category`` fields are ignored.
+    The run is reported like a single-category one, under the ``pull_all``
+    label (``data/reports/pull_all.json``, ``data/metrics/pull_all.jsonl``).
+    """
+
+    base = config or PullNewsConfig()
+    settings = pull_news._resolve_settings(base)
+    return pull_news._reported_run(
+        settings, "pull_all", lambda report: _run_pull_all(jobs, base, settings, report)
+    )
+
+
+def _run_pull_all(
+    jobs: Sequence[CategoryJob],
+    base: PullNewsConfig,
+    settings: pull_news._RunSettings,
+    report: RunReport,
+) -> PullNewsResult:
+    deadline = pull_news._Deadline.from_settings(settings)
+    seen, posts_idx = pull_news._prepare_run(settings)
+    new_entries: list[dict] = []
+    deferred: list[str] = []
+    prefilter_hits: Counter = Counter()
+
+    planned = []
+    quotas: dict[str, pull_news._Quota] = {}
+    for job in jobs:
+        job_settings = _job_settings(job, base)
+        if not job_settings.feeds_file.exists():
+            print("ERROR: feeds file not found:", job_settings.feeds_file)
+            continue
+        specs = pull_news.load_feed_specs(job_settings.feeds_file, job_settings.category_filter)
+        quotas[job.category] = pull_news._Quota.from_settings(job_settings)
+        planned.append((job, job_settings, specs))
+
+    journal = None
+    if settings.checkpoint:
+        journal = pull_news._RunJournal(settings.data_dir / "journal" / "pull_all.jsonl")
+        # Journal records name their job, so resumed entries count against its limits.
+        pull_news._restore_journal(
+            journal, settings.resume, seen=seen, new_entries=new_entries, job_quotas=quotas
+        )
+    negative = pull_news._negative_cache_for(settings, "pull_all")
+    near_dups = pull_news._near_dup_index_for(settings, posts_idx, seen)
+    urls = pull_news._url_cache_for(settings, "pull_all")
+    covers = pull_news._image_prober_for(settings, "pull_all")
+
+    # Parsed feeds are kept only until the last job that lists them is done.
+    remaining_uses = Counter(spec.url for _, _, specs in planned for spec in specs)
+    feed_cache: dict[str, Optional[list]] = {}
+    fetched = 0
+
+    for job, job_settings, specs in planned:
+        quota = quotas[job.category]
+        if journal is not None:
+            journal.job = job.category
+        prefilter = None
+        if settings.prefilter:
+            prefilter = pull_news.Prefilter.for_feeds(job_settings.feeds_file, settings.prefilter_rules)
+        added_before = len(new_entries)
+        fresh_feeds = []
+        for feed_index, spec in enumerate(specs):
+            feed_added_before = len(new_entries)
+            if spec.url not in feed_cache and deadline.expired():
+                remaining_uses[spec.url] -= 1
+                deferred.append(spec.url)
+                continue
+            if spec.url in feed_cache:
+                items = feed_cache[spec.url]
+            else:
+                items = pull_news.fetch_feed_items(spec, report)
+                fetched += 1
+            remaining_uses[spec.url] -= 1
+            if remaining_uses[spec.url] > 0:
+                feed_cache[spec.url] = items
+            else:
+                feed_cache.pop(spec.url, None)
+            if items is None:
+                continue
+            if settings.freshness:
+                fresh_feeds.append((feed_index, spec, items))
+                continue
+            completed = pull_news.collect_feed_entries(
+                spec,
+                items,
+                seen=seen,
+                quota=quota,
+                target_words=settings.target_words,
+                new_entries=new_entries,
+                deadline=deadline,
+                prefilter=prefilter,
+                negative=negative,
+                near_dups=near_dups,
+                urls=urls,
+                covers=covers,
+                report=report,
+            )
+            if not completed:
+                deferred.append(spec.url)
+            if journal is not None:
+                records = pull_news._run_records(new_entries[feed_added_before:], None, seen)
+                journal.append([dict(record, feed_url=spec.url) for record in records])
+        if fresh_feeds:
+            deferred.extend(
+                pull_news.collect_fresh_entries(
+                    fresh_feeds,
+                    seen=seen,
+                    quota=quota,
+                    target_words=settings.target_words,
+                    new_entries=new_entries,
+                    deadline=deadline,
+                    journal=journal,
+                    prefilter=prefilter,
+                    negative=negative,
+                    near_dups=near_dups,
+                    urls=urls,
+                    covers=covers,
+                    report=report,
+                )
+            )
+        if prefilter is not None:
+            prefilter.report()
+            prefilter_hits.update(prefilter.hits)
+        print(f"[{job.category}] new posts: {len(new_entries) - added_before}")
+    if deferred:
+        print(f"[DEADLINE] time budget reached; deferred {len(deferred)} feeds")
+    if negative is not None:
+        negative.report()
+        negative.save()
+    if urls is not None:
+        urls.save(seen)
+    if covers is not None:
+        covers.save()
+        report.caches["image_probe"].update(hits=covers.hits, misses=covers.probed)
+        report.add_bytes("images", covers.bytes_read)
+
+    if settings.delta:
+        with report.stage("write"):
+            delta_path = pull_news.write_delta(
+                settings.delta_dir,
+                pull_news._run_records(new_entries, None, seen),
+            )
+        print(f"Feeds fetched: {fetched} (unique); new posts this run: {len(new_entries)} -> {delta_path}")
+    else:
+        with report.stage("write"):
+            posts_idx = pull_news._write_run_outputs(settings, new_entries, posts_idx, seen)
+        print(f"Feeds fetched: {fetched} (unique); new posts this run: {len(new_entries)}")
+    if journal is not None:
+        journal.discard()
+
+    return PullNewsResult(
+        added_count=len(new_entries),
+        new_entries=new_entries,
+        posts_index=posts_idx,
+        deferred_feeds=deferred,
+        prefilter_hits=dict(prefilter_hits),
+        suppressed_hosts=dict(negative.suppressed) if negative is not None else {},
+        near_duplicates=near_dups.hits if near_dups is not None else 0,
+        canonical_duplicates=urls.skipped + urls.discarded if urls is not None else 0,
+    )
+
+
+def _parse_job(value: str) -> CategoryJob:
+    """Parse ``Category=path/to/feeds.txt[:max_per_cat]``."""
+
+    category, sep, rest = value.partition("=")
+    if not sep or not category.strip() or not rest.strip():
+        raise argparse.ArgumentTypeError(f"expected CATEGORY=FEEDS[:MAX_PER_CAT], got {value!r}")
+    feeds, limit = rest, ""
+    head, colon, tail = rest.rpartition(":")
+    if colon and tail.isdigit():
+        feeds, limit = head, tail
+    return CategoryJob(
+        category=category.strip(),
+        feeds=pathlib.Path(feeds.strip()),
+        max_per_category=int(limit) if limit else None,
+    )
+
+
+def main(argv: Optional[Sequence[str]] = None) -> PullNewsResult:
+    """CLI entry point; without ``--job`` every default category runs."""
+
+    parser = argparse.ArgumentParser(description="Run several category autoposters at once.")
+    parser.add_argument(
+        "--job",
+        action="append",
+        type=_parse_job,
+        dest="jobs",
+        metavar="CATEGORY=FEEDS[:MAX_PER_CAT]",
+        help="category run to include (repeatable); defaults to all categories",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="continue from the journal an interrupted run left in data/journal/",
+    )
+    args = parser.parse_args(argv)
+    config = PullNewsConfig()
+    if args.resume:
+        config.resume = True
+    return run_pull_all(args.jobs or DEFAULT_JOBS, config)
+
+
+if __name__ == "__main__":
+    main()
@@ -19,21 +19,32 @@ Run:
   python3 "autopost/pull_news.py"
 Env knobs (optional):
   MAX_PER_CAT, MAX_PER_FEED, MAX_TOTAL, MAX_POSTS_PERSIST, HTTP_TIMEOUT, FALLBACK_COVER, DEFAULT_AUTHOR
-  IMG_TARGET_WIDTH, IMG_PROXY, FORCE_PROXY, TARGET_WORDS
+  IMG_TARGET_WIDTH, IMG_PROXY, FORCE_PROXY, TARGET_WORDS, ARCHIVE_COLD_AFTER_MONTHS
 """
 
 import os, re, json, hashlib, datetime, pathlib, sys
+import functools, heapq, shutil, time
 from collections import defaultdict
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from email.utils import parsedate_to_datetime
 from urllib.parse import urlparse, urlunparse, parse_qsl, urlencode
-from typing import Optional
+from typing import Callable, Optional
 
 if __package__ in (None, ""):
     sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
 
 from autopost import SEEN_DB_FILENAME
-from autopost.archive_utils import append_entries_to_archive
+from autopost.archive_utils import append_entries_to_archive, iter_archive_entries, merge_sorted
+from autopost.jsonio import JsonArrayWriter, atomic_write_text, iter_json_array
+from autopost.cover_urls import GENERIC_PATH, GENERIC_QUERY, GUARDIAN, WORDPRESS, rewrite_cover_url
+from autopost.image_probe import ImageProber
+from autopost.near_dup import NearDuplicateIndex
+from autopost.negative_cache import NegativeCache
+from autopost.prefilter import Prefilter
+from autopost.run_metrics import append_run, run_record
+from autopost.run_report import RunReport, timed
+from autopost.search_index import update_search_index
+from autopost.url_cache import UrlCache
 from autopost.common import (
     absolutize,
     extract_body_html,
@@ -60,6 +71,19 @@ def _env_int(name: str, default: int) -> int:
         print(f"[WARN] Invalid {name}={raw!r}; falling back to {default}")
         return default
 
+
+def _env_float(name: str, default: float) -> float:
+    """Return a float from the environment or ``default`` on failure."""
+
+    raw = (os.getenv(name) or "").strip()
+    if not raw:
+        return default
+    try:
+        return float(raw)
+    except ValueError:
+        print(f"[WARN] Invalid {name}={raw!r}; falling back to {default}")
+        return default
+
 # ------------------ Config ------------------
 ROOT = pathlib.Path(__file__).resolve().parent.parent
 DATA_DIR = ROOT / "data"
@@ -83,6 +107,63 @@ TARGET_WORDS = _env_int("TARGET_WORDS", SUMMARY_WORDS)
 MAX_POSTS_PERSIST = _env_int("MAX_POSTS_PERSIST", 3000)
 FALLBACK_COVER = os.getenv("FALLBACK_COVER", "assets/img/cover-fallback.jpg")
 DEFAULT_AUTHOR = os.getenv("DEFAULT_AUTHOR", "AventurOO Editorial")
+# Archive months older than this many months move into gzip bundles (0 = never).
+ARCHIVE_COLD_AFTER_MONTHS = _env_int("ARCHIVE_COLD_AFTER_MONTHS", 12)
+# "1" => stream posts.json instead of loading it whole (keeps memory flat).
+STREAM_POSTS = os.getenv("STREAM_POSTS", "0")
+# "i/N" => only process feeds hashed into shard i (0-based) of N and write a
+# shard result file for autopost/merge_shards.py instead of the shared outputs.
+SHARD = os.getenv("SHARD", "").strip()
+SHARD_DIR = DATA_DIR / "shards"
+# "1" => write only a delta file to data/deltas/ and leave posts.json, the
+# seen DB, partitions and archive to autopost/apply_deltas.py.
+EMIT_DELTA = os.getenv("EMIT_DELTA", "0")
+DELTA_DIR = DATA_DIR / "deltas"
+# Stop starting new fetches after this many seconds (0 = no budget) and keep
+# COMMIT_RESERVE seconds of it for writing the outputs.
+TIME_BUDGET = _env_int("TIME_BUDGET", 0)
+COMMIT_RESERVE = _env_int("COMMIT_RESERVE", 30)
+# Completed entries are journaled to data/journal/ after every feed so a
+# crashed run can be continued with RESUME=1 (or --resume).
+CHECKPOINT = os.getenv("CHECKPOINT", "1")
+RESUME = os.getenv("RESUME", "0")
+# "1" => fetch every feed first and publish the freshest unseen items across
+# all of them instead of consuming feeds in file order.
+FRESHNESS = os.getenv("FRESHNESS", "0")
+# "0" => disable the pre-download rejection rules (autopost/prefilter.py);
+# PREFILTER_RULES overrides the <feeds>.rules.json sidecar.
+PREFILTER = os.getenv("PREFILTER", "1")
+PREFILTER_RULES = os.getenv("PREFILTER_RULES", "").strip()
+# "0" => retry failed/unavailable links on every run instead of backing off
+# (NEGATIVE_BACKOFF seconds after the first failure, doubling up to
+# NEGATIVE_MAX_BACKOFF); the records live in data/negative_cache/.
+NEGATIVE_CACHE = os.getenv("NEGATIVE_CACHE", "1")
+NEGATIVE_BACKOFF = _env_int("NEGATIVE_BACKOFF", 3 * 3600)
+NEGATIVE_MAX_BACKOFF = _env_int("NEGATIVE_MAX_BACKOFF", 7 * 24 * 3600)
+# "0" => do not skip items whose title or summary nearly matches a post of the
+# last NEAR_DUP_DAYS days (estimated Jaccard >= NEAR_DUP_THRESHOLD).
+NEAR_DUP = os.getenv("NEAR_DUP", "1")
+NEAR_DUP_THRESHOLD = _env_float("NEAR_DUP_THRESHOLD", 0.7)
+NEAR_DUP_DAYS = _env_int("NEAR_DUP_DAYS", 7)
+# "0" => do not remember the redirect target and <link rel="canonical"> of
+# fetched articles (data/url_cache/) to skip aliases of published stories.
+URL_CACHE = os.getenv("URL_CACHE", "1")
+# "0" => pick covers from feed width/height hints and rewrite them blindly
+# instead of probing the real image headers (cached in data/image_probe/).
+IMAGE_PROBE = os.getenv("IMAGE_PROBE", "1")
+# "1" => write the run report (per stage/feed/host timings, bytes, cache hits,
+# skips and the tracemalloc peak) to data/reports/<run>.json; RUN_PROFILE=1
+# also dumps cProfile stats for the run to data/reports/<run>.pstats.
+RUN_REPORT = os.getenv("RUN_REPORT", "0")
+RUN_PROFILE = os.getenv("RUN_PROFILE", "0")
+# "0" => do not append the run's per-feed metrics to data/metrics/<run>.jsonl
+# (read by autopost/run_metrics.py); only the last RUN_METRICS_KEEP are kept.
+RUN_METRICS = os.getenv("RUN_METRICS", "1")
+RUN_METRICS_KEEP = _env_int("RUN_METRICS_KEEP", 500)
+# "0" => do not keep the search index in data/search/ (read by js/search.js)
+# in step with posts.json; SEARCH_INDEX_ARCHIVE=1 keeps archived posts in it.
+SEARCH_INDEX = os.getenv("SEARCH_INDEX", "1")
+SEARCH_INDEX_ARCHIVE = os.getenv("SEARCH_INDEX_ARCHIVE", "0")
 
 
 TRACKING_PARAM_PREFIXES = ("utm_",)
@@ -133,15 +214,61 @@ class PullNewsConfig:
     max_total: int = MAX_TOTAL
     target_words: Optional[int] = TARGET_WORDS
     max_posts_persist: int = MAX_POSTS_PERSIST
+    archive_cold_after_months: int = ARCHIVE_COLD_AFTER_MONTHS
+    streaming: bool = STREAM_POSTS == "1"
+    shard: str = SHARD
+    shard_dir: pathlib.Path = SHARD_DIR
+    delta: bool = EMIT_DELTA == "1"
+    delta_dir: pathlib.Path = DELTA_DIR
+    # Seconds this run may take, and/or an absolute ``time.time()`` deadline.
+    time_budget: float = TIME_BUDGET
+    deadline: Optional[float] = None
+    commit_reserve: float = COMMIT_RESERVE
+    checkpoint: bool = CHECKPOINT == "1"
+    resume: bool = RESUME == "1"
+    freshness: bool = FRESHNESS == "1"
+    prefilter: bool = PREFILTER == "1"
+    prefilter_rules: Optional[pathlib.Path] = pathlib.Path(PREFILTER_RULES) if PREFILTER_RULES else None
+    negative_cache: bool = NEGATIVE_CACHE == "1"
+    negative_backoff: float = NEGATIVE_BACKOFF
+    negative_max_backoff: float = NEGATIVE_MAX_BACKOFF
+    near_dup: bool = NEAR_DUP == "1"
+    near_dup_threshold: float = NEAR_DUP_THRESHOLD
+    near_dup_days: int = NEAR_DUP_DAYS
+    url_cache: bool = URL_CACHE == "1"
+    image_probe: bool = IMAGE_PROBE == "1"
+    run_report: bool = RUN_REPORT == "1"
+    profile: bool = RUN_PROFILE == "1"
+    run_metrics: bool = RUN_METRICS == "1"
+    run_metrics_keep: int = RUN_METRICS_KEEP
+    search_index: bool = SEARCH_INDEX == "1"
+    search_archive: bool = SEARCH_INDEX_ARCHIVE == "1"
 
 
 @dataclass
 class PullNewsResult:
-    """Summary returned by :func:`run_pull_news`."""
+    """Summary returned by :func:`run_pull_news`.
+
+    ``posts_index`` is left empty for streaming runs, which never hold the
+    whole index in memory.  ``deferred_feeds`` lists the feeds a time-limited
+    run skipped or cut short; ``prefilter_hits`` counts items rejected per
+    pre-download rule, ``suppressed_hosts`` the items skipped per host
+    because an earlier attempt failed and their retry is not due yet,
+    ``near_duplicates`` the items skipped as copies of an indexed story and
+    ``canonical_duplicates`` the items whose canonical URL was published
+    before.  ``report`` holds the run's timings and counters (see
+    :class:`autopost.run_report.RunReport`).
+    """
 
     added_count: int
     new_entries: list[dict]
     posts_index: list[dict]
+    deferred_feeds: list[str] = field(default_factory=list)
+    prefilter_hits: dict[str, int] = field(default_factory=dict)
+    suppressed_hosts: dict[str, int] = field(default_factory=dict)
+    near_duplicates: int = 0
+    canonical_duplicates: int = 0
+    report: Optional[RunReport] = None
 # ---- Link normalization helpers ----
 
 def is_tracking_param(name: str) -> bool:
@@ -200,61 +327,20 @@ def link_hash(link: str) -> str:
 
 # ---- Image helpers for 'cover' ----
 def guardian_upscale_url(u: str, target=IMG_TARGET_WIDTH) -> str:
-    try:
-        from urllib.parse import urlencode, urlparse, parse_qsl, urlunparse
-        pr = urlparse(u)
-        if "i.guim.co.uk" not in pr.netloc:
-            return u
-        q = dict(parse_qsl(pr.query, keep_blank_values=True))
-        q["width"] = str(max(int(q.get("width", "0") or 0), target))
-        q.setdefault("quality", "85")
-        q.setdefault("auto", "format")
-        q.setdefault("fit", "max")
-        pr = pr._replace(query=urlencode(q))
-        return urlunparse(pr)
-    except Exception:
-        return u
+    return rewrite_cover_url(u, target, (GUARDIAN,))
+
 def _remove_wp_size_suffix(u: str) -> str:
     """
     Heq sufiksin WordPress -{w}x{h} para prapashtesës, p.sh.
     example-800x600.jpg -> example.jpg
     """
-    m = re.search(r'(?i)(.+?)-\d{2,4}x\d{2,4}(\.[a-z]{3,4})(\?.*)?$', u)
-    if m:
-        return (m.group(1) + m.group(2) + (m.group(3) or ''))
-    return u
+    return rewrite_cover_url(u, IMG_TARGET_WIDTH, (WORDPRESS,))
 
 def _bump_width_query(u: str, target: int) -> str:
     """
     Nëse URL ka parametra si w, width, maxwidth, px, sz, i çon ≥ target.
     """
-    try:
-        pr = urlparse(u)
-        q = dict(parse_qsl(pr.query, keep_blank_values=True))
-        updated = False
-        for k in ('w', 'width', 'maxwidth', 'px', 'sz', 's'):
-            if k in q:
-                try:
-                    # kap numrin e parë në vlerë (p.sh. '800', '800px', etj.)
-                    import re as _re
-                    m = _re.search(r'\d+', str(q[k]))
-                    v = int(m.group(0)) if m else 0
-                except Exception:
-                    v = 0
-                if v < target:
-                    val = str(q[k])
-                    if m:
-                        start, end = m.span()
-                        q[k] = f"{val[:start]}{target}{val[end:]}"
-                    else:
-                        q[k] = str(target)
-                    updated = True
-        if updated:
-            pr = pr._replace(query=urlencode(q))
-            u = urlunparse(pr)
-        return u
-    except Exception:
-        return u
+    return rewrite_cover_url(u, target, (GENERIC_QUERY,))
 
 
 def pick_largest_media_url(it_elem) -> str:
@@ -278,6 +364,40 @@ def pick_largest_media_url(it_elem) -> str:
             best_url = u
     return best_url or ""
 
+def media_candidates(it_elem) -> list[str]:
+    """Every image URL the feed item offers, in feed order."""
+
+    if it_elem is None:
+        return []
+    urls = []
+    ns = {"media": "http://search.yahoo.com/mrss/"}
+    for tag in it_elem.findall(".//media:content", ns) + it_elem.findall(".//media:thumbnail", ns):
+        medium = (tag.attrib.get("medium") or "image").lower()
+        kind = (tag.attrib.get("type") or "image/").lower()
+        if medium == "image" and kind.startswith("image"):
+            urls.append((tag.attrib.get("url") or "").strip())
+    for enc in it_elem.findall("enclosure"):
+        if str(enc.attrib.get("type", "")).lower().startswith("image"):
+            urls.append((enc.attrib.get("url") or "").strip())
+    return [u for u in dict.fromkeys(urls) if u]
+
+
+def probe_cover_url(candidates: list[str], prober: ImageProber) -> str:
+    """Return the candidate cover with the largest real area that resolves.
+
+    Each candidate is tried with the :func:`sanitize_img_url` upgrades and,
+    in case those point at a missing file, as given (over HTTPS).  Returns
+    "" when no candidate could be verified.
+    """
+
+    variants = []
+    for raw in dict.fromkeys(c.strip() for c in candidates if c and c.strip()):
+        rewritten = resolve_cover_url(raw)
+        options = [rewritten] if FORCE_PROXY == "1" and IMG_PROXY else [rewritten, _to_https(raw)]
+        variants.extend(u for u in options if u.lower().startswith("https://"))
+    return prober.best(variants) if variants else ""
+
+
 def _to_https(u: str) -> str:
     if not u:
         return u
@@ -297,102 +417,7 @@ def _proxy_if_mixed(u: str) -> str:
     return u
 def _bump_path_width(u: str, target: int) -> str:
     """Upgrade numeric path segments that likely encode the image width."""
-    try:
-        parsed = urlparse(u)
-    except Exception:
-        return u
-
-    path = parsed.path or ""
-    if not path:
-        return u
-
-    segments = path.split("/")
-    size_keywords = {
-        "img",
-        "image",
-        "images",
-        "media",
-        "thumb",
-        "thumbnail",
-        "resize",
-        "resized",
-        "size",
-        "sizes",
-        "standard",
-        "width",
-        "w",
-        "crop",
-        "quality",
-    }
-    changed = False
-
-    for idx, seg in enumerate(segments):
-        if not re.fullmatch(r"\d{2,4}", seg or ""):
-            continue
-        try:
-            value = int(seg)
-        except ValueError:
-            continue
-        if value >= target or value == 0:
-            continue
-
-        prev_raw = segments[idx - 1] if idx > 0 else ""
-        next_raw = segments[idx + 1] if idx + 1 < len(segments) else ""
-        prev_prev_raw = segments[idx - 2] if idx > 1 else ""
-
-        if prev_raw and re.fullmatch(r"\d{4}", prev_raw):
-            try:
-                year_val = int(prev_raw)
-            except ValueError:
-                year_val = 0
-            if 1900 <= year_val <= 2100 and 1 <= value <= 12:
-                continue
-
-        if (
-            prev_raw
-            and re.fullmatch(r"\d{2}", prev_raw)
-            and prev_prev_raw
-            and re.fullmatch(r"\d{4}", prev_prev_raw)
-        ):
-            try:
-                month_val = int(prev_raw)
-                year_val = int(prev_prev_raw)
-            except ValueError:
-                month_val = 0
-                year_val = 0
-            if 1900 <= year_val <= 2100 and 1 <= month_val <= 12 and 1 <= value <= 31:
-                continue
-
-        prev_seg = (prev_raw or "").lower()
-        next_seg = (next_raw or "").lower()
-        next_next = (
-            segments[idx + 2].lower() if idx + 2 < len(segments) else ""
-        )
-
-        looks_like_size = False
-        if any(key in prev_seg for key in size_keywords) or any(
-            key in next_seg for key in size_keywords
-        ):
-            looks_like_size = True
-        image_pattern = r"\.(?:jpe?g|png|gif|webp|avif)(?:\?.*)?$"
-        if re.search(image_pattern, next_seg) or re.search(image_pattern, next_next):
-            looks_like_size = True
-
-        if not looks_like_size:
-            continue
-
-        segments[idx] = str(target)
-        changed = True
-
-    if not changed:
-        return u
-
-    new_path = "/".join(segments)
-    if path.startswith("/") and not new_path.startswith("/"):
-        new_path = "/" + new_path
-
-    parsed = parsed._replace(path=new_path)
-    return urlunparse(parsed)
+    return rewrite_cover_url(u, target, (GENERIC_PATH,))
 
 
 def sanitize_img_url(u: str) -> str:
@@ -408,13 +433,9 @@ def sanitize_img_url(u: str) -> str:
         else:
             u2 = u
         return f"{IMG_PROXY}{u2}"
-    u = _to_https(u)
-    # Rregullime specifike
-    u = guardian_upscale_url(u, target=IMG_TARGET_WIDTH)
-    # Rregullime të përgjithshme (WP/Shopify/Cloudinary query width)
-    u = _remove_wp_size_suffix(u)
-    u = _bump_path_width(u, IMG_TARGET_WIDTH)
-    u = _bump_width_query(u, IMG_TARGET_WIDTH)
+    # Guardian, Cloudinary, Shopify, WordPress and generic width upgrades
+    # (see autopost.cover_urls.DEFAULT_RULES).
+    u = rewrite_cover_url(_to_https(u), IMG_TARGET_WIDTH)
     if u.startswith("http://"):
         u = _proxy_if_mixed(u)
     return u
@@ -464,15 +485,75 @@ def slug_to_label(slug: str) -> str:
 TAXONOMY_FILE = DATA_DIR / "taxonomy.json"
 CATEGORY_TITLES: dict[str, str] = {}
 SUBCATEGORY_TITLES: dict[str, dict[str, str]] = {}
+# Posts normalized against a taxonomy carry its version so they are not
+# normalized again while held in memory (posts index, journal, deltas, the
+# daemon).  The stamp is internal: _public_entry strips it from everything
+# written to posts.json, the partitions and the archive.  Bump the revision
+# whenever the normalization rules themselves change.
+TAXONOMY_VERSION_FIELD = "taxonomy_version"
+_NORMALIZATION_REVISION = "1"
+TAXONOMY_VERSION = ""
 
 
-def _load_taxonomy_lookup() -> None:
-    CATEGORY_TITLES.clear()
-    SUBCATEGORY_TITLES.clear()
+def _taxonomy_version_for(raw: str) -> str:
+    digest = hashlib.sha1(f"{_NORMALIZATION_REVISION}:{raw}".encode("utf-8"))
+    return digest.hexdigest()[:12]
+
+
+# (mtime_ns, size) of the taxonomy file behind the compiled lookup tables, or
+# None until the tables are first needed.
+_TAXONOMY_STAT: Optional[tuple[int, int]] = None
 
+
+def _taxonomy_file_stat() -> tuple[int, int]:
+    try:
+        stat = TAXONOMY_FILE.stat()
+    except OSError:
+        return (0, 0)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def refresh_taxonomy() -> bool:
+    """Rebuild the taxonomy lookup tables if ``TAXONOMY_FILE`` changed.
+
+    The compiled tables are keyed by the file's mtime/size and by the hash of
+    its contents: an unchanged stat skips the read entirely, and a touched
+    but identical file skips the rebuild.  Returns ``True`` when rebuilt.
+    """
+
+    global _TAXONOMY_STAT
+    stat = _taxonomy_file_stat()
+    if stat == _TAXONOMY_STAT:
+        return False
     try:
         raw = TAXONOMY_FILE.read_text(encoding="utf-8")
     except OSError:
+        raw = ""
+    previous_stat = _TAXONOMY_STAT
+    _TAXONOMY_STAT = stat
+    if previous_stat is not None and _taxonomy_version_for(raw) == TAXONOMY_VERSION:
+        return False
+    _load_taxonomy_lookup(raw)
+    return True
+
+
+def _ensure_taxonomy() -> None:
+    if _TAXONOMY_STAT is None:
+        refresh_taxonomy()
+
+
+def _load_taxonomy_lookup(raw: Optional[str] = None) -> None:
+    global TAXONOMY_VERSION
+    CATEGORY_TITLES.clear()
+    SUBCATEGORY_TITLES.clear()
+
+    if raw is None:
+        try:
+            raw = TAXONOMY_FILE.read_text(encoding="utf-8")
+        except OSError:
+            raw = ""
+    TAXONOMY_VERSION = _taxonomy_version_for(raw)
+    if not raw:
         return
 
     try:
@@ -540,13 +621,11 @@ def _load_taxonomy_lookup() -> None:
         walk(entry)
 
 
-_load_taxonomy_lookup()
-
-
 def taxonomy_title_for_slug(slug: str) -> str:
     slug_norm = slugify_taxonomy(slug)
     if not slug_norm:
         return ""
+    _ensure_taxonomy()
     return CATEGORY_TITLES.get(slug_norm) or slug_to_label(slug_norm)
 
 
@@ -572,6 +651,7 @@ def subcategory_label_from_slug(slug: str, parent_slug: str = "") -> str:
         return ""
     parent_norm = slugify_taxonomy(parent_slug)
     child_norm = slugify_taxonomy(segments[-1])
+    _ensure_taxonomy()
     if parent_norm and child_norm:
         label = SUBCATEGORY_TITLES.get(parent_norm, {}).get(child_norm)
         if label:
@@ -602,6 +682,7 @@ def split_category_slug(slug: str) -> tuple[str, str]:
     cat_slug = segments[0]
     sub_slug = ""
     if len(segments) > 1:
+        _ensure_taxonomy()
         chosen_parent = ""
         chosen_child = ""
         for idx in range(len(segments) - 1):
@@ -635,15 +716,20 @@ def _normalize_label_from_slug(label: str, slug: str, parent_slug: str = "") ->
     return label
 
 
-def _normalize_post_entry(entry):
-    if not isinstance(entry, dict):
-        return None
+@functools.lru_cache(maxsize=1 << 12)
+def _normalize_taxonomy_fields(
+    category: str, subcategory: str, category_slug: str, taxonomy_version: str
+) -> tuple[str, str, str]:
+    """Return canonical ``(category, subcategory, category_slug)`` values.
 
-    normalized = dict(entry)
+    Posts share a handful of category triples, so results are memoized per
+    distinct triple; ``taxonomy_version`` keys out results computed against
+    an older taxonomy.
+    """
 
-    category = (normalized.get("category") or "").strip()
-    subcategory = (normalized.get("subcategory") or "").strip()
-    category_slug = (normalized.get("category_slug") or "").strip().strip("/")
+    category = category.strip()
+    subcategory = subcategory.strip()
+    category_slug = category_slug.strip().strip("/")
 
     if category and "/" in category:
         parts = [p.strip() for p in category.split("/") if p.strip()]
@@ -681,7 +767,25 @@ def _normalize_post_entry(entry):
         slug_parts.append(cat_slug)
     if sub_slug:
         slug_parts.append(sub_slug)
-    category_slug = "/".join(slug_parts)
+    return category, subcategory, "/".join(slug_parts)
+
+
+def _normalize_post_entry(entry):
+    if not isinstance(entry, dict):
+        return None
+
+    _ensure_taxonomy()
+    # Entries stamped with the current taxonomy version are already canonical.
+    if entry.get(TAXONOMY_VERSION_FIELD) == TAXONOMY_VERSION:
+        return entry
+
+    normalized = dict(entry)
+    category, subcategory, category_slug = _normalize_taxonomy_fields(
+        normalized.get("category") or "",
+        normalized.get("subcategory") or "",
+        normalized.get("category_slug") or "",
+        TAXONOMY_VERSION,
+    )
 
     normalized["category"] = category
     normalized["subcategory"] = subcategory
@@ -689,11 +793,25 @@ def _normalize_post_entry(entry):
         normalized["category_slug"] = category_slug
     else:
         normalized.pop("category_slug", None)
+    normalized[TAXONOMY_VERSION_FIELD] = TAXONOMY_VERSION
 
     return normalized
 
 
+def _public_entry(entry):
+    """Return ``entry`` without the internal taxonomy stamp, for the public files."""
+
+    if not isinstance(entry, dict) or TAXONOMY_VERSION_FIELD not in entry:
+        return entry
+    public = dict(entry)
+    del public[TAXONOMY_VERSION_FIELD]
+    return public
+
+
+@functools.lru_cache(maxsize=1 << 16)
 def _normalize_date_string(value: str) -> str:
+    # Memoized: feeds and posts.json repeat the same few raw date strings, and
+    # every sort, merge and partition pass asks for them again.
     value = (value or "").strip()
     if not value:
         return ""
@@ -739,9 +857,13 @@ def _normalize_date_string(value: str) -> str:
     return dt.astimezone(datetime.timezone.utc).date().isoformat()
 
 
-def parse_item_date(it_elem) -> str:
+def parse_item_date(it_elem, default: Optional[str] = None) -> str:
+    """Return the item's date as ``YYYY-MM-DD``, or ``default`` (today) if it has none."""
+
+    if default is None:
+        default = today_iso()
     if it_elem is None:
-        return today_iso()
+        return default
 
     candidates = []
     def _append_candidate(value):
@@ -766,7 +888,7 @@ def parse_item_date(it_elem) -> str:
         if normalized:
             return normalized
 
-    return today_iso()
+    return default
 
 
 def _entry_sort_key(entry) -> str:
@@ -781,87 +903,269 @@ def _entry_sort_key(entry) -> str:
 def today_iso() -> str:
     return datetime.datetime.utcnow().strftime("%Y-%m-%d")
 
-def run_pull_news(config: PullNewsConfig) -> PullNewsResult:
-    """Execute the pull-news workflow with an explicit configuration.
 
-    ``autopost/pull_project.py`` can import this helper to drive the pipeline
-    with project-specific command-line arguments instead of relying solely on
-    environment variables.
+def _partition_month_key(entry: dict, default_month: str) -> str:
+    raw_date = str(entry.get("date") or "").strip()
+    normalized_date = _normalize_date_string(raw_date) or today_iso()
+    month_key = normalized_date[:7]
+    if not re.match(r"^\d{4}-\d{2}$", month_key):
+        month_key = default_month
+    return month_key
+
+
+def _partition_category_slug(entry: dict) -> str:
+    raw_category_slug = (entry.get("category_slug") or "").strip()
+    cat_slug, _ = split_category_slug(raw_category_slug)
+    if not cat_slug:
+        cat_slug = slugify_taxonomy(entry.get("category") or "")
+    cat_slug = slugify_taxonomy(cat_slug)
+    return cat_slug or "uncategorized"
+
+
+class _PartitionWriter:
+    """Write ``data/posts/<category>/<month>.json`` files from a sorted stream.
+
+    Entries arrive newest first, so a month's entries are contiguous and only
+    the current month is buffered.  A month that shows up again later (e.g.
+    undated entries filed under the current month) is merged into the file
+    already written for it.  Files are staged in ``<posts_root>.partial`` and
+    only moved into ``posts_root`` by :meth:`close`; :meth:`abort` drops them.
     """
 
-    data_dir = pathlib.Path(config.data_dir)
-    posts_json_path = pathlib.Path(config.posts_json)
-    seen_db_path = pathlib.Path(config.seen_db)
-    feeds_file = pathlib.Path(config.feeds)
-    category_filter = (config.category or "").strip()
-    try:
-        max_per_feed = int(config.max_per_feed)
-    except (TypeError, ValueError):
-        max_per_feed = MAX_PER_FEED
-    try:
-        max_per_cat = int(config.max_per_category)
-    except (TypeError, ValueError):
-        max_per_cat = MAX_PER_CAT
+    def __init__(self, posts_root: pathlib.Path):
+        self.posts_root = posts_root
+        self.staging = posts_root.with_name(posts_root.name + ".partial")
+        shutil.rmtree(self.staging, ignore_errors=True)
+        self.default_month = today_iso()[:7]
+        self._month = ""
+        self._buffer: dict[str, list[dict]] = defaultdict(list)
+        self._written: set[pathlib.Path] = set()
+        self._category_months: dict[str, set[str]] = {}
+        self._category_counts: dict[str, int] = {}
+
+    def add(self, entry: dict) -> None:
+        if not isinstance(entry, dict):
+            return
+        month_key = _partition_month_key(entry, self.default_month)
+        if month_key != self._month:
+            self._flush()
+            self._month = month_key
+        cat_slug = _partition_category_slug(entry)
+        self._buffer[cat_slug].append(entry)
+        self._buffer["all"].append(entry)
+
+    def _flush(self) -> None:
+        if not self._buffer:
+            return
+        month_key = self._month
+        for category_slug, entries in self._buffer.items():
+            relative = pathlib.Path(category_slug) / f"{month_key}.json"
+            category_file = self.staging / relative
+            category_file.parent.mkdir(exist_ok=True, parents=True)
+            if relative in self._written:
+                previous = json.loads(category_file.read_text(encoding="utf-8"))
+                entries = previous + entries
+            atomic_write_text(category_file, json.dumps(entries, ensure_ascii=False, indent=2))
+            self._written.add(relative)
+            self._category_months.setdefault(category_slug, set()).add(month_key)
+            self._category_counts[category_slug] = (
+                self._category_counts.get(category_slug, 0) + len(self._buffer[category_slug])
+            )
+        self._buffer = defaultdict(list)
+
+    def abort(self) -> None:
+        """Discard the staged files, leaving ``posts_root`` untouched."""
+
+        self._buffer = defaultdict(list)
+        shutil.rmtree(self.staging, ignore_errors=True)
+
+    def close(self) -> None:
+        """Flush the last month, move the files in, write the manifest and prune stale files."""
+
+        self._flush()
+        expected_files = set()
+        for relative in sorted(self._written):
+            target = self.posts_root / relative
+            target.parent.mkdir(exist_ok=True, parents=True)
+            os.replace(self.staging / relative, target)
+            expected_files.add(target.resolve())
+        shutil.rmtree(self.staging, ignore_errors=True)
+
+        manifest_categories = {}
+        for category_slug in sorted(self._category_months):
+            months_sorted = sorted(self._category_months[category_slug], reverse=True)
+            manifest_categories[category_slug] = {
+                "months": months_sorted,
+                "count": self._category_counts.get(category_slug, 0),
+            }
+
+        manifest_path = self.posts_root / "manifest.json"
+        manifest_payload = {
+            "generated_at": datetime.datetime.utcnow().replace(microsecond=0).isoformat() + "Z",
+            "categories": manifest_categories,
+        }
+        atomic_write_text(manifest_path, json.dumps(manifest_payload, ensure_ascii=False, indent=2))
+        expected_files.add(manifest_path.resolve())
+
+        existing_files = [
+            path.resolve()
+            for path in self.posts_root.rglob("*.json")
+            if path.is_file()
+        ]
+        for path in existing_files:
+            if path not in expected_files:
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+
+        for directory in sorted(
+            self.posts_root.glob("**"), key=lambda p: len(p.parts), reverse=True
+        ):
+            if directory == self.posts_root or not directory.is_dir():
+                continue
+            try:
+                next(directory.iterdir())
+            except StopIteration:
+                try:
+                    directory.rmdir()
+                except OSError:
+                    pass
+
+
+def _persist_posts(
+    entries,
+    *,
+    posts_json_path: pathlib.Path,
+    data_dir: pathlib.Path,
+    max_posts_persist: int,
+    archive_cold_after_months: int,
+    keep_index: bool,
+) -> list[dict]:
+    """Write posts.json, the monthly partitions and the archive in one pass.
+
+    ``entries`` must be sorted newest first and may be a lazy iterator.  The
+    entries beyond ``max_posts_persist`` are archived.  Only when
+    ``keep_index`` is set is the persisted index collected and returned.
+    """
+
+    posts_root = data_dir / "posts"
+    posts_root.mkdir(exist_ok=True, parents=True)
+    partitions = _PartitionWriter(posts_root)
+    writer = JsonArrayWriter(posts_json_path)
+    kept: list[dict] = []
+    dropped_entries: list[dict] = []
+
     try:
-        max_total = int(config.max_total)
-    except (TypeError, ValueError):
-        max_total = MAX_TOTAL
-    target_words = config.target_words
-    if not isinstance(target_words, int):
-        try:
-            target_words = int(target_words)
-        except (TypeError, ValueError):
-            target_words = 0
-    if target_words <= 0:
-        target_words = SUMMARY_WORDS
+        for position, item in enumerate(entries):
+            if max_posts_persist > 0 and position >= max_posts_persist:
+                dropped_entries.append(_public_entry(item))
+                continue
+            entry = _normalize_post_entry(item)
+            if entry is None:
+                continue
+            public = _public_entry(entry)
+            writer.write(public)
+            partitions.add(public)
+            if keep_index:
+                kept.append(entry)
+    except BaseException:
+        writer.abort()
+        partitions.abort()
+        raise
+
+    append_entries_to_archive(
+        data_dir / "archive",
+        dropped_entries,
+        normalize_date=_normalize_date_string,
+        default_month=today_iso()[:7],
+        cold_after_months=archive_cold_after_months,
+    )
+    writer.close()
+    partitions.close()
+    return kept
+
+
+def _iter_posts_file(posts_json_path: pathlib.Path):
+    """Yield normalized entries from ``posts.json`` without loading it whole."""
+
+    for item in iter_json_array(posts_json_path):
+        normalized = _normalize_post_entry(item)
+        if normalized is not None:
+            yield normalized
+
+
+def _persist_posts_streaming(
+    new_entries_sorted: list[dict],
+    *,
+    posts_json_path: pathlib.Path,
+    data_dir: pathlib.Path,
+    max_posts_persist: int,
+    archive_cold_after_months: int,
+    dropped: frozenset = frozenset(),
+) -> list[dict]:
+    """Merge sorted new entries into posts.json while streaming the old file.
+
+    Memory stays proportional to the new entries plus one month partition
+    instead of the whole corpus.  An unreadable posts.json is treated as
+    empty, matching the in-memory path.  Old posts whose link hash is in
+    ``dropped`` are left out.
+    """
+
+    persist = functools.partial(
+        _persist_posts,
+        posts_json_path=posts_json_path,
+        data_dir=data_dir,
+        max_posts_persist=max_posts_persist,
+        archive_cold_after_months=archive_cold_after_months,
+        keep_index=False,
+    )
+    existing = _iter_posts_file(posts_json_path)
+    if dropped:
+        existing = (
+            item for item in existing
+            if link_hash(item.get("source") or "") not in dropped
+        )
+    merged = heapq.merge(
+        new_entries_sorted,
+        existing,
+        key=_entry_sort_key,
+        reverse=True,
+    )
     try:
-        max_posts_persist = int(config.max_posts_persist)
-    except (TypeError, ValueError):
-        max_posts_persist = MAX_POSTS_PERSIST
+        return persist(merged)
+    except json.JSONDecodeError:
+        print("[WARN] posts.json is malformed; rewriting it from this run's entries")
+        return persist(iter(new_entries_sorted))
 
-    data_dir.mkdir(exist_ok=True, parents=True)
-    seen_db_path.parent.mkdir(exist_ok=True, parents=True)
 
-    if seen_db_path.exists():
-        try:
-            seen = json.loads(seen_db_path.read_text(encoding="utf-8"))
-            if not isinstance(seen, dict):
-                seen = {}
-        except json.JSONDecodeError:
-            seen = {}
-    else:
-        seen = {}
+@dataclass
+class FeedSpec:
+    """One feeds-file line with its category labels already normalized."""
 
-    if posts_json_path.exists():
-        try:
-            posts_idx = json.loads(posts_json_path.read_text(encoding="utf-8"))
-            if not isinstance(posts_idx, list):
-                posts_idx = []
-        except json.JSONDecodeError:
-            posts_idx = []
-    else:
-        posts_idx = []
+    url: str
+    category_label: str
+    subcategory_label: str
+    category_slug: str
+    cat_slug: str
 
-    posts_idx = [
-        normalized for normalized in (
-            _normalize_post_entry(item) for item in posts_idx
-        )
-        if normalized is not None
-    ]
+    @property
+    def limit_key(self) -> str:
+        return self.cat_slug or slugify_taxonomy(self.category_label) or (self.category_label or "_")
 
-    new_entries: list[dict] = []
-    
-    if not feeds_file.exists():
-        print("ERROR: feeds file not found:", feeds_file)
-        return PullNewsResult(added_count=0, new_entries=[], posts_index=posts_idx)
 
-    added_total = 0
-    per_cat: dict[str, int] = {}
-    per_feed_added: dict[str, int] = {}
+def load_feed_specs(feeds_file: pathlib.Path, category_filter: str = "") -> list[FeedSpec]:
+    """Parse ``feeds_file`` into :class:`FeedSpec` entries, in file order.
+
+    Lines whose category label differs from ``category_filter`` (when given)
+    are skipped.
+    """
+
+    specs: list[FeedSpec] = []
     current_sub_label = ""
     current_sub_slug = ""
 
-    for raw in feeds_file.read_text(encoding="utf-8").splitlines():
+    for raw in pathlib.Path(feeds_file).read_text(encoding="utf-8").splitlines():
         raw = raw.strip()
         if not raw:
             continue
@@ -945,292 +1249,1272 @@ def run_pull_news(config: PullNewsConfig) -> PullNewsResult:
         if category_filter and category_label != category_filter:
             continue
 
-        print(f"[FEED] {category_label} / {subcategory_label or '-'} -> {feed_url}")
-        xml = fetch_bytes(feed_url)
-        if not xml:
-            print("Feed empty:", feed_url)
-            continue
+        specs.append(
+            FeedSpec(
+                url=feed_url,
+                category_label=category_label,
+                subcategory_label=subcategory_label,
+                category_slug=category_slug_value,
+                cat_slug=cat_slug,
+            )
+        )
 
-        for it in parse_feed(xml):
-            if max_total > 0 and added_total >= max_total:
-                break
+    return specs
 
-            category_limit_key = (
-                cat_slug
-                or slugify_taxonomy(category_label)
-                or (category_label or "_")
-            )
-            if per_cat.get(category_limit_key, 0) >= max_per_cat:
-                continue
 
-            if max_per_feed > 0 and per_feed_added.get(feed_url, 0) >= max_per_feed:
-                continue
+@dataclass
+class _RunSettings:
+    """:class:`PullNewsConfig` values coerced to their expected types."""
+
+    data_dir: pathlib.Path
+    posts_json_path: pathlib.Path
+    seen_db_path: pathlib.Path
+    feeds_file: pathlib.Path
+    category_filter: str
+    max_per_feed: int
+    max_per_cat: int
+    max_total: int
+    target_words: int
+    max_posts_persist: int
+    archive_cold_after_months: int
+    streaming: bool
+    shard: Optional[tuple[int, int]]
+    shard_dir: pathlib.Path
+    delta: bool
+    delta_dir: pathlib.Path
+    time_budget: float
+    deadline: Optional[float]
+    commit_reserve: float
+    checkpoint: bool
+    resume: bool
+    freshness: bool
+    prefilter: bool
+    prefilter_rules: Optional[pathlib.Path]
+    negative_cache: bool
+    negative_backoff: float
+    negative_max_backoff: float
+    near_dup: bool
+    near_dup_threshold: float
+    near_dup_days: int
+    url_cache: bool
+    image_probe: bool
+    run_report: bool
+    profile: bool
+    run_metrics: bool
+    run_metrics_keep: int
+    search_index: bool
+    search_archive: bool
+
+
+def parse_shard(value: str) -> Optional[tuple[int, int]]:
+    """Parse ``"i/N"`` into ``(i, N)``; empty values mean "not sharded".
+
+    Raises :class:`ValueError` unless ``0 <= i < N``.
+    """
 
-            title = (it.get("title") or "").strip()
-            link  = (it.get("link") or "").strip()
-            if not title or not link:
-                continue
+    value = (value or "").strip()
+    if not value:
+        return None
+    index_str, sep, count_str = value.partition("/")
+    try:
+        index, count = int(index_str), int(count_str)
+    except ValueError:
+        raise ValueError(f"invalid shard {value!r}; expected i/N") from None
+    if not sep or count <= 0 or not 0 <= index < count:
+        raise ValueError(f"invalid shard {value!r}; expected 0 <= i < N")
+    return index, count
 
-            key = link_hash(link)
-            if key in seen:
-                continue
 
-            # 1) Body HTML
-            body_html, inner_img = extract_body_html(link)
+def feed_shard(feed_url: str, count: int) -> int:
+    """Return the shard (``0 <= shard < count``) that owns ``feed_url``."""
 
-            # Skip unavailable content
-            body_text = strip_text(body_html).lower()
-            if ("there was an error" in body_text or
-                "this content is not available" in body_text):
-                print(f"[SKIP] {link} -> unavailable content")
-                continue
+    digest = hashlib.sha1(normalize_link(feed_url).encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % count
 
-            # 2) Absolutize & sanitize
-            parsed = urlparse(link)
-            base = f"{parsed.scheme}://{parsed.netloc}"
-            body_html = absolutize(body_html, base)
-            body_html = sanitize_article_html(body_html)
-            
-            # 2.5) Neutralize layout-breaking container tags that may escape the card
-            # Remove opening/closing of layout containers but keep inner text
-            body_html = re.sub(r'(?is)</?(?:aside|section|header|footer|main)[^>]*>', '', body_html)
-            # Extra safety: drop stray closing html/body tags if any
-            body_html = re.sub(r'(?is)</?(?:html|body)[^>]*>', '', body_html)
-            
-
-            # 3) Trim to target word count while keeping whole blocks when possible
-            body_html = limit_words_html(body_html, target_words)
-
-            # 4) Cover image (cover only; images inside body removed)
-            cover = resolve_cover_url(
-                pick_largest_media_url(it.get("element"))
-                or find_cover_from_item(it.get("element"), link)
-                or inner_img
-                or ""
-            )
 
+def _coerce_int(value, default: int) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
 
-            # 5) Excerpt
-            first_p = re.search(r"(?is)<p[^>]*>(.*?)</p>", body_html or "")
-            excerpt = strip_text(first_p.group(1)) if first_p else (it.get("summary") or title)
-            if len(excerpt) > 280:
-                excerpt = excerpt[:277] + "…"
 
+def _coerce_float(value, default: float) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _resolve_settings(config: PullNewsConfig) -> _RunSettings:
+    target_words = config.target_words
+    if not isinstance(target_words, int):
+        target_words = _coerce_int(target_words, 0)
+    if target_words <= 0:
+        target_words = SUMMARY_WORDS
+
+    return _RunSettings(
+        data_dir=pathlib.Path(config.data_dir),
+        posts_json_path=pathlib.Path(config.posts_json),
+        seen_db_path=pathlib.Path(config.seen_db),
+        feeds_file=pathlib.Path(config.feeds),
+        category_filter=(config.category or "").strip(),
+        max_per_feed=_coerce_int(config.max_per_feed, MAX_PER_FEED),
+        max_per_cat=_coerce_int(config.max_per_category, MAX_PER_CAT),
+        max_total=_coerce_int(config.max_total, MAX_TOTAL),
+        target_words=target_words,
+        max_posts_persist=_coerce_int(config.max_posts_persist, MAX_POSTS_PERSIST),
+        archive_cold_after_months=_coerce_int(
+            config.archive_cold_after_months, ARCHIVE_COLD_AFTER_MONTHS
+        ),
+        streaming=bool(config.streaming),
+        shard=parse_shard(config.shard),
+        shard_dir=pathlib.Path(config.shard_dir),
+        delta=bool(config.delta),
+        delta_dir=pathlib.Path(config.delta_dir),
+        time_budget=max(0.0, _coerce_float(config.time_budget, 0.0)),
+        deadline=_coerce_float(config.deadline, 0.0) or None,
+        commit_reserve=max(0.0, _coerce_float(config.commit_reserve, COMMIT_RESERVE)),
+        checkpoint=bool(config.checkpoint),
+        resume=bool(config.resume),
+        freshness=bool(config.freshness),
+        prefilter=bool(config.prefilter),
+        prefilter_rules=pathlib.Path(config.prefilter_rules) if config.prefilter_rules else None,
+        negative_cache=bool(config.negative_cache),
+        negative_backoff=_coerce_float(config.negative_backoff, NEGATIVE_BACKOFF),
+        negative_max_backoff=_coerce_float(config.negative_max_backoff, NEGATIVE_MAX_BACKOFF),
+        near_dup=bool(config.near_dup),
+        near_dup_threshold=min(1.0, max(0.0, _coerce_float(config.near_dup_threshold, NEAR_DUP_THRESHOLD))),
+        near_dup_days=max(0, _coerce_int(config.near_dup_days, NEAR_DUP_DAYS)),
+        url_cache=bool(config.url_cache),
+        image_probe=bool(config.image_probe),
+        run_report=bool(config.run_report),
+        profile=bool(config.profile),
+        run_metrics=bool(config.run_metrics),
+        run_metrics_keep=max(1, _coerce_int(config.run_metrics_keep, RUN_METRICS_KEEP)),
+        search_index=bool(config.search_index),
+        search_archive=bool(config.search_archive),
+    )
+
+
+class _Quota:
+    """Publishing limits for one run: per category, per feed and in total."""
+
+    def __init__(self, max_per_cat: int, max_per_feed: int, max_total: int):
+        self.max_per_cat = max_per_cat
+        self.max_per_feed = max_per_feed
+        self.max_total = max_total
+        self.per_cat: dict[str, int] = {}
+        self.per_feed: dict[str, int] = {}
+        self.added_total = 0
+
+    @classmethod
+    def from_settings(cls, settings: _RunSettings) -> "_Quota":
+        return cls(settings.max_per_cat, settings.max_per_feed, settings.max_total)
 
-            body_final = (body_html or "") + f"""
+    def total_reached(self) -> bool:
+        return self.max_total > 0 and self.added_total >= self.max_total
+
+    def allows(self, category_key: str, feed_url: str) -> bool:
+        if self.per_cat.get(category_key, 0) >= self.max_per_cat:
+            return False
+        if self.max_per_feed > 0 and self.per_feed.get(feed_url, 0) >= self.max_per_feed:
+            return False
+        return True
+
+    def record(self, category_key: str, feed_url: str) -> None:
+        self.per_cat[category_key] = self.per_cat.get(category_key, 0) + 1
+        self.per_feed[feed_url] = self.per_feed.get(feed_url, 0) + 1
+        self.added_total += 1
+
+
+class _Deadline:
+    """Point after which a run stops starting new fetches."""
+
+    def __init__(self, stop_at: Optional[float], clock=None):
+        self.stop_at = stop_at
+        self.clock = clock or time.monotonic
+
+    @classmethod
+    def from_settings(cls, settings: _RunSettings) -> "_Deadline":
+        now = time.monotonic()
+        ends = []
+        if settings.time_budget > 0:
+            ends.append(now + settings.time_budget)
+        if settings.deadline:
+            ends.append(now + (settings.deadline - time.time()))
+        if not ends:
+            return cls(None)
+        return cls(min(ends) - settings.commit_reserve)
+
+    def expired(self) -> bool:
+        return self.stop_at is not None and self.clock() >= self.stop_at
+
+
+def _run_label(settings: _RunSettings) -> str:
+    """Name for per-run state files, distinct per category and shard."""
+
+    name = slugify_taxonomy(settings.category_filter) or "all"
+    if settings.shard is not None:
+        name += f"-shard-{settings.shard[0]}-of-{settings.shard[1]}"
+    return name
+
+
+def _negative_cache_for(settings: _RunSettings, name: str = "") -> Optional[NegativeCache]:
+    if not settings.negative_cache:
+        return None
+    path = settings.data_dir / "negative_cache" / f"{name or _run_label(settings)}.json"
+    return NegativeCache(
+        path,
+        backoff=settings.negative_backoff,
+        max_backoff=settings.negative_max_backoff,
+    )
+
+
+def _url_cache_for(settings: _RunSettings, name: str = "") -> Optional[UrlCache]:
+    if not settings.url_cache:
+        return None
+    return UrlCache(settings.data_dir / "url_cache" / f"{name or _run_label(settings)}.json")
+
+
+def _image_prober_for(settings: _RunSettings, name: str = "") -> Optional[ImageProber]:
+    if not settings.image_probe:
+        return None
+    return ImageProber(settings.data_dir / "image_probe" / f"{name or _run_label(settings)}.json")
+
+
+def _near_dup_index_for(settings: _RunSettings, posts_idx: list[dict], seen: dict) -> Optional[NearDuplicateIndex]:
+    """Index the stories of the last ``near_dup_days`` days, if enabled.
+
+    Streaming runs hold no posts index, so posts.json is streamed instead.
+    """
+
+    if not settings.near_dup:
+        return None
+    since = (datetime.date.today() - datetime.timedelta(days=settings.near_dup_days)).isoformat()
+    posts = _iter_recent_posts(settings.posts_json_path) if settings.streaming else posts_idx
+    return NearDuplicateIndex.from_history(posts, seen, since=since, threshold=settings.near_dup_threshold)
+
+
+def _iter_recent_posts(posts_json_path: pathlib.Path):
+    try:
+        yield from _iter_posts_file(posts_json_path)
+    except json.JSONDecodeError:
+        return
+
+
+class _RunJournal:
+    """Append-only JSON Lines log of the entries a run has completed.
+
+    Every line is one record in the shard/delta layout plus ``feed_url``
+    (and ``job`` while :attr:`job` is set, as ``pull_all`` does per category).
+    The journal is removed once the run's outputs are written, so one left
+    behind means the run died before committing.
+    """
+
+    def __init__(self, path: pathlib.Path):
+        self.path = pathlib.Path(path)
+        self.job = ""
+        self._handle = None
+
+    @classmethod
+    def for_settings(cls, settings: _RunSettings) -> "_RunJournal":
+        return cls(settings.data_dir / "journal" / f"{_run_label(settings)}.jsonl")
+
+    def replay(self) -> list[dict]:
+        """Return the journaled records; a torn last line is ignored."""
+
+        records = []
+        try:
+            with self.path.open("r", encoding="utf-8") as handle:
+                for line in handle:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        break
+                    if isinstance(record, dict) and isinstance(record.get("entry"), dict):
+                        records.append(record)
+        except OSError:
+            pass
+        return records
+
+    def open(self, resume: bool) -> list[dict]:
+        """Start journaling; return the records to resume from (if ``resume``)."""
+
+        records = self.replay() if resume else []
+        if not resume and self.path.exists():
+            print(f"[WARN] discarding unfinished run journal {self.path} (set RESUME=1 to continue it)")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Rewrite only the intact records so a torn tail cannot hide later appends.
+        atomic_write_text(
+            self.path,
+            "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records),
+        )
+        self._handle = self.path.open("a", encoding="utf-8")
+        return records
+
+    def append(self, records: list[dict]) -> None:
+        if self._handle is None or not records:
+            return
+        for record in records:
+            if self.job:
+                record = dict(record, job=self.job)
+            self._handle.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._handle.flush()
+        os.fsync(self._handle.fileno())
+
+    def discard(self) -> None:
+        """Close and delete the journal after the outputs were committed."""
+
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+        try:
+            self.path.unlink()
+        except OSError:
+            pass
+
+
+def _restore_journal(
+    journal: _RunJournal,
+    resume: bool,
+    *,
+    seen: dict,
+    new_entries: list[dict],
+    origins: Optional[list[tuple[int, ...]]] = None,
+    quota: Optional["_Quota"] = None,
+    job_quotas: Optional[dict[str, "_Quota"]] = None,
+) -> int:
+    """Open ``journal`` and fold its uncommitted entries back into the run state.
+
+    Restored entries count against ``quota``, or, for runs with several
+    jobs, against the quota in ``job_quotas`` named by the record's ``job``.
+    """
+
+    resumed = 0
+    for record in journal.open(resume):
+        entry = record["entry"]
+        key = record.get("link_hash") or link_hash(entry.get("source") or "")
+        if key in seen:
+            continue
+        new_entries.append(entry)
+        if origins is not None:
+            origins.append(tuple(record.get("order") or (len(origins), 0)))
+        seen[key] = record.get("seen") or {}
+        record_quota = quota if job_quotas is None else job_quotas.get(record.get("job") or "")
+        if record_quota is not None:
+            record_quota.record(entry_limit_key(entry), record.get("feed_url") or "")
+        resumed += 1
+    if resumed:
+        print(f"[RESUME] {resumed} entries restored from {journal.path}")
+    return resumed
+
+
+def _load_seen(seen_db_path: pathlib.Path) -> dict:
+    if not seen_db_path.exists():
+        return {}
+    try:
+        seen = json.loads(seen_db_path.read_text(encoding="utf-8"))
+    except json.JSONDecodeError:
+        return {}
+    return seen if isinstance(seen, dict) else {}
+
+
+def _load_posts_index(posts_json_path: pathlib.Path) -> list[dict]:
+    if posts_json_path.exists():
+        try:
+            posts_idx = json.loads(posts_json_path.read_text(encoding="utf-8"))
+            if not isinstance(posts_idx, list):
+                posts_idx = []
+        except json.JSONDecodeError:
+            posts_idx = []
+    else:
+        posts_idx = []
+
+    return [
+        normalized for normalized in (
+            _normalize_post_entry(item) for item in posts_idx
+        )
+        if normalized is not None
+    ]
+
+
+def fetch_feed_items(spec: FeedSpec, report: Optional[RunReport] = None) -> Optional[list]:
+    """Download and parse the feed behind ``spec``; ``None`` if it was empty."""
+
+    print(f"[FEED] {spec.category_label} / {spec.subcategory_label or '-'} -> {spec.url}")
+    host = _report_host(spec.url)
+    with timed(report, "feed_fetch", feed=spec.url, host=host):
+        xml = fetch_bytes(spec.url)
+    if not xml:
+        print("Feed empty:", spec.url)
+        if report is not None:
+            report.count("feed_errors", spec.url)
+        return None
+    if report is not None:
+        report.add_bytes("feeds", len(xml), feed=spec.url, host=host)
+    with timed(report, "parse", feed=spec.url, host=host):
+        items = parse_feed(xml)
+    if report is not None:
+        report.count("items", spec.url, len(items))
+    return items
+
+
+def _report_host(url: str) -> str:
+    return (urlparse(url).hostname or "").lower()
+
+
+def _extract_author_rights(it_elem, link: str) -> tuple[str, str]:
+    author = ""
+    rights = "Unknown"
+    if it_elem is not None:
+        a = it_elem.find("author")
+        if a is not None and (a.text or "").strip():
+            author = a.text.strip()
+        if not author:
+            ns_atom = {"atom": "http://www.w3.org/2005/Atom"}
+            an = it_elem.find("atom:author/atom:name", ns_atom)
+            if an is not None and (an.text or "").strip():
+                author = an.text.strip()
+        ns_dc = {"dc": "http://purl.org/dc/elements/1.1/"}
+        if not author:
+            c = it_elem.find("dc:creator", ns_dc)
+            if c is not None and (c.text or "").strip():
+                author = c.text.strip()
+        r = it_elem.find("dc:rights", ns_dc) or it_elem.find("copyright")
+        if r is not None and (r.text or "").strip():
+            rights = r.text.strip()
+
+    if not author:
+        host_fallback = (urlparse(link).hostname or "").lower().replace("www.", "")
+        pretty_site = host_fallback.split(".")[0].replace("-", " ").title() if host_fallback else ""
+        author = pretty_site or DEFAULT_AUTHOR
+    return author, rights
+
+
+def build_entry(
+    it: dict,
+    spec: FeedSpec,
+    target_words: int,
+    page: Optional[dict] = None,
+    covers: Optional[ImageProber] = None,
+    report: Optional[RunReport] = None,
+) -> Optional[dict]:
+    """Fetch, extract and clean the article behind feed item ``it``.
+
+    Returns the normalized post entry, or ``None`` when the article has to be
+    skipped: nothing could be extracted (the fetch failed or the page held no
+    article) or the publisher served an error page.  ``page`` receives the
+    final and canonical URL of the fetched article (see
+    :func:`extract_body_html`) and, for a skipped article, the ``skip``
+    reason (``"extract"`` or ``"unavailable"``); with ``covers`` the cover
+    is chosen by probing the candidate images (see
+    :func:`probe_cover_url`).  The time spent in each step is added to
+    ``report``.
+    """
+
+    title = (it.get("title") or "").strip()
+    link = (it.get("link") or "").strip()
+    host = _report_host(link)
+
+    # 1) Body HTML
+    if page is None and report is not None:
+        page = {}
+    if page is None:
+        body_html, inner_img = extract_body_html(link)
+    else:
+        started = (time.perf_counter(), time.process_time())
+        body_html, inner_img = extract_body_html(link, meta=page)
+        if report is not None:
+            timings = page.get("timings") or {
+                "article_fetch": (time.perf_counter() - started[0], time.process_time() - started[1]),
+            }
+            for stage, (wall, cpu) in timings.items():
+                report.record(stage, wall, cpu, feed=spec.url, host=host)
+            report.add_bytes("articles", int(page.get("bytes") or 0), feed=spec.url, host=host)
+
+    # Skip failed extractions and unavailable content
+    body_text = strip_text(body_html).lower()
+    if not body_text.strip():
+        print(f"[SKIP] {link} -> nothing extracted")
+        if page is not None:
+            page["skip"] = "extract"
+        return None
+    if ("there was an error" in body_text or
+        "this content is not available" in body_text):
+        print(f"[SKIP] {link} -> unavailable content")
+        if page is not None:
+            page["skip"] = "unavailable"
+        return None
+
+    with timed(report, "sanitize", feed=spec.url, host=host):
+        # 2) Absolutize & sanitize
+        parsed = urlparse(link)
+        base = f"{parsed.scheme}://{parsed.netloc}"
+        body_html = absolutize(body_html, base)
+        body_html = sanitize_article_html(body_html)
+
+        # 2.5) Neutralize layout-breaking container tags that may escape the card
+        # Remove opening/closing of layout containers but keep inner text
+        body_html = re.sub(r'(?is)</?(?:aside|section|header|footer|main)[^>]*>', '', body_html)
+        # Extra safety: drop stray closing html/body tags if any
+        body_html = re.sub(r'(?is)</?(?:html|body)[^>]*>', '', body_html)
+
+        # 3) Trim to target word count while keeping whole blocks when possible
+        body_html = limit_words_html(body_html, target_words)
+
+    # 4) Cover image (cover only; images inside body removed)
+    with timed(report, "cover", feed=spec.url, host=host):
+        cover = ""
+        item_cover = None
+        if covers is not None:
+            # find_cover_from_item also knows the page's og:image, which may be
+            # the only image a feed offers.
+            item_cover = find_cover_from_item(it.get("element"), link)
+            cover = probe_cover_url(media_candidates(it.get("element")) + [item_cover, inner_img], covers)
+        if not cover:
+            largest = pick_largest_media_url(it.get("element"))
+            if not largest and item_cover is None:
+                item_cover = find_cover_from_item(it.get("element"), link)
+            cover = resolve_cover_url(largest or item_cover or inner_img or "")
+
+    # 5) Excerpt
+    first_p = re.search(r"(?is)<p[^>]*>(.*?)</p>", body_html or "")
+    excerpt = strip_text(first_p.group(1)) if first_p else (it.get("summary") or title)
+    if len(excerpt) > 280:
+        excerpt = excerpt[:277] + "…"
+
+    body_final = (body_html or "") + f"""
 <p class="small text-muted mt-4">
   Source: <a href="{link}" target="_blank" rel="nofollow noopener noreferrer">Read the full article</a>
 </p>"""
 
-            # 8) Metadata (author/rights)
-            author = ""
-            rights = "Unknown"
-            it_elem = it.get("element")
-            if it_elem is not None:
-                a = it_elem.find("author")
-                if a is not None and (a.text or "").strip():
-                    author = a.text.strip()
-                if not author:
-                    ns_atom = {"atom": "http://www.w3.org/2005/Atom"}
-                    an = it_elem.find("atom:author/atom:name", ns_atom)
-                    if an is not None and (an.text or "").strip():
-                        author = an.text.strip()
-                ns_dc = {"dc": "http://purl.org/dc/elements/1.1/"}
-                if not author:
-                    c = it_elem.find("dc:creator", ns_dc)
-                    if c is not None and (c.text or "").strip():
-                        author = c.text.strip()
-                r = it_elem.find("dc:rights", ns_dc) or it_elem.find("copyright")
-                if r is not None and (r.text or "").strip():
-                    rights = r.text.strip()
-
-            if not author:
-                host_fallback = (urlparse(link).hostname or "").lower().replace("www.", "")
-                pretty_site = host_fallback.split(".")[0].replace("-", " ").title() if host_fallback else ""
-                author = pretty_site or DEFAULT_AUTHOR
-
-            date = parse_item_date(it_elem)
-            slug = slugify(title)[:70]
-            host = (urlparse(link).hostname or "").lower().replace("www.", "")
-            source_name = host.split(".")[0].replace("-", " ").title() if host else ""
-
-            entry = {
-                "slug": slug,
-                "title": title,
-                "category": category_label,
-                "subcategory": subcategory_label,
-                "category_slug": category_slug_value,
-                "date": date,
-                "excerpt": excerpt,
-                "cover": cover,
-                "source": link,
-                "source_domain": host,
-                "source_name": source_name,
-                "author": author,
-                "rights": rights,
-                "body": body_final
-            }
-            entry = _normalize_post_entry(entry)
-            if entry is None:
-                continue
+    # 8) Metadata (author/rights)
+    it_elem = it.get("element")
+    author, rights = _extract_author_rights(it_elem, link)
+
+    date = parse_item_date(it_elem)
+    slug = slugify(title)[:70]
+    host = (urlparse(link).hostname or "").lower().replace("www.", "")
+    source_name = host.split(".")[0].replace("-", " ").title() if host else ""
+
+    entry = {
+        "slug": slug,
+        "title": title,
+        "category": spec.category_label,
+        "subcategory": spec.subcategory_label,
+        "category_slug": spec.category_slug,
+        "date": date,
+        "excerpt": excerpt,
+        "cover": cover,
+        "source": link,
+        "source_domain": host,
+        "source_name": source_name,
+        "author": author,
+        "rights": rights,
+        "body": body_final
+    }
+    return _normalize_post_entry(entry)
 
-            new_entries.append(entry)
 
-            normalized_category_slug = entry.get("category_slug") or category_slug_value or cat_slug
-            normalized_category_label = entry.get("category") or category_label
-            normalized_subcategory_label = entry.get("subcategory") or subcategory_label
+def entry_limit_key(entry: dict) -> str:
+    """Return the top-level category key that ``entry`` counts against."""
 
-            seen[key] = {
-                "title": title,
-                "url": link,
-                "category": normalized_category_slug or slugify_taxonomy(normalized_category_label),
-                "subcategory": normalized_subcategory_label,
-                "created": date,
-            }
-            limit_key_final = split_category_slug(normalized_category_slug)[0] or category_limit_key
-            if not limit_key_final:
-                limit_key_final = slugify_taxonomy(normalized_category_label) or category_limit_key
-            per_cat[limit_key_final] = per_cat.get(limit_key_final, 0) + 1
-            per_feed_added[feed_url] = per_feed_added.get(feed_url, 0) + 1
-            added_total += 1
-            print(f"[{normalized_category_label}/{normalized_subcategory_label or '-'}] + {title}")
-
-    if new_entries:
-        posts_idx = new_entries + posts_idx
-        posts_idx.sort(key=_entry_sort_key, reverse=True)
-        dropped_entries: list[dict] = []
-        if max_posts_persist > 0 and len(posts_idx) > max_posts_persist:
-            dropped_entries = posts_idx[max_posts_persist:]
-            posts_idx = posts_idx[:max_posts_persist]
-
-        append_entries_to_archive(
-            data_dir / "archive",
-            dropped_entries,
-            normalize_date=_normalize_date_string,
-            default_month=today_iso()[:7],
-        )
+    category_slug = entry.get("category_slug") or ""
+    return (
+        split_category_slug(category_slug)[0]
+        or slugify_taxonomy(entry.get("category") or "")
+        or (entry.get("category") or "_")
+    )
 
-        posts_idx = [
-            normalized
-            for normalized in (_normalize_post_entry(item) for item in posts_idx)
-            if normalized is not None
-        ]
 
-        posts_json_path.write_text(
-            json.dumps(posts_idx, ensure_ascii=False, indent=2),
-            encoding="utf-8",
+def _register_entry(entry: dict, spec: FeedSpec, key: str, seen: dict, quota: _Quota) -> None:
+    """Record a freshly built ``entry`` in ``seen`` and against ``quota``."""
+
+    normalized_category_slug = entry.get("category_slug") or spec.category_slug or spec.cat_slug
+    normalized_category_label = entry.get("category") or spec.category_label
+    normalized_subcategory_label = entry.get("subcategory") or spec.subcategory_label
+
+    seen[key] = {
+        "title": entry.get("title"),
+        "url": entry.get("source"),
+        "category": normalized_category_slug or slugify_taxonomy(normalized_category_label),
+        "subcategory": normalized_subcategory_label,
+        "created": entry.get("date"),
+    }
+    limit_key_final = split_category_slug(normalized_category_slug)[0] or spec.limit_key
+    if not limit_key_final:
+        limit_key_final = slugify_taxonomy(normalized_category_label) or spec.limit_key
+    quota.record(limit_key_final, spec.url)
+    print(f"[{normalized_category_label}/{normalized_subcategory_label or '-'}] + {entry.get('title')}")
+
+
+def collect_feed_entries(
+    spec: FeedSpec,
+    items: list,
+    *,
+    seen: dict,
+    quota: _Quota,
+    target_words: int,
+    new_entries: list[dict],
+    deadline: Optional[_Deadline] = None,
+    prefilter: Optional[Prefilter] = None,
+    negative: Optional[NegativeCache] = None,
+    near_dups: Optional[NearDuplicateIndex] = None,
+    urls: Optional[UrlCache] = None,
+    covers: Optional[ImageProber] = None,
+    report: Optional[RunReport] = None,
+) -> bool:
+    """Turn unseen ``items`` of one feed into entries, honouring ``quota``.
+
+    Items ``urls`` knows as aliases of a published story, that ``prefilter``
+    rejects, whose earlier failure ``negative`` still backs off, or that
+    ``near_dups`` matches to a known story are skipped before their page is
+    fetched.  Returns ``False`` when ``deadline`` passed before every item
+    was handled.
+    """
+
+    for it in items:
+        if quota.total_reached():
+            break
+        if not quota.allows(spec.limit_key, spec.url):
+            continue
+
+        title = (it.get("title") or "").strip()
+        link = (it.get("link") or "").strip()
+        if not title or not link:
+            continue
+
+        key = link_hash(link)
+        if _is_seen(key, seen, report, spec.url):
+            continue
+        if urls is not None and _is_known_alias(urls, key, link, seen):
+            continue
+        if negative is not None and negative.blocked(key, link):
+            continue
+        if prefilter is not None and _prefilter_rejects(prefilter, it, link):
+            continue
+        if near_dups is not None and _is_near_duplicate(near_dups, it, link):
+            continue
+        if deadline is not None and deadline.expired():
+            return False
+
+        entry = _build_checked(
+            it, spec, target_words, key, link, seen,
+            negative=negative, urls=urls, covers=covers, report=report,
         )
-        posts_root = data_dir / "posts"
-        posts_root.mkdir(exist_ok=True, parents=True)
+        if entry is None:
+            continue
+
+        new_entries.append(entry)
+        _register_entry(entry, spec, key, seen, quota)
+        if near_dups is not None:
+            near_dups.add(link, title, it.get("summary") or "")
+    return True
+
+
+def _build_checked(
+    it: dict,
+    spec: FeedSpec,
+    target_words: int,
+    key: str,
+    link: str,
+    seen: dict,
+    *,
+    negative: Optional[NegativeCache] = None,
+    urls: Optional[UrlCache] = None,
+    covers: Optional[ImageProber] = None,
+    report: Optional[RunReport] = None,
+) -> Optional[dict]:
+    """:func:`build_entry`, feeding what the fetch revealed back into the caches.
+
+    Skipped articles are recorded in ``negative`` under their skip reason.
+    The final and canonical URL of the page are recorded in ``urls``; the
+    entry is dropped when its canonical URL was already published under
+    another link.  Exceptions still propagate and abort the run; they are not
+    recorded, so the next run fetches the item again.
+    """
 
-        grouped_entries: dict[tuple[str, str], list[dict]] = defaultdict(list)
-        category_months: dict[str, set[str]] = {}
-        category_counts: dict[str, int] = {}
+    page: dict = {}
+    entry = build_entry(it, spec, target_words, page, covers, report=report)
+    reason = page.get("skip") or "unavailable"
+    if report is not None:
+        report.count("fetched", spec.url)
+        if entry is None:
+            report.skip(reason)
+            report.count("failed", spec.url)
+    if negative is not None:
+        if entry is None:
+            retry_at = negative.record_failure(key, link, reason)
+            print(f"[BACKOFF] {link} -> retry after {_format_retry(retry_at)}")
+        else:
+            negative.clear(key)
+    if entry is None or urls is None or not page.get("final_url"):
+        if entry is not None and report is not None:
+            report.count("added", spec.url)
+        return entry
+
+    final_url = page.get("final_url") or link
+    canonical = normalize_link(page.get("canonical_url") or final_url)
+    canonical_key = link_hash(canonical)
+    urls.learn(canonical_key, canonical, {key, link_hash(final_url)})
+    original = urls.claim(canonical_key, key, seen)
+    if original is not None:
+        print(f"[SKIP] {link} -> already published as {original}")
+        return None
+    if report is not None:
+        report.count("added", spec.url)
+    return entry
+
+
+def _is_seen(key: str, seen: dict, report: Optional[RunReport], feed: str) -> bool:
+    hit = key in seen
+    if report is not None:
+        if report.cache("seen", hit):
+            report.skip("seen")
+        else:
+            report.count("new", feed)
+    return hit
+
+
+def _is_known_alias(urls: UrlCache, key: str, link: str, seen: dict) -> bool:
+    original = urls.published_as(key, seen)
+    if original is None:
+        return False
+    print(f"[SKIP] {link} -> alias of {original}")
+    return True
 
-        def _record_entry(category_slug: str, month_key: str, entry: dict) -> None:
-            if not category_slug or not month_key:
-                return
-            grouped_entries[(category_slug, month_key)].append(entry)
-            category_months.setdefault(category_slug, set()).add(month_key)
-            category_counts[category_slug] = category_counts.get(category_slug, 0) + 1
 
-        default_month = today_iso()[:7]
+def _format_retry(timestamp: float) -> str:
+    moment = datetime.datetime.fromtimestamp(timestamp, datetime.timezone.utc)
+    return moment.strftime("%Y-%m-%dT%H:%M:%SZ")
 
-        for entry in posts_idx:
-            if not isinstance(entry, dict):
+
+def _prefilter_rejects(prefilter: Prefilter, it: dict, link: str) -> bool:
+    rule = prefilter.reject(it, link, lambda: parse_item_date(it.get("element")))
+    if rule is None:
+        return False
+    print(f"[SKIP] {link} -> {rule}")
+    return True
+
+
+def _is_near_duplicate(near_dups: NearDuplicateIndex, it: dict, link: str) -> bool:
+    original = near_dups.match(it.get("title") or "", it.get("summary") or "")
+    if original is None:
+        return False
+    print(f"[SKIP] {link} -> near duplicate of {original}")
+    return True
+
+
+def _freshness_rank(date: str) -> int:
+    """Sort key for ``YYYY-MM-DD`` dates: smaller is newer, undated (``""``) last."""
+
+    digits = re.sub(r"\D", "", date or "")[:8]
+    return -int(digits) if digits else 0
+
+
+def collect_fresh_entries(
+    feeds: list,
+    *,
+    seen: dict,
+    quota: _Quota,
+    target_words: int,
+    new_entries: list[dict],
+    origins: Optional[list[tuple[int, ...]]] = None,
+    deadline: Optional[_Deadline] = None,
+    journal: Optional[_RunJournal] = None,
+    prefilter: Optional[Prefilter] = None,
+    negative: Optional[NegativeCache] = None,
+    near_dups: Optional[NearDuplicateIndex] = None,
+    urls: Optional[UrlCache] = None,
+    covers: Optional[ImageProber] = None,
+    report: Optional[RunReport] = None,
+) -> list[str]:
+    """Publish the freshest unseen items of all ``feeds`` within ``quota``.
+
+    ``feeds`` holds ``(feed_index, spec, items)`` triples.  Candidates are
+    taken newest first by :func:`parse_item_date`; on equal dates each
+    feed's higher-ranked item goes first, then feeds-file order, so one busy
+    feed cannot crowd out the others.  Only items the quota admits are
+    downloaded and extracted.  Returns the URLs of the feeds that still had
+    candidates when ``deadline`` passed.
+    """
+
+    heap = []
+    for feed_index, spec, items in feeds:
+        rank = 0
+        for it in items:
+            title = (it.get("title") or "").strip()
+            link = (it.get("link") or "").strip()
+            if not title or not link:
+                continue
+            key = link_hash(link)
+            if _is_seen(key, seen, report, spec.url):
                 continue
-            raw_date = str(entry.get("date") or "").strip()
-            normalized_date = _normalize_date_string(raw_date) or today_iso()
-            month_key = normalized_date[:7]
-            if not re.match(r"^\d{4}-\d{2}$", month_key):
-                month_key = default_month
-
-            raw_category_slug = (entry.get("category_slug") or "").strip()
-            cat_slug, _ = split_category_slug(raw_category_slug)
-            if not cat_slug:
-                cat_slug = slugify_taxonomy(entry.get("category") or "")
-            cat_slug = slugify_taxonomy(cat_slug)
-            if not cat_slug:
-                cat_slug = "uncategorized"
-
-            _record_entry(cat_slug, month_key, entry)
-            _record_entry("all", month_key, entry)
+            if negative is not None and negative.blocked(key, link):
+                continue
+            if prefilter is not None and _prefilter_rejects(prefilter, it, link):
+                continue
+            # Undated items would otherwise get today's display date and jump the queue.
+            fresh = _freshness_rank(parse_item_date(it.get("element"), default=""))
+            heap.append((fresh, rank, feed_index, key, spec, it))
+            rank += 1
+    heapq.heapify(heap)
+
+    while heap and not quota.total_reached():
+        fresh, rank, feed_index, key, spec, it = heapq.heappop(heap)
+        if key in seen or not quota.allows(spec.limit_key, spec.url):
+            continue
+        if deadline is not None and deadline.expired():
+            pending = {spec.url} | {candidate[4].url for candidate in heap}
+            return [s.url for _, s, _ in feeds if s.url in pending]
 
-        expected_files = set()
+        link = (it.get("link") or "").strip()
+        # Checked here, not while gathering, so copies within this run count.
+        if urls is not None and _is_known_alias(urls, key, link, seen):
+            continue
+        if near_dups is not None and _is_near_duplicate(near_dups, it, link):
+            continue
+        entry = _build_checked(
+            it, spec, target_words, key, link, seen,
+            negative=negative, urls=urls, covers=covers, report=report,
+        )
+        if entry is None:
+            continue
 
-        for category_slug in sorted(category_months):
-            months_sorted = sorted(category_months[category_slug], reverse=True)
-            category_dir = posts_root / category_slug
-            category_dir.mkdir(exist_ok=True, parents=True)
-            for month_key in months_sorted:
-                entries = grouped_entries.get((category_slug, month_key), [])
-                category_file = category_dir / f"{month_key}.json"
-                category_file.write_text(
-                    json.dumps(entries, ensure_ascii=False, indent=2),
-                    encoding="utf-8",
-                )
-                expected_files.add(category_file.resolve())
+        new_entries.append(entry)
+        _register_entry(entry, spec, key, seen, quota)
+        if near_dups is not None:
+            near_dups.add(link, it.get("title") or "", it.get("summary") or "")
+        order = (fresh, rank, feed_index)
+        if origins is not None:
+            origins.append(order)
+        if journal is not None:
+            record = _run_records([entry], [order], seen)[0]
+            journal.append([dict(record, feed_url=spec.url)])
+    return []
+
+
+def _write_run_outputs(
+    settings: _RunSettings,
+    new_entries: list[dict],
+    posts_idx: list[dict],
+    seen: dict,
+    dropped: frozenset = frozenset(),
+) -> list[dict]:
+    """Persist posts.json, partitions, archive, search index and the seen DB; return the index.
+
+    Existing posts whose link hash is in ``dropped`` are removed.  The seen DB
+    is written last, so a run that dies before it may be resumed with entries
+    posts.json already holds; such an entry replaces its published copy
+    instead of being listed twice (the archive dedupes on its own).
+    """
 
-        manifest_categories = {}
-        for category_slug in sorted(category_months):
-            months_sorted = sorted(category_months[category_slug], reverse=True)
-            manifest_categories[category_slug] = {
-                "months": months_sorted,
-                "count": category_counts.get(category_slug, 0),
-            }
+    if new_entries or dropped:
+        removed = dropped | frozenset(
+            link_hash(entry["source"]) for entry in new_entries if entry.get("source")
+        )
+        if settings.streaming:
+            posts_idx = _persist_posts_streaming(
+                sorted(new_entries, key=_entry_sort_key, reverse=True),
+                posts_json_path=settings.posts_json_path,
+                data_dir=settings.data_dir,
+                max_posts_persist=settings.max_posts_persist,
+                archive_cold_after_months=settings.archive_cold_after_months,
+                dropped=removed,
+            )
+        else:
+            if removed:
+                posts_idx = [
+                    item for item in posts_idx
+                    if link_hash(item.get("source") or "") not in removed
+                ]
+            posts_idx = merge_sorted(posts_idx, new_entries, _entry_sort_key)
+            posts_idx = _persist_posts(
+                posts_idx,
+                posts_json_path=settings.posts_json_path,
+                data_dir=settings.data_dir,
+                max_posts_persist=settings.max_posts_persist,
+                archive_cold_after_months=settings.archive_cold_after_months,
+                keep_index=True,
+            )
+        if settings.search_index:
+            _update_search_index(settings, dropped)
+
+    atomic_write_text(settings.seen_db_path, json.dumps(seen, ensure_ascii=False, indent=2))
+    return posts_idx
+
+
+def _update_search_index(
+    settings: _RunSettings,
+    dropped: frozenset = frozenset(),
+    include_archive: Optional[bool] = None,
+) -> dict:
+    """Bring ``data/search/`` in line with posts.json (see :mod:`autopost.search_index`)."""
+
+    def keyed(entries):
+        for entry in entries:
+            yield link_hash(entry.get("source") or ""), entry
+
+    archived = None
+    if settings.search_archive if include_archive is None else include_archive:
+        archived = keyed(iter_archive_entries(settings.data_dir / "archive"))
+    stats = update_search_index(
+        settings.data_dir / "search",
+        keyed(_iter_posts_file(settings.posts_json_path)),
+        archived=archived,
+        dropped=dropped,
+    )
+    print(f"[SEARCH] +{stats['added']} -{stats['removed']} docs, {stats['written']} index files written")
+    return stats
+
+
+def _run_records(
+    new_entries: list[dict],
+    origins: Optional[list[tuple[int, ...]]],
+    seen: dict,
+) -> list[dict]:
+    """Describe each new entry with its link hash, feed position and seen record."""
+
+    records = []
+    for position, entry in enumerate(new_entries):
+        key = link_hash(entry.get("source") or "")
+        order = list(origins[position]) if origins else None
+        records.append({"link_hash": key, "order": order, "entry": entry, "seen": seen.get(key, {})})
+    return records
+
+
+def write_delta(
+    delta_dir: pathlib.Path,
+    records: list[dict],
+    *,
+    category: str = "",
+    dropped=(),
+) -> pathlib.Path:
+    """Write a self-describing delta file and return its path.
+
+    ``records`` use the shard record layout (``link_hash``, ``entry``,
+    ``seen``); ``dropped`` lists link hashes to remove from the published
+    posts.  File names sort in creation order, which is the order
+    ``autopost/apply_deltas.py`` folds them in.
+    """
 
-        manifest_path = posts_root / "manifest.json"
-        manifest_payload = {
-            "generated_at": datetime.datetime.utcnow().replace(microsecond=0).isoformat() + "Z",
-            "categories": manifest_categories,
-        }
-        manifest_path.write_text(
-            json.dumps(manifest_payload, ensure_ascii=False, indent=2),
-            encoding="utf-8",
+    now = datetime.datetime.utcnow()
+    label = slugify_taxonomy(category) or "all"
+    delta_id = f"{now.strftime('%Y%m%dT%H%M%S%fZ')}-{label}-{os.urandom(4).hex()}"
+    payload = {
+        "id": delta_id,
+        "generated_at": now.replace(microsecond=0).isoformat() + "Z",
+        "category": category,
+        "records": records,
+        "dropped": sorted(set(dropped)),
+    }
+    path = pathlib.Path(delta_dir) / f"{delta_id}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    atomic_write_text(path, json.dumps(payload, ensure_ascii=False, indent=2))
+    return path
+
+
+def _write_shard_result(
+    settings: _RunSettings,
+    new_entries: list[dict],
+    origins: list[tuple[int, ...]],
+    seen: dict,
+) -> pathlib.Path:
+    """Write this shard's entries and seen records for the merge step."""
+
+    shard_index, shard_count = settings.shard
+    label = slugify_taxonomy(settings.category_filter) or "all"
+    path = settings.shard_dir / f"{label}-shard-{shard_index}-of-{shard_count}.json"
+    payload = {
+        "shard": f"{shard_index}/{shard_count}",
+        "category": settings.category_filter,
+        "feeds": str(settings.feeds_file),
+        "generated_at": datetime.datetime.utcnow().replace(microsecond=0).isoformat() + "Z",
+        "records": _run_records(new_entries, origins, seen),
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    atomic_write_text(path, json.dumps(payload, ensure_ascii=False, indent=2))
+    return path
+
+
+def _prepare_run(settings: _RunSettings) -> tuple[dict, list[dict]]:
+    """Refresh the taxonomy, create output dirs and load seen/posts state."""
+
+    refresh_taxonomy()
+    settings.data_dir.mkdir(exist_ok=True, parents=True)
+    settings.seen_db_path.parent.mkdir(exist_ok=True, parents=True)
+    seen = _load_seen(settings.seen_db_path)
+    posts_idx = [] if settings.streaming else _load_posts_index(settings.posts_json_path)
+    return seen, posts_idx
+
+
+def run_pull_news(config: PullNewsConfig) -> PullNewsResult:
+    """Execute the pull-news workflow with an explicit configuration.
+
+    ``autopost/pull_project.py`` can import this helper to drive the pipeline
+    with project-specific command-line arguments instead of relying solely on
+    environment variables.  The run's timings and counters are returned as
+    ``PullNewsResult.report`` and, with ``run_report``, written to
+    ``data/reports/<run>.json``; ``profile`` dumps cProfile stats next to it.
+    With ``run_metrics`` a per-feed summary is appended to
+    ``data/metrics/<run>.jsonl`` (see :mod:`autopost.run_metrics`).
+    """
+
+    settings = _resolve_settings(config)
+    return _reported_run(settings, _run_label(settings), lambda report: _run_pull_news(settings, report))
+
+
+def _reported_run(
+    settings: _RunSettings,
+    label: str,
+    run: Callable[[RunReport], PullNewsResult],
+) -> PullNewsResult:
+    """Call ``run`` with a fresh report and publish it under ``label``.
+
+    Shared by :func:`run_pull_news` and :mod:`autopost.pull_all`: handles the
+    profiler, the skip counters of the result, the metrics line and the
+    report file.
+    """
+
+    report = RunReport(trace_memory=settings.run_report)
+    reports_dir = settings.data_dir / "reports"
+    profiler = None
+    if settings.profile:
+        import cProfile
+
+        profiler = cProfile.Profile()
+    report.start()
+    if profiler is not None:
+        profiler.enable()
+    try:
+        result = run(report)
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        report.finish()
+    if profiler is not None:
+        reports_dir.mkdir(parents=True, exist_ok=True)
+        profiler.dump_stats(str(reports_dir / f"{label}.pstats"))
+
+    for rule, count in result.prefilter_hits.items():
+        report.skip(f"prefilter:{rule}", count)
+    report.skip("backoff", sum(result.suppressed_hosts.values()))
+    report.skip("near_duplicate", result.near_duplicates)
+    report.skip("canonical_duplicate", result.canonical_duplicates)
+    result.report = report
+    if settings.run_metrics and report.feeds:
+        append_run(
+            settings.data_dir / "metrics" / f"{label}.jsonl",
+            run_record(report, label, result.added_count),
+            keep=settings.run_metrics_keep,
         )
-        expected_files.add(manifest_path.resolve())
+    if settings.run_report:
+        report.print_summary()
+        report_path = reports_dir / f"{label}.json"
+        report.write(report_path)
+        print(f"[REPORT] written to {report_path}")
+    return result
 
-        existing_files = [
-            path.resolve()
-            for path in posts_root.rglob("*.json")
-            if path.is_file()
-        ]
-        for path in existing_files:
-            if path not in expected_files:
-                try:
-                    path.unlink()
-                except OSError:
-                    pass
 
-        for directory in sorted(
-            posts_root.glob("**"), key=lambda p: len(p.parts), reverse=True
-        ):
-            if directory == posts_root or not directory.is_dir():
-                continue
-            try:
-                next(directory.iterdir())
-            except StopIteration:
-                try:
-                    directory.rmdir()
-                except OSError:
-                    pass
+def _run_pull_news(settings: _RunSettings, report: RunReport) -> PullNewsResult:
+    deadline = _Deadline.from_settings(settings)
+    seen, posts_idx = _prepare_run(settings)
+    new_entries: list[dict] = []
+    deferred: list[str] = []
 
-    seen_db_path.write_text(
-        json.dumps(seen, ensure_ascii=False, indent=2),
-        encoding="utf-8",
+    if not settings.feeds_file.exists():
+        print("ERROR: feeds file not found:", settings.feeds_file)
+        return PullNewsResult(added_count=0, new_entries=[], posts_index=posts_idx)
+
+    quota = _Quota.from_settings(settings)
+    # Position of each new entry in the run's consumption order ((feeds-file
+    # line, rank in feed), or (date, rank, line) in freshness mode), so the
+    # shard merge can replay the order an unsharded run would have used.
+    origins: list[tuple[int, ...]] = []
+    journal = _RunJournal.for_settings(settings) if settings.checkpoint else None
+    if journal is not None:
+        _restore_journal(journal, settings.resume, seen=seen, new_entries=new_entries, origins=origins, quota=quota)
+
+    prefilter = (
+        Prefilter.for_feeds(settings.feeds_file, settings.prefilter_rules) if settings.prefilter else None
     )
+    negative = _negative_cache_for(settings)
+    near_dups = _near_dup_index_for(settings, posts_idx, seen)
+    urls = _url_cache_for(settings)
+    covers = _image_prober_for(settings)
+    fresh_feeds = []
+    for feed_index, spec in enumerate(load_feed_specs(settings.feeds_file, settings.category_filter)):
+        if settings.shard is not None and feed_shard(spec.url, settings.shard[1]) != settings.shard[0]:
+            continue
+        if deadline.expired():
+            deferred.append(spec.url)
+            continue
+        items = fetch_feed_items(spec, report)
+        if items is None:
+            continue
+        if settings.freshness:
+            fresh_feeds.append((feed_index, spec, items))
+            continue
+        added_before = len(new_entries)
+        completed = collect_feed_entries(
+            spec,
+            items,
+            seen=seen,
+            quota=quota,
+            target_words=settings.target_words,
+            new_entries=new_entries,
+            deadline=deadline,
+            prefilter=prefilter,
+            negative=negative,
+            near_dups=near_dups,
+            urls=urls,
+            covers=covers,
+            report=report,
+        )
+        if not completed:
+            deferred.append(spec.url)
+        origins.extend((feed_index, rank) for rank in range(len(new_entries) - added_before))
+        if journal is not None:
+            records = _run_records(new_entries[added_before:], origins[added_before:], seen)
+            journal.append([dict(record, feed_url=spec.url) for record in records])
+    if fresh_feeds:
+        deferred.extend(
+            collect_fresh_entries(
+                fresh_feeds,
+                seen=seen,
+                quota=quota,
+                target_words=settings.target_words,
+                new_entries=new_entries,
+                origins=origins,
+                deadline=deadline,
+                journal=journal,
+                prefilter=prefilter,
+                negative=negative,
+                near_dups=near_dups,
+                urls=urls,
+                covers=covers,
+                report=report,
+            )
+        )
+    if deferred:
+        print(f"[DEADLINE] time budget reached; deferred {len(deferred)} feeds")
+    prefilter_hits = {}
+    if prefilter is not None:
+        prefilter.report()
+        prefilter_hits = dict(prefilter.hits)
+    suppressed_hosts = {}
+    if negative is not None:
+        negative.report()
+        negative.save()
+        suppressed_hosts = dict(negative.suppressed)
+    near_duplicates = near_dups.hits if near_dups is not None else 0
+    if near_duplicates:
+        print(f"[NEAR-DUP] skipped {near_duplicates} copies of known stories")
+    if covers is not None:
+        covers.save()
+        report.caches["image_probe"].update(hits=covers.hits, misses=covers.probed)
+        report.add_bytes("images", covers.bytes_read)
+    canonical_duplicates = 0
+    if urls is not None:
+        urls.save(seen)
+        canonical_duplicates = urls.skipped + urls.discarded
+        if canonical_duplicates:
+            print(
+                f"[CANONICAL] skipped {urls.skipped} known aliases before fetching, "
+                f"{urls.discarded} after"
+            )
+
+    if settings.shard is not None:
+        with report.stage("write"):
+            shard_path = _write_shard_result(settings, new_entries, origins, seen)
+        if journal is not None:
+            journal.discard()
+        print(f"New posts this shard: {len(new_entries)} -> {shard_path}")
+        return PullNewsResult(
+            added_count=len(new_entries),
+            new_entries=new_entries,
+            posts_index=posts_idx,
+            deferred_feeds=deferred,
+            prefilter_hits=prefilter_hits,
+            suppressed_hosts=suppressed_hosts,
+            near_duplicates=near_duplicates,
+            canonical_duplicates=canonical_duplicates,
+        )
+
+    if settings.delta:
+        with report.stage("write"):
+            delta_path = write_delta(
+                settings.delta_dir,
+                _run_records(new_entries, origins, seen),
+                category=settings.category_filter,
+            )
+        if journal is not None:
+            journal.discard()
+        print(f"New posts this run: {len(new_entries)} -> {delta_path}")
+        return PullNewsResult(
+            added_count=len(new_entries),
+            new_entries=new_entries,
+            posts_index=posts_idx,
+            deferred_feeds=deferred,
+            prefilter_hits=prefilter_hits,
+            suppressed_hosts=suppressed_hosts,
+            near_duplicates=near_duplicates,
+            canonical_duplicates=canonical_duplicates,
+        )
+
+    with report.stage("write"):
+        posts_idx = _write_run_outputs(settings, new_entries, posts_idx, seen)
+    if journal is not None:
+        journal.discard()
     print("New posts this run:", len(new_entries))
 
     return PullNewsResult(
         added_count=len(new_entries),
         new_entries=new_entries,
         posts_index=posts_idx,
+        deferred_feeds=deferred,
+        prefilter_hits=prefilter_hits,
+        suppressed_hosts=suppressed_hosts,
+        near_duplicates=near_duplicates,
+        canonical_duplicates=canonical_duplicates,
     )
 
 
-def main():
+def main(argv=None):
     """CLI entry point that uses environment driven defaults."""
 
-    return run_pull_news(PullNewsConfig())
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Pull feeds into data/posts.json.")
+    parser.add_argument(
+        "--shard",
+        default=None,
+        metavar="i/N",
+        help="only process feeds of shard i (0-based) of N and write a shard result file",
+    )
+    parser.add_argument(
+        "--delta",
+        action="store_true",
+        help="write a delta file for autopost/apply_deltas.py instead of the shared outputs",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="continue from the journal an interrupted run left in data/journal/",
+    )
+    args = parser.parse_args(argv)
+    config = PullNewsConfig()
+    if args.delta:
+        config.delta = True
+    if args.resume:
+        config.resume = True
+    if args.shard is not None:
+        try:
+            parse_shard(args.shard)
+        except ValueError as exc:
+            parser.error(str(exc))
+        config.shard = args.shard
+    return run_pull_news(config)
 
 if __name__ == "__main__": main()
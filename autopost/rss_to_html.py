@@ -13,6 +13,7 @@ if __package__ in (None, ""):
     sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
 
 from autopost.archive_utils import append_entries_to_archive
+from autopost.jsonio import atomic_write_text
 from autopost.common import (
     fetch_bytes,
     http_get,
@@ -417,8 +418,8 @@ def main():
         dropped_entries = posts_idx[MAX_POSTS_PERSIST:]
         posts_idx = posts_idx[:MAX_POSTS_PERSIST]
 
-    POSTS_JSON.write_text(json.dumps(posts_idx, ensure_ascii=False, indent=2), encoding="utf-8")
-    SEEN_DB.write_text(json.dumps(seen, ensure_ascii=False, indent=2), encoding="utf-8")
+    atomic_write_text(POSTS_JSON, json.dumps(posts_idx, ensure_ascii=False, indent=2))
+    atomic_write_text(SEEN_DB, json.dumps(seen, ensure_ascii=False, indent=2))
     append_entries_to_archive(
         DATA_DIR / "archive",
         dropped_entries,
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""History of run metrics and a report of feeds that got worse.
+
+Every :func:`autopost.pull_news.run_pull_news` run appends one line to
+``data/metrics/<run>.jsonl``, distilled from its
+:class:`autopost.run_report.RunReport`::
+
+    {"at": "2025-09-30T12:00:00+00:00", "run": "news", "duration": 81.2, "added": 12,
+     "feeds": {"https://example.com/rss": {"latency": 0.41, "wall": 9.2, "bytes": 210345,
+               "items": 25, "new": 4, "fetched": 4, "added": 3, "errors": 1}}}
+
+``latency`` is the feed download, ``wall`` everything spent on the feed's
+items, ``new`` the unseen items it offered and ``errors`` the failed feed
+download plus the articles skipped as unavailable.  Only the last
+``keep`` runs are kept.
+
+The report compares each feed's last ``recent`` runs with the ``window``
+runs before them and flags feeds whose median latency grew by
+``latency_factor`` (and by at least ``min_latency`` seconds), whose error
+rate (errors per request: the feed plus its fetched articles) rose by
+``error_increase``, and feeds that offered no new item in their last
+``stale_runs`` runs - candidates for pruning or a longer interval.
+
+Run:
+  python3 autopost/run_metrics.py                         # data/metrics/*.jsonl
+  python3 autopost/run_metrics.py --stale-runs 20 data/metrics/news.jsonl
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import pathlib
+import statistics
+import sys
+from dataclasses import dataclass
+from typing import Iterable, Optional, Sequence
+
+if __package__ in (None, ""):
+    sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+
+from autopost.jsonio import atomic_write_text
+from autopost.run_report import RunReport
+
+DEFAULT_KEEP = 500
+DEFAULT_RECENT = 3
+DEFAULT_WINDOW = 20
+DEFAULT_LATENCY_FACTOR = 2.0
+DEFAULT_MIN_LATENCY = 0.5
+DEFAULT_ERROR_INCREASE = 0.25
+DEFAULT_STALE_RUNS = 10
+
+
+@dataclass
+class FeedFlag:
+    feed: str
+    kind: str  # "latency", "errors" or "stale"
+    detail: str
+
+
+def run_record(report: RunReport, run: str, added: int) -> dict:
+    """Return the compact metrics line for one finished run."""
+
+    data = report.to_dict()
+    feeds = {}
+    for url, record in data["feeds"].items():
+        counts = record.get("counts") or {}
+        feeds[url] = {
+            "latency": (record["stages"].get("feed_fetch") or {}).get("wall", 0.0),
+            "wall": record["wall"],
+            "bytes": record["bytes"],
+            "items": counts.get("items", 0),
+            "new": counts.get("new", 0),
+            "fetched": counts.get("fetched", 0),
+            "added": counts.get("added", 0),
+            "errors": counts.get("feed_errors", 0) + counts.get("failed", 0),
+        }
+    return {
+        "at": data["started_at"],
+        "run": run,
+        "duration": data["wall_seconds"],
+        "added": added,
+        "feeds": feeds,
+    }
+
+
+def load_runs(paths: Iterable[pathlib.Path]) -> list[dict]:
+    """Return the readable run records of ``paths``, oldest first."""
+
+    runs = []
+    for path in paths:
+        try:
+            with pathlib.Path(path).open("r", encoding="utf-8") as handle:
+                for line in handle:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    if isinstance(record, dict) and isinstance(record.get("feeds"), dict):
+                        runs.append(record)
+        except OSError:
+            continue
+    runs.sort(key=lambda record: str(record.get("at") or ""))
+    return runs
+
+
+def append_run(path: pathlib.Path, record: dict, keep: int = DEFAULT_KEEP) -> None:
+    """Append ``record`` to ``path``, dropping all but the last ``keep`` runs."""
+
+    path = pathlib.Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    line = json.dumps(record, ensure_ascii=False, sort_keys=True) + "\n"
+    lines = []
+    try:
+        lines = path.read_text(encoding="utf-8").splitlines(keepends=True)
+    except OSError:
+        pass
+    if len(lines) < keep:
+        with path.open("a", encoding="utf-8") as handle:
+            handle.write(line)
+        return
+    kept = lines[len(lines) - keep + 1:] if keep > 1 else []
+    if kept and not kept[-1].endswith("\n"):
+        kept[-1] += "\n"
+    atomic_write_text(path, "".join(kept) + line)
+
+
+def _error_rate(samples: list[dict]) -> float:
+    requests = sum(1 + int(sample.get("fetched") or 0) for sample in samples)
+    return sum(int(sample.get("errors") or 0) for sample in samples) / requests if requests else 0.0
+
+
+def find_regressions(
+    runs: Sequence[dict],
+    *,
+    recent: int = DEFAULT_RECENT,
+    window: int = DEFAULT_WINDOW,
+    latency_factor: float = DEFAULT_LATENCY_FACTOR,
+    min_latency: float = DEFAULT_MIN_LATENCY,
+    error_increase: float = DEFAULT_ERROR_INCREASE,
+    stale_runs: int = DEFAULT_STALE_RUNS,
+) -> list[FeedFlag]:
+    """Flag the feeds of ``runs`` (oldest first) that regressed or went quiet."""
+
+    history: dict[str, list[dict]] = {}
+    for run in runs:
+        for url, sample in run["feeds"].items():
+            if isinstance(sample, dict):
+                history.setdefault(url, []).append(sample)
+
+    flags = []
+    for url, samples in history.items():
+        latest, before = samples[-recent:], samples[:-recent][-window:]
+        if len(latest) == recent and before:
+            now = statistics.median(float(s.get("latency") or 0) for s in latest)
+            then = statistics.median(float(s.get("latency") or 0) for s in before)
+            if now >= then * latency_factor and now - then >= min_latency:
+                flags.append(FeedFlag(url, "latency", f"median fetch {now:.2f}s, was {then:.2f}s"))
+            rate_now, rate_then = _error_rate(latest), _error_rate(before)
+            if rate_now - rate_then >= error_increase:
+                flags.append(FeedFlag(url, "errors", f"{rate_now:.0%} of requests failed, was {rate_then:.0%}"))
+        quiet = samples[-stale_runs:]
+        if len(quiet) == stale_runs and not any(s.get("new") or s.get("added") for s in quiet):
+            flags.append(FeedFlag(url, "stale", f"no new item in {stale_runs} runs"))
+    flags.sort(key=lambda flag: (flag.kind, flag.feed))
+    return flags
+
+
+def main(argv: Optional[Sequence[str]] = None) -> list[FeedFlag]:
+    """CLI entry point printing the flagged feeds of the metrics files."""
+
+    parser = argparse.ArgumentParser(description="Report feeds whose run metrics regressed.")
+    parser.add_argument("paths", nargs="*", type=pathlib.Path, help="metrics files (default data/metrics/*.jsonl)")
+    parser.add_argument("--recent", type=int, default=DEFAULT_RECENT, help="runs compared against the window")
+    parser.add_argument("--window", type=int, default=DEFAULT_WINDOW, help="earlier runs forming the baseline")
+    parser.add_argument("--latency-factor", type=float, default=DEFAULT_LATENCY_FACTOR)
+    parser.add_argument("--min-latency", type=float, default=DEFAULT_MIN_LATENCY)
+    parser.add_argument("--error-increase", type=float, default=DEFAULT_ERROR_INCREASE)
+    parser.add_argument("--stale-runs", type=int, default=DEFAULT_STALE_RUNS)
+    args = parser.parse_args(argv)
+
+    paths = args.paths
+    if not paths:
+        from autopost.pull_news import DATA_DIR
+
+        paths = sorted((pathlib.Path(DATA_DIR) / "metrics").glob("*.jsonl"))
+    runs = load_runs(paths)
+    flags = find_regressions(
+        runs,
+        recent=max(1, args.recent),
+        window=max(1, args.window),
+        latency_factor=args.latency_factor,
+        min_latency=args.min_latency,
+        error_increase=args.error_increase,
+        stale_runs=max(1, args.stale_runs),
+    )
+    print(f"{len(runs)} runs, {len(flags)} flagged feeds")
+    for flag in flags:
+        print(f"[{flag.kind.upper()}] {flag.feed}: {flag.detail}")
+    return flags
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""Sharded inverted index over the published posts, read by ``js/search.js``.
+
+The search page used to download the whole ``data/posts.json`` (bodies
+included) and scan it on every query.  The writer step now keeps an index
+under ``data/search/`` instead, so a query fetches the manifest, the term
+shards of its words and the doc chunks of its hits::
+
+    manifest.json     {"version": 1, "docs": 2950, "doc_chunk": 32,
+                       "shards": ["ab", "ac", ..., "th", "the", "thi", "é"]}
+    terms/<file>.json {"about": [3, 17, 2904], "abroad": [12]}
+    docs/<n>.json     {"64": {"slug": ..., "title": ..., "date": ..., "category": ...,
+                               "category_slug": ..., "cover": ..., "excerpt": ...}}
+    ids.json          {"next": 2951, "ids": {"<link hash>": 2950}}
+
+Terms are the words of the title, excerpt, category, subcategory and body
+text: decomposed, stripped of combining marks, lowercased and split at
+whitespace and punctuation (``TOKEN_SPLIT``, mirrored by the browser), of
+``MIN_TERM_LENGTH`` to ``MAX_TERM_LENGTH`` characters.  A shard holds the
+terms starting with its key, the first two characters; shards above
+``shard_bytes`` are split by the next character (up to ``MAX_PREFIX``), the
+parent keeping only the term equal to its key.  Shard files are named by
+their key, or ``x-`` plus the UTF-8 hex of keys outside ``[a-z0-9]``
+(:func:`shard_file`).  Doc ``n`` is in chunk ``n // doc_chunk``; ids grow with
+publication and are never reused, so the newest hits have the highest ids.
+``ids.json`` is writer state and is never fetched by the browser.
+
+:func:`update_search_index` adds the posts it has not indexed yet and drops
+the ones that left ``posts.json``; only files whose content changed are
+rewritten.  With ``archived`` posts, archived stories stay searchable: the
+archive is read only when the index is built from scratch, and only
+``dropped`` link hashes are removed afterwards.
+
+Run:
+  python3 autopost/search_index.py            # rebuild data/search/ from posts.json
+  python3 autopost/search_index.py --archive  # ... plus every archived post
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import pathlib
+import re
+import shutil
+import sys
+import unicodedata
+from collections import defaultdict
+from typing import Iterable, Optional, Sequence
+
+if __package__ in (None, ""):
+    sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+
+from autopost.common import strip_text
+from autopost.jsonio import atomic_write_text
+
+INDEX_VERSION = 1
+# Keep in sync with TOKEN_SPLIT in js/search.js.
+TOKEN_SPLIT = re.compile(
+    r"[\s\x00-\x2f\x3a-\x40\x5b-\x60\x7b-\x7f\u00a0-\u00bf\u00d7\u00f7\u2000-\u206f\u3000-\u303f]+"
+)
+MIN_TERM_LENGTH = 2
+MAX_TERM_LENGTH = 32
+MIN_PREFIX = 2
+MAX_PREFIX = 4
+DEFAULT_SHARD_BYTES = 16 * 1024
+DEFAULT_DOC_CHUNK = 32
+EXCERPT_CHARS = 200
+DOC_FIELDS = ("slug", "title", "date", "category", "category_slug", "cover")
+
+
+def normalize_text(value: str) -> str:
+    decomposed = unicodedata.normalize("NFD", value or "")
+    return "".join(ch for ch in decomposed if not "\u0300" <= ch <= "\u036f").lower()
+
+
+def tokenize(value: str) -> list[str]:
+    """Split ``value`` into index terms (too short and too long words dropped)."""
+
+    return [
+        term for term in TOKEN_SPLIT.split(normalize_text(value))
+        if MIN_TERM_LENGTH <= len(term) <= MAX_TERM_LENGTH
+    ]
+
+
+def document_terms(post: dict) -> set[str]:
+    text = " ".join(
+        str(post.get(name) or "") for name in ("title", "excerpt", "category", "subcategory")
+    )
+    return set(tokenize(text + " " + strip_text(post.get("body") or "")))
+
+
+def _doc_record(post: dict) -> dict:
+    record = {name: post.get(name) or "" for name in DOC_FIELDS}
+    excerpt = strip_text(post.get("excerpt") or "")
+    if len(excerpt) > EXCERPT_CHARS:
+        excerpt = excerpt[:EXCERPT_CHARS - 1].rstrip() + "…"
+    record["excerpt"] = excerpt
+    return record
+
+
+def shard_file(key: str) -> str:
+    """File name (without ``.json``) of the shard for ``key``."""
+
+    return key if re.fullmatch(r"[a-z0-9]+", key) else "x-" + key.encode("utf-8").hex()
+
+
+def _shard_size(terms: dict[str, list[int]]) -> int:
+    return sum(len(term) + 4 + sum(len(str(doc)) + 1 for doc in postings) for term, postings in terms.items())
+
+
+def split_shards(
+    terms: dict[str, list[int]],
+    shard_bytes: int = DEFAULT_SHARD_BYTES,
+    prefix: int = MIN_PREFIX,
+) -> dict[str, dict[str, list[int]]]:
+    """Group ``terms`` into shards keyed by prefix, splitting the large ones."""
+
+    groups: dict[str, dict[str, list[int]]] = defaultdict(dict)
+    for term, postings in terms.items():
+        groups[term[:prefix]][term] = postings
+    shards: dict[str, dict[str, list[int]]] = {}
+    for key, group in groups.items():
+        if prefix >= MAX_PREFIX or _shard_size(group) <= shard_bytes:
+            shards[key] = group
+            continue
+        own = {term: postings for term, postings in group.items() if len(term) <= prefix}
+        if own:
+            shards[key] = own
+        shards.update(split_shards(
+            {term: postings for term, postings in group.items() if len(term) > prefix},
+            shard_bytes,
+            prefix + 1,
+        ))
+    return shards
+
+
+def _dump(payload) -> str:
+    return json.dumps(payload, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+
+
+def _read_json(path: pathlib.Path):
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+class SearchIndex:
+    """The index stored under ``root``, loaded for an update."""
+
+    def __init__(
+        self,
+        root: pathlib.Path,
+        *,
+        shard_bytes: int = DEFAULT_SHARD_BYTES,
+        doc_chunk: int = DEFAULT_DOC_CHUNK,
+    ):
+        self.root = pathlib.Path(root)
+        self.shard_bytes = shard_bytes
+        state = _read_json(self.root / "ids.json") or {}
+        manifest = _read_json(self.root / "manifest.json") or {}
+        # Anything on disk that does not belong to a readable index is rebuilt.
+        self._reset = manifest.get("version") != INDEX_VERSION or not isinstance(state.get("ids"), dict)
+        if self._reset:
+            state, manifest = {}, {}
+        self.doc_chunk = int(manifest.get("doc_chunk") or doc_chunk)
+        self.ids: dict[str, int] = dict(state.get("ids") or {})
+        self.next_id = int(state.get("next") or 0)
+        self.terms: dict[str, list[int]] = {}
+        self._shard_keys: list[str] = list(manifest.get("shards") or [])
+        for key in self._shard_keys:
+            shard = _read_json(self.root / "terms" / f"{shard_file(key)}.json")
+            if isinstance(shard, dict):
+                self.terms.update(shard)
+        self._chunks: dict[int, dict[str, dict]] = {}
+        self._removed: set[int] = set()
+        self.added = 0
+
+    def _chunk(self, doc_id: int) -> dict[str, dict]:
+        number = doc_id // self.doc_chunk
+        if number not in self._chunks:
+            chunk = None if self._reset else _read_json(self.root / "docs" / f"{number}.json")
+            self._chunks[number] = chunk if isinstance(chunk, dict) else {}
+        return self._chunks[number]
+
+    def add(self, key: str, post: dict) -> bool:
+        if not key or key in self.ids:
+            return False
+        doc_id = self.ids[key] = self.next_id
+        self.next_id += 1
+        self._chunk(doc_id)[str(doc_id)] = _doc_record(post)
+        for term in document_terms(post):
+            self.terms.setdefault(term, []).append(doc_id)
+        self.added += 1
+        return True
+
+    def remove(self, key: str) -> bool:
+        doc_id = self.ids.pop(key, None)
+        if doc_id is None:
+            return False
+        self._chunk(doc_id).pop(str(doc_id), None)
+        self._removed.add(doc_id)
+        return True
+
+    def save(self) -> int:
+        """Write what changed; return the number of files written or deleted."""
+
+        if self._removed:
+            kept = {}
+            for term, postings in self.terms.items():
+                remaining = [doc for doc in postings if doc not in self._removed]
+                if remaining:
+                    kept[term] = remaining
+            self.terms = kept
+        changes = 0
+        if self._reset:
+            for stale in ("terms", "docs"):
+                shutil.rmtree(self.root / stale, ignore_errors=True)
+            self._reset = False
+        terms_dir = self.root / "terms"
+        terms_dir.mkdir(parents=True, exist_ok=True)
+        shards = split_shards(self.terms, self.shard_bytes)
+        for key, shard in shards.items():
+            changes += self._write(terms_dir / f"{shard_file(key)}.json", _dump(shard))
+        for stale in set(self._shard_keys) - set(shards):
+            (terms_dir / f"{shard_file(stale)}.json").unlink(missing_ok=True)
+            changes += 1
+
+        docs_dir = self.root / "docs"
+        docs_dir.mkdir(parents=True, exist_ok=True)
+        for number, chunk in self._chunks.items():
+            path = docs_dir / f"{number}.json"
+            if chunk:
+                changes += self._write(path, _dump(chunk))
+            elif path.exists():
+                path.unlink()
+                changes += 1
+
+        manifest = {
+            "version": INDEX_VERSION,
+            "docs": len(self.ids),
+            "doc_chunk": self.doc_chunk,
+            "shards": sorted(shards),
+        }
+        changes += self._write(self.root / "manifest.json", _dump(manifest))
+        changes += self._write(self.root / "ids.json", _dump({"next": self.next_id, "ids": self.ids}))
+        self._shard_keys = sorted(shards)
+        self._removed = set()
+        return changes
+
+    @staticmethod
+    def _write(path: pathlib.Path, text: str) -> int:
+        try:
+            if path.read_text(encoding="utf-8") == text:
+                return 0
+        except OSError:
+            pass
+        atomic_write_text(path, text)
+        return 1
+
+
+def update_search_index(
+    root: pathlib.Path,
+    live: Iterable[tuple[str, dict]],
+    *,
+    archived: Optional[Iterable[tuple[str, dict]]] = None,
+    dropped: Iterable[str] = (),
+    shard_bytes: int = DEFAULT_SHARD_BYTES,
+) -> dict:
+    """Sync the index at ``root`` with ``live`` ``(link hash, post)`` pairs, newest first.
+
+    Returns the ``added``/``removed`` doc counts, the indexed ``docs`` and
+    the number of files ``written``.
+    """
+
+    index = SearchIndex(root, shard_bytes=shard_bytes)
+    fresh = not index.ids
+    pending, live_keys = [], set()
+    for key, post in live:
+        live_keys.add(key)
+        if key not in index.ids:
+            pending.append((key, post))
+    removed = 0
+    if archived is None:
+        for key in [key for key in index.ids if key not in live_keys]:
+            removed += index.remove(key)
+    else:
+        for key in dropped:
+            removed += index.remove(key)
+        if fresh:
+            pending.extend((key, post) for key, post in archived if key not in live_keys)
+    # Oldest first, so ids grow with publication.
+    for key, post in reversed(pending):
+        index.add(key, post)
+    written = index.save()
+    return {"added": index.added, "removed": removed, "docs": len(index.ids), "written": written}
+
+
+def main(argv: Optional[Sequence[str]] = None) -> dict:
+    """CLI entry point rebuilding the index from the configured data directory."""
+
+    from autopost import pull_news
+    from autopost.pull_news import PullNewsConfig
+
+    parser = argparse.ArgumentParser(description="Rebuild the search index in data/search/.")
+    parser.add_argument("--archive", action="store_true", help="also index every archived post")
+    args = parser.parse_args(argv)
+
+    settings = pull_news._resolve_settings(PullNewsConfig())
+    (settings.data_dir / "search" / "ids.json").unlink(missing_ok=True)
+    stats = pull_news._update_search_index(settings, include_archive=args.archive)
+    print(f"search index: {stats['docs']} docs, {stats['written']} files")
+    return stats
+
+
+if __name__ == "__main__":
+    main()
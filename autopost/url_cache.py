@@ -0,0 +1,105 @@
+"""Persisted map from feed links to the canonical URL of their article.
+
+Feed links often pass through redirectors or carry per-feed tracking paths,
+so one article reaches the autoposter under several URLs that
+:func:`autopost.pull_news.normalize_link` cannot unify.  The article fetch
+already follows the redirects and sees the page's ``<link rel="canonical">``;
+this cache keeps what it learned, all keyed by
+:func:`autopost.pull_news.link_hash`::
+
+    {
+      "aliases": {"<link hash>": "<canonical hash>"},
+      "owners": {"<canonical hash>": "<link hash it was published under>"},
+      "urls": {"<canonical hash>": "https://example.com/story"}
+    }
+
+Every alias (the feed link, the redirect target and the canonical URL
+itself) points at the canonical hash, and the owner records which seen DB
+key published that story.  A later feed link whose alias is known and whose
+story is already in the seen DB is skipped without any request.
+"""
+
+from __future__ import annotations
+
+import json
+import pathlib
+from typing import Iterable, Optional
+
+from autopost.jsonio import atomic_write_text
+
+
+class UrlCache:
+    """Alias and owner maps of one run, loaded from and saved to ``path``."""
+
+    def __init__(self, path: Optional[pathlib.Path] = None):
+        self.path = pathlib.Path(path) if path else None
+        self.aliases: dict[str, str] = {}
+        self.owners: dict[str, str] = {}
+        self.urls: dict[str, str] = {}
+        # Items skipped before their fetch / discarded after it.
+        self.skipped = 0
+        self.discarded = 0
+        if self.path is not None:
+            self._load(self.path)
+
+    def _load(self, path: pathlib.Path) -> None:
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return
+        if not isinstance(data, dict):
+            return
+        for name in ("aliases", "owners", "urls"):
+            value = data.get(name)
+            if isinstance(value, dict):
+                setattr(self, name, {str(k): str(v) for k, v in value.items()})
+
+    def published_as(self, key: str, seen: dict) -> Optional[str]:
+        """Return the canonical URL if ``key`` is an alias of a published story."""
+
+        canonical = self.aliases.get(key, key)
+        owner = self.owners.get(canonical)
+        if owner is None or owner == key or owner not in seen:
+            return None
+        self.skipped += 1
+        return self.urls.get(canonical) or canonical
+
+    def learn(self, canonical: str, canonical_url: str, aliases: Iterable[str]) -> None:
+        """Point every alias hash (and ``canonical`` itself) at ``canonical``."""
+
+        for alias in set(aliases) | {canonical}:
+            self.aliases[alias] = canonical
+        if canonical_url:
+            self.urls[canonical] = canonical_url
+
+    def claim(self, canonical: str, key: str, seen: dict) -> Optional[str]:
+        """Make ``key`` the owner of ``canonical`` unless a published story has it.
+
+        Returns the canonical URL when the story was already published under
+        another key (and counts the discarded fetch).
+        """
+
+        owner = self.owners.get(canonical)
+        if owner is not None and owner != key and owner in seen:
+            self.discarded += 1
+            return self.urls.get(canonical) or canonical
+        self.owners[canonical] = key
+        return None
+
+    def prune(self, seen: dict) -> None:
+        """Forget stories that are not (or no longer) in the seen DB."""
+
+        self.owners = {canonical: owner for canonical, owner in self.owners.items() if owner in seen}
+        self.aliases = {alias: canonical for alias, canonical in self.aliases.items() if canonical in self.owners}
+        self.urls = {canonical: url for canonical, url in self.urls.items() if canonical in self.owners}
+
+    def save(self, seen: dict) -> None:
+        if self.path is None:
+            return
+        self.prune(seen)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {"aliases": self.aliases, "owners": self.owners, "urls": self.urls}
+        atomic_write_text(self.path, json.dumps(payload, ensure_ascii=False, indent=2, sort_keys=True))
+
+
+__all__ = ["UrlCache"]
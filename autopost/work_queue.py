@@ -0,0 +1,430 @@
+#!/usr/bin/env python3
+"""SQLite-backed work queue for distributing article extraction.
+
+``run_pull_news`` walks every feed and article in one loop, so a handful of
+slow publishers decide the runtime.  Queue mode splits that loop in three:
+
+``plan``
+    fetch the feeds once and enqueue one unit per unseen item, applying the
+    per-feed, per-category and total limits as the sequential loop would;
+``work``
+    lease units (with a timeout), run them through :func:`build_entry` and
+    commit the result.  Any number of workers may share the queue file, on
+    one machine or several; leases that expire are handed out again;
+``finalize``
+    publish the finished units in feed order and write posts.json, the seen
+    DB, the partitions and the archive once.
+
+Items that are skipped (e.g. the publisher served an error page) are not
+replaced in the same cycle; the next ``plan`` enqueues further items.
+``finalize`` drops published units from the queue and records skipped and
+failed ones in the negative cache before dropping them too, so a later
+``plan`` offers them again once their backoff has passed, as a scheduled
+run would.  Units still skipped or failed when ``plan`` runs are re-queued.
+
+Run:
+  python3 autopost/work_queue.py plan
+  python3 autopost/work_queue.py work --worker "$(hostname)-1" &   # repeat
+  python3 autopost/work_queue.py finalize
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import pathlib
+import socket
+import sqlite3
+import sys
+import time
+import xml.etree.ElementTree as ET
+from dataclasses import asdict, dataclass
+from typing import Optional, Sequence
+
+if __package__ in (None, ""):
+    sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+
+from autopost import pull_news
+from autopost.pull_news import FeedSpec, PullNewsConfig, PullNewsResult
+
+DEFAULT_QUEUE_PATH = pull_news.DATA_DIR / "work_queue.sqlite3"
+LEASE_SECONDS = pull_news._env_int("QUEUE_LEASE_SECONDS", 300)
+MAX_ATTEMPTS = pull_news._env_int("QUEUE_MAX_ATTEMPTS", 3)
+
+# queued -> leased -> done -> published, or skipped / failed after MAX_ATTEMPTS.
+# Skipped and failed units are re-queued by enqueue; finalize deletes the
+# published, skipped and failed ones.
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS units (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    link_hash TEXT NOT NULL UNIQUE,
+    feed_index INTEGER NOT NULL,
+    rank INTEGER NOT NULL,
+    spec TEXT NOT NULL,
+    item TEXT NOT NULL,
+    state TEXT NOT NULL DEFAULT 'queued',
+    lease_owner TEXT,
+    lease_expires REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    result TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS units_state ON units (state, id);
+"""
+
+
+@dataclass
+class WorkUnit:
+    """One leased (feed, item) pair."""
+
+    id: int
+    link_hash: str
+    spec: FeedSpec
+    item: dict
+    attempts: int
+
+
+def _encode_item(item: dict) -> str:
+    element = item.get("element")
+    return json.dumps(
+        {
+            "title": item.get("title") or "",
+            "link": item.get("link") or "",
+            "summary": item.get("summary") or "",
+            "element": ET.tostring(element, encoding="unicode") if element is not None else None,
+        },
+        ensure_ascii=False,
+    )
+
+
+def _decode_item(raw: str) -> dict:
+    item = json.loads(raw)
+    element = item.get("element")
+    item["element"] = ET.fromstring(element) if element else None
+    return item
+
+
+class WorkQueue:
+    """Units of work stored in one SQLite file shared by all processes."""
+
+    def __init__(self, path: pathlib.Path = DEFAULT_QUEUE_PATH, timeout: float = 30.0):
+        self.path = pathlib.Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), timeout=timeout, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "WorkQueue":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def _transaction(self):
+        # BEGIN IMMEDIATE takes the write lock up front, so two workers can
+        # never lease the same unit.
+        self._conn.execute("BEGIN IMMEDIATE")
+        return self._conn
+
+    def enqueue(self, key: str, feed_index: int, rank: int, spec: FeedSpec, item: dict) -> bool:
+        """Add a unit for ``key``; return whether it was added.
+
+        A unit already queued, in progress or done is left alone; one that
+        ended skipped or failed is queued again with fresh attempts.
+        """
+
+        cursor = self._conn.execute(
+            "INSERT INTO units (link_hash, feed_index, rank, spec, item) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (link_hash) DO UPDATE SET feed_index = excluded.feed_index, "
+            "rank = excluded.rank, spec = excluded.spec, item = excluded.item, state = 'queued', "
+            "attempts = 0, result = NULL, error = NULL "
+            "WHERE units.state IN ('skipped', 'failed')",
+            (key, feed_index, rank, json.dumps(asdict(spec), ensure_ascii=False), _encode_item(item)),
+        )
+        return cursor.rowcount > 0
+
+    def requeue_expired(self, now: Optional[float] = None) -> int:
+        """Return expired leases to the queue; return how many were requeued.
+
+        A unit whose worker hung or died on its last allowed attempt is marked
+        failed instead, so ``MAX_ATTEMPTS`` also caps units that never reach
+        :meth:`fail`.
+        """
+
+        now = time.time() if now is None else now
+        self._conn.execute(
+            "UPDATE units SET state = 'failed', error = 'lease expired', lease_owner = NULL, "
+            "lease_expires = NULL WHERE state = 'leased' AND lease_expires < ? AND attempts >= ?",
+            (now, MAX_ATTEMPTS),
+        )
+        cursor = self._conn.execute(
+            "UPDATE units SET state = 'queued', lease_owner = NULL, lease_expires = NULL "
+            "WHERE state = 'leased' AND lease_expires < ? AND attempts < ?",
+            (now, MAX_ATTEMPTS),
+        )
+        return cursor.rowcount
+
+    def lease(self, worker: str, lease_seconds: float = LEASE_SECONDS) -> Optional[WorkUnit]:
+        """Lease the oldest queued unit to ``worker``; ``None`` when idle."""
+
+        now = time.time()
+        conn = self._transaction()
+        try:
+            self.requeue_expired(now)
+            row = conn.execute(
+                "SELECT id, link_hash, spec, item, attempts FROM units "
+                "WHERE state = 'queued' ORDER BY id LIMIT 1"
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            conn.execute(
+                "UPDATE units SET state = 'leased', lease_owner = ?, lease_expires = ?, "
+                "attempts = attempts + 1 WHERE id = ?",
+                (worker, now + lease_seconds, row["id"]),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return WorkUnit(
+            id=row["id"],
+            link_hash=row["link_hash"],
+            spec=FeedSpec(**json.loads(row["spec"])),
+            item=_decode_item(row["item"]),
+            attempts=row["attempts"] + 1,
+        )
+
+    def complete(self, unit: WorkUnit, worker: str, entry: Optional[dict], reason: str = "") -> bool:
+        """Store ``entry`` (``None`` = skipped for ``reason``) if ``worker`` still holds the lease."""
+
+        cursor = self._conn.execute(
+            "UPDATE units SET state = ?, result = ?, error = ?, lease_owner = NULL, lease_expires = NULL "
+            "WHERE id = ? AND state = 'leased' AND lease_owner = ?",
+            (
+                "done" if entry is not None else "skipped",
+                json.dumps(entry, ensure_ascii=False) if entry is not None else None,
+                None if entry is not None else reason or None,
+                unit.id,
+                worker,
+            ),
+        )
+        return cursor.rowcount > 0
+
+    def fail(self, unit: WorkUnit, worker: str, error: str) -> None:
+        """Release a unit after an error; it is retried until ``MAX_ATTEMPTS``."""
+
+        state = "failed" if unit.attempts >= MAX_ATTEMPTS else "queued"
+        self._conn.execute(
+            "UPDATE units SET state = ?, error = ?, lease_owner = NULL, lease_expires = NULL "
+            "WHERE id = ? AND state = 'leased' AND lease_owner = ?",
+            (state, error[:500], unit.id, worker),
+        )
+
+    def finished(self) -> list[tuple[str, FeedSpec, dict]]:
+        """Return ``(link_hash, spec, entry)`` for units done but not published, in feed order."""
+
+        rows = self._conn.execute(
+            "SELECT link_hash, spec, result FROM units WHERE state = 'done' "
+            "ORDER BY feed_index, rank, id"
+        ).fetchall()
+        return [
+            (row["link_hash"], FeedSpec(**json.loads(row["spec"])), json.loads(row["result"]))
+            for row in rows
+        ]
+
+    def mark_published(self, keys: Sequence[str]) -> None:
+        self._conn.executemany(
+            "UPDATE units SET state = 'published', result = NULL WHERE link_hash = ?",
+            [(key,) for key in keys],
+        )
+
+    def purge_published(self) -> int:
+        """Delete published units (their links are in the seen DB); return how many."""
+
+        return self._conn.execute("DELETE FROM units WHERE state = 'published'").rowcount
+
+    def take_unpublishable(self) -> list[tuple[str, str, str]]:
+        """Delete skipped and failed units; return their ``(link_hash, link, reason)``.
+
+        Skipped units carry their :func:`build_entry` skip reason; failed
+        ones (errors, expired leases) are reported as ``"failed"``.
+        """
+
+        conn = self._transaction()
+        try:
+            rows = conn.execute(
+                "SELECT link_hash, item, state, error FROM units "
+                "WHERE state IN ('skipped', 'failed') ORDER BY id"
+            ).fetchall()
+            conn.execute("DELETE FROM units WHERE state IN ('skipped', 'failed')")
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return [
+            (
+                row["link_hash"],
+                json.loads(row["item"]).get("link") or "",
+                (row["error"] or "unavailable") if row["state"] == "skipped" else "failed",
+            )
+            for row in rows
+        ]
+
+    def counts(self) -> dict[str, int]:
+        return {
+            row["state"]: row["n"]
+            for row in self._conn.execute("SELECT state, COUNT(*) AS n FROM units GROUP BY state")
+        }
+
+
+def plan(queue: WorkQueue, config: Optional[PullNewsConfig] = None) -> int:
+    """Fetch the configured feeds and enqueue their unseen items; return the count."""
+
+    settings = pull_news._resolve_settings(config or PullNewsConfig())
+    if not settings.feeds_file.exists():
+        print("ERROR: feeds file not found:", settings.feeds_file)
+        return 0
+    seen = pull_news._load_seen(settings.seen_db_path)
+    quota = pull_news._Quota.from_settings(settings)
+    prefilter = None
+    if settings.prefilter:
+        prefilter = pull_news.Prefilter.for_feeds(settings.feeds_file, settings.prefilter_rules)
+    negative = pull_news._negative_cache_for(settings)
+    added = 0
+
+    for feed_index, spec in enumerate(pull_news.load_feed_specs(settings.feeds_file, settings.category_filter)):
+        items = pull_news.fetch_feed_items(spec)
+        if items is None:
+            continue
+        for rank, it in enumerate(items):
+            if quota.total_reached():
+                break
+            if not quota.allows(spec.limit_key, spec.url):
+                continue
+            title = (it.get("title") or "").strip()
+            link = (it.get("link") or "").strip()
+            if not title or not link:
+                continue
+            key = pull_news.link_hash(link)
+            if key in seen:
+                continue
+            if negative is not None and negative.blocked(key, link):
+                continue
+            if prefilter is not None and pull_news._prefilter_rejects(prefilter, it, link):
+                continue
+            # Count planned units as if they all succeed, like the sequential loop.
+            quota.record(spec.limit_key, spec.url)
+            if queue.enqueue(key, feed_index, rank, spec, it):
+                added += 1
+
+    if prefilter is not None:
+        prefilter.report()
+    if negative is not None:
+        negative.report()
+    print(f"Units queued: {added}")
+    return added
+
+
+def work(
+    queue: WorkQueue,
+    worker: str,
+    *,
+    config: Optional[PullNewsConfig] = None,
+    lease_seconds: float = LEASE_SECONDS,
+    max_units: int = 0,
+) -> int:
+    """Process units until the queue is drained (or ``max_units``); return the count."""
+
+    settings = pull_news._resolve_settings(config or PullNewsConfig())
+    pull_news.refresh_taxonomy()
+    # Probe results stay in memory: workers may run in parallel processes.
+    covers = pull_news.ImageProber() if settings.image_probe else None
+    processed = 0
+    while not max_units or processed < max_units:
+        unit = queue.lease(worker, lease_seconds)
+        if unit is None:
+            break
+        page: dict = {}
+        try:
+            entry = pull_news.build_entry(unit.item, unit.spec, settings.target_words, page, covers=covers)
+        except Exception as exc:  # keep the worker alive; the unit is retried
+            print(f"[WARN] {worker}: {unit.item.get('link')} failed: {exc}")
+            queue.fail(unit, worker, repr(exc))
+        else:
+            if not queue.complete(unit, worker, entry, page.get("skip") or "unavailable"):
+                print(f"[WARN] {worker}: lease on {unit.item.get('link')} expired; result dropped")
+        processed += 1
+    return processed
+
+
+def finalize(queue: WorkQueue, config: Optional[PullNewsConfig] = None) -> PullNewsResult:
+    """Publish finished units and write all outputs once.
+
+    Skipped and failed units are recorded in the negative cache and dropped,
+    as are the published ones.
+    """
+
+    settings = pull_news._resolve_settings(config or PullNewsConfig())
+    seen, posts_idx = pull_news._prepare_run(settings)
+    negative = pull_news._negative_cache_for(settings)
+    quota = pull_news._Quota(0, 0, 0)
+    new_entries: list[dict] = []
+    published: list[str] = []
+
+    for key, spec, entry in queue.finished():
+        published.append(key)
+        if key in seen:
+            continue
+        new_entries.append(entry)
+        pull_news._register_entry(entry, spec, key, seen, quota)
+        if negative is not None:
+            negative.clear(key)
+
+    posts_idx = pull_news._write_run_outputs(settings, new_entries, posts_idx, seen)
+    queue.mark_published(published)
+    queue.purge_published()
+    for key, link, reason in queue.take_unpublishable():
+        if negative is not None:
+            retry_at = negative.record_failure(key, link, reason)
+            print(f"[BACKOFF] {link} -> retry after {pull_news._format_retry(retry_at)}")
+    if negative is not None:
+        negative.save()
+    print("New posts this run:", len(new_entries))
+
+    return PullNewsResult(
+        added_count=len(new_entries),
+        new_entries=new_entries,
+        posts_index=posts_idx,
+    )
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    """CLI entry point: ``plan``, ``work`` or ``finalize``."""
+
+    parser = argparse.ArgumentParser(description="Queue-driven autopost runs.")
+    parser.add_argument("command", choices=("plan", "work", "finalize", "status"))
+    parser.add_argument("--queue", type=pathlib.Path, default=DEFAULT_QUEUE_PATH)
+    parser.add_argument("--worker", default=f"{socket.gethostname()}-{os.getpid()}")
+    parser.add_argument("--lease", type=float, default=LEASE_SECONDS, help="lease timeout in seconds")
+    parser.add_argument("--max-units", type=int, default=0, help="stop after this many units (0 = drain)")
+    args = parser.parse_args(argv)
+
+    with WorkQueue(args.queue) as queue:
+        if args.command == "plan":
+            return plan(queue)
+        if args.command == "work":
+            return work(queue, args.worker, lease_seconds=args.lease, max_units=args.max_units)
+        if args.command == "finalize":
+            return finalize(queue)
+        counts = queue.counts()
+        print(json.dumps(counts, indent=2, sort_keys=True))
+        return counts
+
+
+if __name__ == "__main__":
+    main()
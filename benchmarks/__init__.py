@@ -0,0 +1,4 @@
+"""Offline benchmarks for the autopost pipeline.
+
+Run any module directly, e.g. ``python -m benchmarks.bench_sort_merge``.
+"""
@@ -0,0 +1,203 @@
+"""Compare the old chain of cover URL rewrites with the rule-table engine.
+
+Usage::
+
+    python -m benchmarks.bench_cover_urls [--corpus PATH] [--runs 200]
+    python benchmarks/bench_cover_urls.py ...   # same, run as a script
+
+The corpus (``benchmarks/fixtures/cover_urls.txt`` by default) holds real
+cover URLs, one per line.  Each run rewrites every URL once, as the items
+of a scheduled run would.  "chain" is a copy of the helpers the engine
+replaced (each one re-parsing the URL), "cold" is
+:func:`autopost.cover_urls.rewrite_cover_url` with its memo cleared before
+every run and "memo" keeps the memo between runs.  The outputs must match
+except on hosts that only the new rules rewrite.
+"""
+
+from __future__ import annotations
+
+import argparse
+import pathlib
+import re
+import sys
+import time
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
+
+if __package__ in (None, ""):
+    sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+
+from autopost.cover_urls import CLOUDINARY, DEFAULT_RULES, SHOPIFY, rewrite_cover_url
+
+DEFAULT_CORPUS = pathlib.Path(__file__).with_name("fixtures") / "cover_urls.txt"
+TARGET = 1600
+# Hosts whose rules did not exist in the old chain.
+NEW_RULE_HOSTS = CLOUDINARY.hosts + SHOPIFY.hosts
+
+
+def _legacy_guardian(u: str, target: int) -> str:
+    try:
+        pr = urlparse(u)
+        if "i.guim.co.uk" not in pr.netloc:
+            return u
+        q = dict(parse_qsl(pr.query, keep_blank_values=True))
+        q["width"] = str(max(int(q.get("width", "0") or 0), target))
+        q.setdefault("quality", "85")
+        q.setdefault("auto", "format")
+        q.setdefault("fit", "max")
+        return urlunparse(pr._replace(query=urlencode(q)))
+    except Exception:
+        return u
+
+
+def _legacy_wp(u: str) -> str:
+    m = re.search(r'(?i)(.+?)-\d{2,4}x\d{2,4}(\.[a-z]{3,4})(\?.*)?$', u)
+    if m:
+        return m.group(1) + m.group(2) + (m.group(3) or '')
+    return u
+
+
+def _legacy_query(u: str, target: int) -> str:
+    try:
+        pr = urlparse(u)
+        q = dict(parse_qsl(pr.query, keep_blank_values=True))
+        updated = False
+        for k in ('w', 'width', 'maxwidth', 'px', 'sz', 's'):
+            if k in q:
+                m = re.search(r'\d+', str(q[k]))
+                v = int(m.group(0)) if m else 0
+                if v < target:
+                    val = str(q[k])
+                    if m:
+                        start, end = m.span()
+                        q[k] = f"{val[:start]}{target}{val[end:]}"
+                    else:
+                        q[k] = str(target)
+                    updated = True
+        if updated:
+            u = urlunparse(pr._replace(query=urlencode(q)))
+        return u
+    except Exception:
+        return u
+
+
+_LEGACY_KEYWORDS = {
+    "img", "image", "images", "media", "thumb", "thumbnail", "resize", "resized",
+    "size", "sizes", "standard", "width", "w", "crop", "quality",
+}
+
+
+def _legacy_path(u: str, target: int) -> str:
+    try:
+        parsed = urlparse(u)
+    except Exception:
+        return u
+    path = parsed.path or ""
+    if not path:
+        return u
+    segments = path.split("/")
+    changed = False
+    for idx, seg in enumerate(segments):
+        if not re.fullmatch(r"\d{2,4}", seg or ""):
+            continue
+        value = int(seg)
+        if value >= target or value == 0:
+            continue
+        prev_raw = segments[idx - 1] if idx > 0 else ""
+        prev_prev_raw = segments[idx - 2] if idx > 1 else ""
+        if re.fullmatch(r"\d{4}", prev_raw) and 1900 <= int(prev_raw) <= 2100 and 1 <= value <= 12:
+            continue
+        if (
+            re.fullmatch(r"\d{2}", prev_raw)
+            and re.fullmatch(r"\d{4}", prev_prev_raw)
+            and 1900 <= int(prev_prev_raw) <= 2100
+            and 1 <= int(prev_raw) <= 12
+            and 1 <= value <= 31
+        ):
+            continue
+        prev_seg = prev_raw.lower()
+        next_seg = (segments[idx + 1] if idx + 1 < len(segments) else "").lower()
+        next_next = segments[idx + 2].lower() if idx + 2 < len(segments) else ""
+        image_pattern = r"\.(?:jpe?g|png|gif|webp|avif)(?:\?.*)?$"
+        if (
+            any(key in prev_seg for key in _LEGACY_KEYWORDS)
+            or any(key in next_seg for key in _LEGACY_KEYWORDS)
+            or re.search(image_pattern, next_seg)
+            or re.search(image_pattern, next_next)
+        ):
+            segments[idx] = str(target)
+            changed = True
+    if not changed:
+        return u
+    return urlunparse(parsed._replace(path="/".join(segments)))
+
+
+def legacy_rewrite(u: str, target: int = TARGET) -> str:
+    u = _legacy_guardian(u, target)
+    u = _legacy_wp(u)
+    u = _legacy_path(u, target)
+    return _legacy_query(u, target)
+
+
+def load_corpus(path: pathlib.Path) -> list[str]:
+    lines = path.read_text(encoding="utf-8").splitlines()
+    return [line.strip() for line in lines if line.strip() and not line.startswith("#")]
+
+
+def _timed(func, runs: int) -> float:
+    start = time.perf_counter()
+    for _ in range(runs):
+        func()
+    return time.perf_counter() - start
+
+
+def run(urls: list[str], runs: int) -> dict:
+    changed_hosts = 0
+    for url in urls:
+        old, new = legacy_rewrite(url), rewrite_cover_url(url, TARGET)
+        if old == new:
+            continue
+        if any(host in urlparse(url).netloc for host in NEW_RULE_HOSTS):
+            changed_hosts += 1
+            continue
+        raise AssertionError(f"rewrite differs for {url}: {old} != {new}")
+
+    def engine_pass():
+        for url in urls:
+            rewrite_cover_url(url, TARGET, DEFAULT_RULES)
+
+    def cold_pass():
+        rewrite_cover_url.cache_clear()
+        engine_pass()
+
+    chain_s = _timed(lambda: [legacy_rewrite(url) for url in urls], runs)
+    cold_s = _timed(cold_pass, runs)
+    rewrite_cover_url.cache_clear()
+    memo_s = _timed(engine_pass, runs)
+    info = rewrite_cover_url.cache_info()
+    return {
+        "urls": len(urls),
+        "new_rule_urls": changed_hosts,
+        "chain_us": chain_s / (runs * len(urls)) * 1e6,
+        "cold_us": cold_s / (runs * len(urls)) * 1e6,
+        "memo_us": memo_s / (runs * len(urls)) * 1e6,
+        "memo_hit_rate": info.hits / (info.hits + info.misses) if info.hits + info.misses else 0.0,
+    }
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--corpus", type=pathlib.Path, default=DEFAULT_CORPUS)
+    parser.add_argument("--runs", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    row = run(load_corpus(args.corpus), args.runs)
+    print(f"{row['urls']} URLs ({row['new_rule_urls']} rewritten only by the new rules), {args.runs} runs")
+    print(f"{'chain':>10} {'cold':>10} {'memo':>10} {'memo hits':>10}")
+    print(
+        f"{row['chain_us']:>8.1f}us {row['cold_us']:>8.1f}us {row['memo_us']:>8.2f}us "
+        f"{row['memo_hit_rate']:>9.1%}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""Drive ``run_pull_news`` against a local stub origin and check the result.
+
+Usage::
+
+    python -m benchmarks.bench_end_to_end [--feeds 20] [--articles 10]
+        [--latency fixed:0] [--error-rate 0] [--feed-error-rate 0]
+        [--redirect-rate 0] [--slow-rate 0] [--slow-seconds 1]
+        [--oversize-rate 0] [--oversize-bytes 2000000] [--body-words 300]
+        [--seed 1] [--verbose]
+
+For example ``--latency exp:0.02 --error-rate 0.05 --slow-rate 0.02`` mimics
+a mixed set of publishers.
+
+A :class:`benchmarks.stub_origin.StubOrigin` serves the synthetic feeds; a
+feeds file pointing at it is generated in a temporary data directory and one
+full run (all limits opened to the size of the universe) is timed.  The row
+reports items per second, requests per status and bytes served.  The
+correctness check then matches the published entries against the universe:
+
+* every article of a reachable feed that the origin serves is published
+  exactly once;
+* published bodies start with the article's marker word;
+* articles the origin failed are not published (they are backed off in the
+  negative cache instead).
+
+The exit status is 1 when the check fails.  Image probing is off: it only
+fetches HTTPS covers, which the stub does not serve.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import dataclasses
+import io
+import pathlib
+import sys
+import tempfile
+import time
+from collections import Counter
+
+from autopost import pull_news
+from benchmarks.stub_origin import OriginProfile, StubOrigin, Universe
+
+
+def verify(universe: Universe, entries: list[dict]) -> dict:
+    """Compare published ``entries`` with what ``universe`` should produce."""
+
+    published = Counter()
+    problems = []
+    for entry in entries:
+        article_id = universe.article_id(entry.get("source") or "")
+        if article_id is None:
+            problems.append(f"unknown source {entry.get('source')!r}")
+            continue
+        published[article_id] += 1
+        article = universe.articles[article_id]
+        if article.marker not in (entry.get("body") or ""):
+            problems.append(f"{article.marker}: body is missing its marker")
+    reachable = {key: article for key, article in universe.articles.items() if key[0] not in universe.failing_feeds}
+    expected = {key for key, article in reachable.items() if not article.error}
+    failed = len(reachable) - len(expected)
+    missing = sorted(expected - set(published))
+    unexpected = sorted(set(published) - expected)
+    duplicates = sorted(key for key, count in published.items() if count > 1)
+    problems += [f"missing {key}" for key in missing]
+    problems += [f"unexpected {key}" for key in unexpected]
+    problems += [f"published {published[key]} times: {key}" for key in duplicates]
+    return {"ok": not problems, "expected": len(expected), "failed_articles": failed, "problems": problems}
+
+
+def run(profile: OriginProfile, *, verbose: bool = False, **overrides) -> dict:
+    """Serve ``profile``, run the pipeline once against it and check the output."""
+
+    size = profile.feeds * profile.articles
+    with StubOrigin(profile) as origin, tempfile.TemporaryDirectory(prefix="bench-e2e-") as tmp:
+        data = pathlib.Path(tmp)
+        feeds_file = data / "feeds.txt"
+        feeds_file.write_text(origin.universe.feeds_file(origin.base_url), encoding="utf-8")
+        settings = dict(
+            feeds=feeds_file,
+            data_dir=data,
+            posts_json=data / "posts.json",
+            seen_db=data / "seen.json",
+            category="",
+            max_per_feed=profile.articles,
+            max_per_category=size,
+            max_total=size,
+            max_posts_persist=size,
+            shard="",
+            delta=False,
+            time_budget=0,
+            resume=False,
+            image_probe=False,
+            run_metrics=False,
+        )
+        settings.update(overrides)
+        config = pull_news.PullNewsConfig(**settings)
+        output = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+        start = time.perf_counter()
+        with output:
+            result = pull_news.run_pull_news(config)
+        seconds = time.perf_counter() - start
+        stats = dict(origin.stats)
+        check = verify(origin.universe, result.new_entries)
+    return {
+        "items": result.added_count,
+        "seconds": seconds,
+        "items_per_sec": result.added_count / seconds if seconds else 0.0,
+        "origin": stats,
+        "check": check,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    defaults = OriginProfile()
+    for field in dataclasses.fields(OriginProfile):
+        option = "--" + field.name.replace("_", "-")
+        parser.add_argument(option, type=type(getattr(defaults, field.name)), default=getattr(defaults, field.name))
+    parser.add_argument("--verbose", action="store_true", help="show the pipeline's own output")
+    args = parser.parse_args(argv)
+
+    profile = OriginProfile(**{field.name: getattr(args, field.name) for field in dataclasses.fields(OriginProfile)})
+    row = run(profile, verbose=args.verbose)
+    origin = row["origin"]
+    statuses = ", ".join(f"{key[7:]}: {value}" for key, value in sorted(origin.items()) if key.startswith("status_"))
+    print(f"{row['items']} items in {row['seconds']:.2f}s = {row['items_per_sec']:.1f} items/s")
+    per_item = origin.get("requests", 0) / row["items"] if row["items"] else 0.0
+    print(
+        f"origin: {origin.get('requests', 0)} requests ({statuses}), {per_item:.1f} per item, "
+        f"{origin.get('bytes_sent', 0) / 1e6:.1f} MB"
+    )
+    check = row["check"]
+    print(f"check: {'ok' if check['ok'] else 'FAILED'} ({check['expected']} expected, {check['failed_articles']} failed articles skipped)")
+    for problem in check["problems"][:20]:
+        print(f"  {problem}")
+    return 0 if check["ok"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+"""Measure how long importing the autopost modules takes.
+
+Usage::
+
+    python -m benchmarks.bench_import_time [--module autopost.pull_news]
+        [--root PATH] [--repeat 5]
+
+Each sample runs ``python -X importtime -c "import <module>"`` in a fresh
+interpreter and reads the cumulative time of the module from the
+``-X importtime`` report.  ``--root`` points at another checkout (for example
+a ``git worktree`` of an older revision) to compare before/after numbers.
+"""
+
+from __future__ import annotations
+
+import argparse
+import pathlib
+import statistics
+import subprocess
+import sys
+
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
+
+
+def _parse_importtime(stderr: str) -> dict[str, tuple[int, int]]:
+    timings: dict[str, tuple[int, int]] = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, payload = line.split(":", 1)
+        try:
+            self_us, cumulative_us, name = (part.strip() for part in payload.split("|"))
+            timings[name] = (int(self_us), int(cumulative_us))
+        except ValueError:
+            continue
+    return timings
+
+
+def sample(module: str, root: pathlib.Path) -> dict[str, tuple[int, int]]:
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=root,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return _parse_importtime(completed.stderr)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", action="append", dest="modules")
+    parser.add_argument("--root", type=pathlib.Path, default=PROJECT_ROOT)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=8, help="slowest dependencies to list")
+    args = parser.parse_args(argv)
+    modules = args.modules or ["autopost.common", "autopost.pull_news"]
+
+    for module in modules:
+        samples = [sample(module, args.root) for _ in range(max(args.repeat, 1))]
+        totals = [timings.get(module, (0, 0))[1] for timings in samples]
+        print(f"{module}: median {statistics.median(totals) / 1000:.1f} ms "
+              f"(min {min(totals) / 1000:.1f} ms over {len(totals)} runs)")
+        slowest = sorted(samples[-1].items(), key=lambda item: item[1][0], reverse=True)
+        for name, (self_us, _) in slowest[: args.top]:
+            print(f"    {self_us / 1000:8.1f} ms self  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Compare the old full re-sort of posts.json with the sorted merge.
+
+Usage::
+
+    python -m benchmarks.bench_sort_merge [--sizes 3000,30000,300000] [--new 40]
+
+For each size the existing index is pre-sorted (as posts.json is on disk) and
+``--new`` fresh entries are merged in.  "full sort" re-sorts everything with an
+uncached date parser; "merge" uses :func:`autopost.archive_utils.merge_sorted`
+with the memoized ``_normalize_date_string`` starting from a cold cache.
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime
+import time
+
+from autopost import pull_news
+from autopost.archive_utils import merge_sorted
+from benchmarks.synthetic import make_entries
+
+_uncached_normalize = pull_news._normalize_date_string.__wrapped__
+
+
+def _uncached_sort_key(entry) -> str:
+    raw_str = str(entry.get("date") or "").strip()
+    return _uncached_normalize(raw_str) or raw_str
+
+
+def _timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def run(size: int, new_count: int) -> dict:
+    existing = make_entries(size, seed=size)
+    existing.sort(key=_uncached_sort_key, reverse=True)
+    new_entries = make_entries(
+        new_count, seed=7, months=1, end=datetime.datetime(2025, 10, 2, 12, 0, 0)
+    )
+
+    old_result, old_seconds = _timed(
+        lambda: sorted(new_entries + existing, key=_uncached_sort_key, reverse=True)
+    )
+    pull_news._normalize_date_string.cache_clear()
+    new_result, new_seconds = _timed(
+        lambda: merge_sorted(existing, new_entries, pull_news._entry_sort_key)
+    )
+    if [e["slug"] for e in old_result] != [e["slug"] for e in new_result]:
+        raise AssertionError(f"merge order differs from full sort at size {size}")
+    return {
+        "size": size,
+        "full_sort_s": old_seconds,
+        "merge_s": new_seconds,
+        "speedup": old_seconds / new_seconds if new_seconds else float("inf"),
+    }
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="3000,30000,300000")
+    parser.add_argument("--new", type=int, default=40, dest="new_count")
+    args = parser.parse_args(argv)
+
+    print(f"{'entries':>9} {'full sort':>11} {'merge':>9} {'speedup':>8}")
+    for raw in args.sizes.split(","):
+        row = run(int(raw), args.new_count)
+        print(
+            f"{row['size']:>9} {row['full_sort_s']:>10.3f}s {row['merge_s']:>8.3f}s "
+            f"{row['speedup']:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+"""Time each ingestion stage on the checked-in fixture corpus.
+
+Usage::
+
+    python -m benchmarks.bench_stages [--stage NAME] [--min-time 0.5]
+        [--baseline PATH] [--margin 0.5] [--update-baseline]
+
+The corpus lives in ``benchmarks/fixtures``: RSS and Atom feeds in
+``feeds/`` and downloaded article pages in ``articles/``.  Every stage is
+run on the output of the previous ones, prepared once up front, so each is
+timed on its own:
+
+* ``parse_feed`` - feed bytes to items;
+* ``extract_article_html`` - body extraction from a downloaded page (no
+  network; trafilatura or readability when installed, else plain text);
+* ``absolutize``, ``sanitize_article_html``, ``limit_words_html`` - the
+  body clean-up of :func:`autopost.pull_news.build_entry`, on the pages'
+  ``<article>`` markup and the full bodies the feeds carry (so the input
+  does not depend on which extractor is installed);
+* ``cover`` - :func:`find_cover_from_item` plus :func:`resolve_cover_url`;
+* ``normalize_post_entry`` and ``partition_writer`` - the persist path on
+  synthetic entries.
+
+Throughput is taken from the fastest of the passes run for at least
+``--min-time`` seconds; peak memory (``tracemalloc``) from one extra pass.
+With a baseline file (``benchmarks/baselines/stages.json`` by default) the
+run fails when a stage is slower, or peaks higher, than the baseline by more
+than ``--margin``.  Baselines are machine specific: refresh them with
+``--update-baseline`` on the machine that runs the check.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import pathlib
+import platform
+import re
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Callable, Optional
+from xml.etree import ElementTree as ET
+
+from autopost import common, pull_news
+from autopost.jsonio import atomic_write_text
+from benchmarks.synthetic import make_entries
+
+FIXTURES = pathlib.Path(__file__).with_name("fixtures")
+DEFAULT_BASELINE = pathlib.Path(__file__).with_name("baselines") / "stages.json"
+DEFAULT_MARGIN = 0.5
+# Allocation peaks below this are noise and never fail the check.
+PEAK_SLACK_KB = 64
+SYNTHETIC_ENTRIES = 2000
+
+_ARTICLE_RE = re.compile(r"(?is)<article\b[^>]*>(.*?)</article>")
+_CONTENT_TAGS = (
+    "{http://purl.org/rss/1.0/modules/content/}encoded",
+    "{http://www.w3.org/2005/Atom}content",
+)
+
+
+@dataclass
+class Stage:
+    name: str
+    run: Callable[[], None]
+    units: int
+    unit: str
+
+
+def extractor_name() -> str:
+    if common._load_trafilatura() is not None:
+        return "trafilatura"
+    if common._load_readability_document() is not None:
+        return "readability"
+    return "text"
+
+
+def build_stages(fixtures: pathlib.Path = FIXTURES) -> list[Stage]:
+    """Load the corpus and prepare every stage's input."""
+
+    feeds = [path.read_bytes() for path in sorted((fixtures / "feeds").glob("*.xml"))]
+    pages = []
+    for path in sorted((fixtures / "articles").glob("*.html")):
+        html = path.read_text(encoding="utf-8")
+        pages.append((common.canonical_url(html) or f"https://example.com/{path.stem}", html))
+
+    items = [item for feed in feeds for item in common.parse_feed(feed)]
+    bodies = [(url, m.group(1)) for url, html in pages for m in _ARTICLE_RE.finditer(html)]
+    for feed in feeds:
+        root = ET.fromstring(feed)
+        for tag in _CONTENT_TAGS:
+            bodies.extend(("https://example.com/", el.text) for el in root.iter(tag) if el.text)
+    absolute = [common.absolutize(body, url) for url, body in bodies]
+    sanitized = [common.sanitize_article_html(body) for body in absolute]
+    elements = [item["element"] for item in items]
+
+    entries = make_entries(SYNTHETIC_ENTRIES)
+    normalized = [pull_news._normalize_post_entry(entry) for entry in entries]
+    normalized.sort(key=pull_news._entry_sort_key, reverse=True)
+
+    def parse():
+        for feed in feeds:
+            common.parse_feed(feed)
+
+    def extract():
+        for _, html in pages:
+            common.extract_article_html(html)
+
+    def absolutize():
+        for url, body in bodies:
+            common.absolutize(body, url)
+
+    def sanitize():
+        for body in absolute:
+            common.sanitize_article_html(body)
+
+    def limit_words():
+        for body in sanitized:
+            common.limit_words_html(body, pull_news.TARGET_WORDS)
+
+    def cover():
+        for element in elements:
+            pull_news.resolve_cover_url(common.find_cover_from_item(element))
+
+    def normalize():
+        for entry in entries:
+            pull_news._normalize_post_entry(entry)
+
+    def partition():
+        with tempfile.TemporaryDirectory() as tmp:
+            writer = pull_news._PartitionWriter(pathlib.Path(tmp))
+            for entry in normalized:
+                writer.add(entry)
+            writer.close()
+
+    return [
+        Stage("parse_feed", parse, len(items), "items"),
+        Stage("extract_article_html", extract, len(pages), "pages"),
+        Stage("absolutize", absolutize, len(bodies), "bodies"),
+        Stage("sanitize_article_html", sanitize, len(absolute), "bodies"),
+        Stage("limit_words_html", limit_words, len(sanitized), "bodies"),
+        Stage("cover", cover, len(elements), "items"),
+        Stage("normalize_post_entry", normalize, len(entries), "entries"),
+        Stage("partition_writer", partition, len(normalized), "entries"),
+    ]
+
+
+def measure(stage: Stage, min_time: float) -> dict:
+    """Return ``per_sec`` (units per second) and ``peak_kb`` for one stage."""
+
+    stage.run()  # warm caches and imports outside the measurement
+    fastest, elapsed = float("inf"), 0.0
+    while elapsed < min_time or fastest == float("inf"):
+        start = time.perf_counter()
+        stage.run()
+        took = time.perf_counter() - start
+        fastest = min(fastest, took)
+        elapsed += took
+    tracemalloc.start()
+    try:
+        stage.run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "per_sec": stage.units / fastest if fastest else float("inf"),
+        "peak_kb": peak / 1024,
+    }
+
+
+def compare(results: dict, baseline: dict, margin: float) -> list[str]:
+    """Return a message for every stage that regressed beyond ``margin``."""
+
+    failures = []
+    for name, result in results.items():
+        base = (baseline.get("stages") or {}).get(name)
+        if not base:
+            continue
+        if name == "extract_article_html" and baseline.get("extractor") != extractor_name():
+            continue
+        min_rate = float(base["per_sec"]) / (1 + margin)
+        if result["per_sec"] < min_rate:
+            failures.append(
+                f"{name}: {result['per_sec']:.1f}/s is below {min_rate:.1f}/s "
+                f"(baseline {float(base['per_sec']):.1f}/s, margin {margin:.0%})"
+            )
+        max_peak = max(float(base["peak_kb"]) * (1 + margin), float(base["peak_kb"]) + PEAK_SLACK_KB)
+        if result["peak_kb"] > max_peak:
+            failures.append(
+                f"{name}: peak {result['peak_kb']:.0f} KB is above {max_peak:.0f} KB "
+                f"(baseline {float(base['peak_kb']):.0f} KB)"
+            )
+    return failures
+
+
+def load_baseline(path: pathlib.Path) -> Optional[dict]:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--stage", action="append", dest="stages", help="run only these stages")
+    parser.add_argument("--min-time", type=float, default=0.5, help="seconds to time each stage for")
+    parser.add_argument("--baseline", type=pathlib.Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--margin", type=float, default=DEFAULT_MARGIN)
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    stages = [s for s in build_stages() if not args.stages or s.name in args.stages]
+    results = {}
+    print(f"{'stage':<24} {'throughput':>18} {'peak':>10}")
+    for stage in stages:
+        results[stage.name] = row = measure(stage, args.min_time)
+        print(f"{stage.name:<24} {row['per_sec']:>10.1f} {stage.unit + '/s':<9} {row['peak_kb']:>7.0f} KB")
+
+    if args.update_baseline:
+        baseline = load_baseline(args.baseline) or {}
+        baseline.update(
+            extractor=extractor_name(),
+            python=platform.python_version(),
+            stages={**(baseline.get("stages") or {}), **results},
+        )
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write_text(args.baseline, json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+        print(f"baseline written to {args.baseline}")
+        return 0
+
+    baseline = load_baseline(args.baseline)
+    if baseline is None:
+        print(f"no baseline at {args.baseline}; run with --update-baseline to create one")
+        return 0
+    failures = compare(results, baseline, args.margin)
+    for message in failures:
+        print(f"REGRESSION {message}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
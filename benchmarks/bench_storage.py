@@ -0,0 +1,254 @@
+"""Measure how the storage layer scales with the number of stored entries.
+
+Usage::
+
+    python -m benchmarks.bench_storage [--sizes 10000,100000,1000000]
+        [--op archive_append] [--months 120] [--batch 40] [--body-words 20]
+        [--root PATH] [--csv PATH]
+
+For every size a fresh data directory is generated in one subprocess and the
+operation is then run alone in another, so the numbers cover that operation
+only:
+
+* ``archive_append`` - :func:`append_entries_to_archive` adding ``--batch``
+  trimmed posts to an archive of ``size`` entries over ``--months`` months,
+  with the production cold tier (``ARCHIVE_COLD_AFTER_MONTHS``) compacted;
+* ``update_manifest`` - rebuilding the archive ``index.json`` alone;
+* ``persist_posts`` - the output step of ``run_pull_news``: merging
+  ``--batch`` new posts into a ``posts.json`` of ``size`` entries (as if
+  ``MAX_POSTS_PERSIST`` were ``size``) and rewriting it with every
+  ``data/posts/<category>/<month>.json`` partition;
+* ``partition_writer`` - streaming that ``posts.json`` through the partition
+  writer alone.
+
+Each row reports wall time, the bytes passed to ``write()`` (Linux
+``/proc/self/io``) and the peak RSS of the worker (the interpreter and its
+imports included; ``base`` is the peak before the operation started).
+``--root`` runs the operations against another checkout (for example a
+``git worktree`` of an older revision) on identical data, and ``--csv``
+appends the rows to a file for plotting.
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import os
+import pathlib
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Optional
+
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
+OPERATIONS = ("archive_append", "update_manifest", "persist_posts", "partition_writer")
+COLD_AFTER_MONTHS = 12
+CURRENT_MONTH = "2025-09"
+
+
+def _io_written() -> Optional[int]:
+    try:
+        with open("/proc/self/io", encoding="ascii") as handle:
+            for line in handle:
+                if line.startswith("wchar:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def _peak_rss_kb() -> int:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+# ---- setup (always runs against this checkout) ----
+
+def _setup(op: str, data: pathlib.Path, size: int, months: int, batch: int, body_words: int) -> None:
+    from autopost import archive_utils, pull_news
+    from autopost.jsonio import JsonArrayWriter
+    from benchmarks.synthetic import iter_entries, make_entries
+
+    normalize = pull_news._normalize_date_string
+    stored = iter_entries(size, seed=size, months=months, body_words=body_words)
+    # One run's new posts, dated after everything stored.
+    new_entries = make_entries(batch, seed=7, months=0, body_words=body_words)
+    for idx, entry in enumerate(new_entries):
+        entry["slug"] = f"new-story-{idx}"
+        entry["source"] = f"https://example.com/new/{idx}"
+        entry["date"] = f"{CURRENT_MONTH}-30"
+    (data / "batch.json").write_text(json.dumps(new_entries), encoding="utf-8")
+
+    if op in ("archive_append", "update_manifest"):
+        archive = data / "archive"
+        archive.mkdir(parents=True)
+        month_key, month_entries = "", []
+
+        def flush():
+            if month_entries:
+                archive_utils._sort_entries(month_entries, normalize)
+                (archive / f"{month_key}.json").write_text(
+                    json.dumps(month_entries, ensure_ascii=False, indent=2), encoding="utf-8"
+                )
+
+        for entry in stored:
+            key = (normalize(entry["date"]) or CURRENT_MONTH)[:7]
+            if key != month_key:
+                flush()
+                month_key, month_entries = key, []
+            entry["archived_at"] = "2025-09-30T12:00:00Z"
+            month_entries.append(entry)
+        flush()
+        archive_utils.compact_archive(
+            archive,
+            cold_after_months=COLD_AFTER_MONTHS,
+            normalize_date=normalize,
+            current_month=CURRENT_MONTH,
+        )
+        archive_utils._update_manifest(archive, "2025-09-30T12:00:00Z")
+        return
+
+    posts_json = data / "posts.json"
+    writer = JsonArrayWriter(posts_json)
+    partitions = pull_news._PartitionWriter(data / "posts")
+    for entry in stored:
+        entry = pull_news._normalize_post_entry(entry)
+        writer.write(entry)
+        partitions.add(entry)
+    writer.close()
+    partitions.close()
+
+
+# ---- operations (run against ``--root``) ----
+
+def _operation(op: str, data: pathlib.Path, size: int) -> None:
+    from autopost import archive_utils, pull_news
+
+    batch = json.loads((data / "batch.json").read_text(encoding="utf-8"))
+    if op == "archive_append":
+        archive_utils.append_entries_to_archive(
+            data / "archive",
+            batch,
+            normalize_date=pull_news._normalize_date_string,
+            default_month=CURRENT_MONTH,
+            cold_after_months=COLD_AFTER_MONTHS,
+        )
+    elif op == "update_manifest":
+        archive_utils._update_manifest(data / "archive", "2025-10-01T00:00:00Z")
+    elif op == "persist_posts":
+        batch.sort(key=pull_news._entry_sort_key, reverse=True)
+        pull_news._persist_posts_streaming(
+            batch,
+            posts_json_path=data / "posts.json",
+            data_dir=data,
+            max_posts_persist=size,
+            archive_cold_after_months=0,
+        )
+    elif op == "partition_writer":
+        partitions = pull_news._PartitionWriter(data / "posts")
+        for entry in pull_news._iter_posts_file(data / "posts.json"):
+            partitions.add(entry)
+        partitions.close()
+    else:
+        raise ValueError(f"unknown operation {op!r}")
+
+
+def _worker(args) -> None:
+    data = pathlib.Path(args.data)
+    op = args.ops[0]
+    if args.worker == "setup":
+        _setup(op, data, args.size, args.months, args.batch, args.body_words)
+        return
+    base_rss = _peak_rss_kb()
+    written = _io_written()
+    start = time.perf_counter()
+    _operation(op, data, args.size)
+    seconds = time.perf_counter() - start
+    after = _io_written()
+    print(json.dumps({
+        "seconds": seconds,
+        "bytes_written": after - written if written is not None and after is not None else None,
+        "peak_rss_kb": _peak_rss_kb(),
+        "base_rss_kb": base_rss,
+    }))
+
+
+def _run_worker(kind: str, op: str, data: pathlib.Path, size: int, args, root: pathlib.Path) -> str:
+    # Operations import autopost from ``root``; setup always uses this checkout.
+    path = [str(root if kind == "run" else PROJECT_ROOT), str(PROJECT_ROOT)]
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(path))
+    completed = subprocess.run(
+        [
+            sys.executable, str(pathlib.Path(__file__).resolve()),
+            "--worker", kind, "--op", op, "--data", str(data), "--size", str(size),
+            "--months", str(args.months), "--batch", str(args.batch),
+            "--body-words", str(args.body_words),
+        ],
+        cwd=str(PROJECT_ROOT),
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if completed.returncode:
+        raise RuntimeError(f"{kind} {op} at {size} failed:\n{completed.stderr}")
+    return completed.stdout
+
+
+def run(op: str, size: int, args, root: pathlib.Path = PROJECT_ROOT) -> dict:
+    with tempfile.TemporaryDirectory(prefix="bench-storage-") as tmp:
+        data = pathlib.Path(tmp)
+        _run_worker("setup", op, data, size, args, root)
+        output = _run_worker("run", op, data, size, args, root)
+    row = json.loads(output.strip().splitlines()[-1])
+    row.update(op=op, size=size)
+    return row
+
+
+def _format_bytes(value: Optional[int]) -> str:
+    return "-" if value is None else f"{value / (1024 * 1024):.1f} MB"
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="10000,100000,1000000")
+    parser.add_argument("--op", action="append", dest="ops", choices=OPERATIONS)
+    parser.add_argument("--months", type=int, default=120, help="months the stored entries span")
+    parser.add_argument("--batch", type=int, default=40, help="entries added by one run")
+    parser.add_argument("--body-words", type=int, default=20)
+    parser.add_argument("--root", type=pathlib.Path, default=PROJECT_ROOT)
+    parser.add_argument("--csv", type=pathlib.Path)
+    parser.add_argument("--worker", choices=("setup", "run"), help=argparse.SUPPRESS)
+    parser.add_argument("--data", help=argparse.SUPPRESS)
+    parser.add_argument("--size", type=int, default=0, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        _worker(args)
+        return
+
+    rows = []
+    print(f"{'operation':<18} {'entries':>9} {'wall':>9} {'written':>11} {'peak RSS':>10} {'base':>8}")
+    for op in args.ops or OPERATIONS:
+        for raw in args.sizes.split(","):
+            row = run(op, int(raw), args, args.root.resolve())
+            rows.append(row)
+            print(
+                f"{op:<18} {row['size']:>9} {row['seconds']:>8.3f}s {_format_bytes(row['bytes_written']):>11} "
+                f"{row['peak_rss_kb'] / 1024:>7.1f} MB {row['base_rss_kb'] / 1024:>5.1f} MB"
+            )
+    if args.csv:
+        new_file = not args.csv.exists()
+        with args.csv.open("a", newline="", encoding="utf-8") as handle:
+            fields = ["op", "size", "seconds", "bytes_written", "peak_rss_kb", "base_rss_kb"]
+            writer = csv.DictWriter(handle, fieldnames=fields + ["root"])
+            if new_file:
+                writer.writeheader()
+            for row in rows:
+                writer.writerow({**{key: row[key] for key in fields}, "root": str(args.root)})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+"""Local HTTP origin serving a synthetic universe of feeds and articles.
+
+:class:`StubOrigin` starts a threaded HTTP server on ``127.0.0.1`` that
+serves ``feeds`` RSS feeds of ``articles`` items each, shaped by an
+:class:`OriginProfile`:
+
+* ``/feeds/<i>.xml`` - the feed, linking every item to its article;
+* ``/articles/<i>/<j>`` - the article page (``<link rel="canonical">``, an
+  ``<article>`` body starting with the item's marker word);
+* ``/r/<i>/<j>`` - a 301 to the article, used as the feed link of the
+  ``redirect_rate`` share of items.
+
+Every response waits for a delay drawn from ``latency`` (``fixed:S``,
+``uniform:A,B``, ``exp:MEAN`` or ``lognormal:MEDIAN,SIGMA``, in seconds) and
+carries an ``ETag``; a matching ``If-None-Match`` gets a 304.  Which feeds
+answer 503 (``feed_error_rate``), which articles answer 500
+(``error_rate``), trickle their body over ``slow_seconds`` (``slow_rate``,
+a slow-loris origin) or carry ``oversize_bytes`` of inline script
+(``oversize_rate``) is fixed by ``seed``, so :class:`Universe` knows the
+expected outcome of a run.  Request counts per status and bytes sent are
+kept in :attr:`StubOrigin.stats`.
+"""
+
+from __future__ import annotations
+
+import email.utils
+import hashlib
+import math
+import random
+import re
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Optional
+from xml.sax.saxutils import escape
+
+_ARTICLE_PATH = re.compile(r"^/(articles|r)/(\d+)/(\d+)$")
+_FEED_PATH = re.compile(r"^/feeds/(\d+)\.xml$")
+_EPOCH = 1_750_000_000  # fixed publication clock, so feeds are reproducible
+
+
+@dataclass
+class OriginProfile:
+    feeds: int = 20
+    articles: int = 10
+    latency: str = "fixed:0"
+    error_rate: float = 0.0
+    feed_error_rate: float = 0.0
+    redirect_rate: float = 0.0
+    slow_rate: float = 0.0
+    slow_seconds: float = 1.0
+    oversize_rate: float = 0.0
+    oversize_bytes: int = 2_000_000
+    body_words: int = 300
+    seed: int = 1
+
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    """Return a sampler for a ``kind:args`` latency distribution (seconds)."""
+
+    kind, _, raw = (spec or "fixed:0").partition(":")
+    try:
+        args = [float(value) for value in raw.split(",") if value.strip()]
+    except ValueError:
+        raise ValueError(f"invalid latency {spec!r}") from None
+    if kind == "fixed" and len(args) == 1:
+        return lambda rng: args[0]
+    if kind == "uniform" and len(args) == 2:
+        return lambda rng: rng.uniform(args[0], args[1])
+    if kind == "exp" and len(args) == 1:
+        return lambda rng: rng.expovariate(1 / args[0]) if args[0] > 0 else 0.0
+    if kind == "lognormal" and len(args) == 2:
+        return lambda rng: rng.lognormvariate(math.log(args[0]), args[1]) if args[0] > 0 else 0.0
+    raise ValueError(f"invalid latency {spec!r}")
+
+
+@dataclass
+class Article:
+    feed: int
+    index: int
+    title: str
+    summary: str
+    marker: str
+    words: str
+    error: bool = False
+    redirect: bool = False
+    slow: bool = False
+    oversize: bool = False
+
+
+class Universe:
+    """The feeds and articles of one :class:`OriginProfile`."""
+
+    def __init__(self, profile: OriginProfile):
+        self.profile = profile
+        rng = random.Random(profile.seed)
+        vocabulary = [f"{a}{b}" for a in ("al", "bo", "ci", "du", "ek", "fa", "gu", "hi") for b in range(300)]
+        self.failing_feeds = {i for i in range(profile.feeds) if rng.random() < profile.feed_error_rate}
+        self.articles: dict[tuple[int, int], Article] = {}
+        for i in range(profile.feeds):
+            for j in range(profile.articles):
+                self.articles[i, j] = Article(
+                    feed=i,
+                    index=j,
+                    title=" ".join(rng.sample(vocabulary, 8)).capitalize(),
+                    summary=" ".join(rng.sample(vocabulary, 20)),
+                    marker=f"marker{i}x{j}",
+                    words=" ".join(rng.choice(vocabulary) for _ in range(profile.body_words)),
+                    error=rng.random() < profile.error_rate,
+                    redirect=rng.random() < profile.redirect_rate,
+                    slow=rng.random() < profile.slow_rate,
+                    oversize=rng.random() < profile.oversize_rate,
+                )
+
+    def feeds_file(self, base: str, category: str = "Bench") -> str:
+        """Feeds-file lines (``category|sub|url``) for every feed."""
+
+        return "".join(f"{category}|Feed {i}|{base}/feeds/{i}.xml\n" for i in range(self.profile.feeds))
+
+    def link(self, base: str, article: Article) -> str:
+        kind = "r" if article.redirect else "articles"
+        return f"{base}/{kind}/{article.feed}/{article.index}"
+
+    def feed_xml(self, base: str, feed: int) -> bytes:
+        items = []
+        for j in range(self.profile.articles):
+            article = self.articles[feed, j]
+            published = email.utils.formatdate(_EPOCH - (feed * self.profile.articles + j) * 600, usegmt=True)
+            items.append(
+                "<item>"
+                f"<title>{escape(article.title)}</title>"
+                f"<link>{escape(self.link(base, article))}</link>"
+                f"<description>{escape(article.summary)}</description>"
+                f"<pubDate>{published}</pubDate>"
+                "</item>"
+            )
+        return (
+            '<?xml version="1.0" encoding="utf-8"?>'
+            f"<rss version=\"2.0\"><channel><title>Feed {feed}</title><link>{base}/</link>"
+            f"{''.join(items)}</channel></rss>"
+        ).encode("utf-8")
+
+    def article_html(self, base: str, article: Article) -> bytes:
+        canonical = f"{base}/articles/{article.feed}/{article.index}"
+        script = ""
+        if article.oversize:
+            script = "<script>var state = '" + "x" * self.profile.oversize_bytes + "';</script>"
+        return (
+            f"<html><head><title>{escape(article.title)}</title>"
+            f'<link rel="canonical" href="{canonical}"></head><body>{script}'
+            f"<article><h1>{escape(article.title)}</h1>"
+            f"<p>{article.marker} {article.words}</p></article></body></html>"
+        ).encode("utf-8")
+
+    def article_id(self, url: str) -> Optional[tuple[int, int]]:
+        """Return ``(feed, index)`` for an article or redirect URL of the universe."""
+
+        match = re.search(r"/(?:articles|r)/(\d+)/(\d+)$", url or "")
+        return (int(match.group(1)), int(match.group(2))) if match else None
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "_Server"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):  # noqa: A002 - BaseHTTPRequestHandler API
+        pass
+
+    def do_GET(self):
+        origin = self.server.origin
+        time.sleep(origin.delay())
+        base = origin.base_url
+        universe = origin.universe
+        path = self.path.split("?", 1)[0]
+        slow = False
+
+        feed = _FEED_PATH.match(path)
+        article = _ARTICLE_PATH.match(path)
+        if feed and int(feed.group(1)) < universe.profile.feeds:
+            if int(feed.group(1)) in universe.failing_feeds:
+                return self._send(503, b"unavailable", "text/plain")
+            body, content_type = universe.feed_xml(base, int(feed.group(1))), "application/rss+xml"
+        elif article and (int(article.group(2)), int(article.group(3))) in universe.articles:
+            record = universe.articles[int(article.group(2)), int(article.group(3))]
+            if article.group(1) == "r":
+                return self._send(301, b"", "text/plain", {"Location": f"{base}/articles/{record.feed}/{record.index}"})
+            if record.error:
+                return self._send(500, b"<html><body>Internal error</body></html>", "text/html")
+            body, content_type, slow = universe.article_html(base, record), "text/html; charset=utf-8", record.slow
+        else:
+            return self._send(404, b"not found", "text/plain")
+
+        etag = '"' + hashlib.sha1(body).hexdigest()[:16] + '"'
+        if etag in (self.headers.get("If-None-Match") or ""):
+            return self._send(304, b"", content_type, {"ETag": etag})
+        self._send(200, body, content_type, {"ETag": etag}, trickle=origin.profile.slow_seconds if slow else 0.0)
+
+    def _send(self, status: int, body: bytes, content_type: str, headers: Optional[dict] = None, trickle: float = 0.0):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        sent = 0
+        try:
+            if trickle > 0 and body:
+                # Slow-loris: the body arrives in ten pieces spread over ``trickle``.
+                step = max(1, -(-len(body) // 10))
+                for start in range(0, len(body), step):
+                    self.wfile.write(body[start:start + step])
+                    self.wfile.flush()
+                    sent += len(body[start:start + step])
+                    time.sleep(trickle / 10)
+            elif body:
+                self.wfile.write(body)
+                sent = len(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        self.server.origin.count(status, sent)
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    origin: "StubOrigin"
+
+
+class StubOrigin:
+    """Serve :class:`Universe` of ``profile`` until :meth:`stop` (or the ``with`` block ends)."""
+
+    def __init__(self, profile: Optional[OriginProfile] = None):
+        self.profile = profile or OriginProfile()
+        self.universe = Universe(self.profile)
+        self.stats: Counter = Counter()
+        self._latency = parse_latency(self.profile.latency)
+        self._rng = random.Random(self.profile.seed)
+        self._lock = threading.Lock()
+        self._server: Optional[_Server] = None
+        self._thread: Optional[threading.Thread] = None
+        self.base_url = ""
+
+    def delay(self) -> float:
+        with self._lock:
+            return max(0.0, self._latency(self._rng))
+
+    def count(self, status: int, sent: int) -> None:
+        with self._lock:
+            self.stats[f"status_{status}"] += 1
+            self.stats["requests"] += 1
+            self.stats["bytes_sent"] += sent
+
+    def start(self) -> "StubOrigin":
+        self._server = _Server(("127.0.0.1", 0), _Handler)
+        self._server.origin = self
+        self.base_url = f"http://127.0.0.1:{self._server.server_address[1]}"
+        self._thread = threading.Thread(target=self._server.serve_forever, name="stub-origin", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "StubOrigin":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
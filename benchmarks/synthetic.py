@@ -0,0 +1,82 @@
+"""Deterministic synthetic posts for the autopost benchmarks."""
+
+from __future__ import annotations
+
+import datetime
+import random
+from typing import Iterator, Optional
+
+CATEGORIES = (
+    ("News", "Politics"),
+    ("News", "World"),
+    ("Crypto", ""),
+    ("Lifestyle", "Wellness"),
+    ("Tech & AI", "Gadgets"),
+    ("Travel", "Guides"),
+    ("Culture & Arts", ""),
+    ("Food & Drink", "Recipes"),
+)
+
+# The pipeline stores ISO dates; a few legacy entries carry raw feed dates.
+_LEGACY_DATE_STYLES = (
+    lambda dt: dt.strftime("%a, %d %b %Y %H:%M:%S +0000"),
+    lambda dt: dt.strftime("%Y-%m-%dT%H:%M:%SZ"),
+    lambda dt: dt.strftime("%d %B %Y"),
+)
+
+
+def _format_date(index: int, when: datetime.datetime) -> str:
+    if index % 16 == 15:
+        return _LEGACY_DATE_STYLES[index % len(_LEGACY_DATE_STYLES)](when)
+    return when.strftime("%Y-%m-%d")
+
+
+def make_entry(index: int, when: datetime.datetime, rng: random.Random, body_words: int = 60) -> dict:
+    category, subcategory = CATEGORIES[index % len(CATEGORIES)]
+    words = " ".join(f"word{rng.randrange(5000)}" for _ in range(body_words))
+    return {
+        "slug": f"synthetic-story-{index}",
+        "title": f"Synthetic story {index}",
+        "category": category,
+        "subcategory": subcategory,
+        "date": _format_date(index, when),
+        "excerpt": words[:200],
+        "cover": f"https://img.example.com/{index}.jpg",
+        "source": f"https://example.com/story/{index}",
+        "source_domain": "example.com",
+        "source_name": "Example",
+        "author": "Example",
+        "rights": "Unknown",
+        "body": f"<p>{words}</p>",
+    }
+
+
+def iter_entries(
+    count: int,
+    *,
+    seed: int = 1,
+    months: int = 24,
+    end: Optional[datetime.datetime] = None,
+    body_words: int = 60,
+) -> Iterator[dict]:
+    """Yield ``count`` entries spread over ``months`` months, newest first."""
+
+    rng = random.Random(seed)
+    end = end or datetime.datetime(2025, 9, 30, 12, 0, 0)
+    span_seconds = months * 30 * 24 * 3600
+    step = span_seconds / max(count, 1)
+    for idx in range(count):
+        yield make_entry(idx, end - datetime.timedelta(seconds=int(idx * step)), rng, body_words)
+
+
+def make_entries(
+    count: int,
+    *,
+    seed: int = 1,
+    months: int = 24,
+    end: Optional[datetime.datetime] = None,
+    body_words: int = 60,
+) -> list[dict]:
+    """Return ``count`` entries spread over ``months`` months, newest first."""
+
+    return list(iter_entries(count, seed=seed, months=months, end=end, body_words=body_words))
@@ -71,6 +71,8 @@
     rawMonths.forEach(function (entry) {
       var key = '';
       var count = 0;
+      var cold = null;
+      var tier = 'hot';
       if (typeof entry === 'string') {
         key = sanitizeMonthKey(entry);
       } else if (entry && typeof entry === 'object') {
@@ -79,10 +81,18 @@
         if (!Number.isNaN(rawCount) && Number.isFinite(rawCount)) {
           count = Math.max(0, Math.floor(rawCount));
         }
+        if ((entry.tier === 'cold' || entry.tier === 'mixed') && typeof entry.bundle === 'string') {
+          tier = entry.tier;
+          cold = {
+            bundle: entry.bundle,
+            offset: Math.max(0, Math.floor(Number(entry.offset) || 0)),
+            length: Math.max(0, Math.floor(Number(entry.length) || 0))
+          };
+        }
       }
       if (!key || seen[key]) return;
       seen[key] = true;
-      months.push({ key: key, count: count });
+      months.push({ key: key, count: count, tier: tier, cold: cold });
     });
 
     months.sort(function (a, b) {
@@ -99,6 +109,87 @@
     return basePath.resolveAll ? basePath.resolveAll(sources) : sources;
   }
 
+  function buildColdBundleSources(bundle) {
+    var clean = String(bundle || '').replace(/^\/+/, '');
+    if (!/^[A-Za-z0-9_\/-]+\.jsonl\.gz$/.test(clean) || clean.indexOf('..') !== -1) return [];
+    var sources = ['/data/archive/' + clean, 'data/archive/' + clean];
+    return basePath.resolveAll ? basePath.resolveAll(sources) : sources;
+  }
+
+  function findArchiveMonth(monthKey) {
+    for (var i = 0; i < archiveMonths.length; i++) {
+      if (archiveMonths[i].key === monthKey) return archiveMonths[i];
+    }
+    return null;
+  }
+
+  function inflateJsonLines(buffer) {
+    if (typeof DecompressionStream !== 'function') {
+      return Promise.reject(new Error('DecompressionStream is not available'));
+    }
+    var stream = new Blob([buffer]).stream().pipeThrough(new DecompressionStream('gzip'));
+    return new Response(stream).text().then(function (text) {
+      var items = [];
+      text.split('\n').forEach(function (line) {
+        if (!line.trim()) return;
+        try {
+          var item = JSON.parse(line);
+          if (item && typeof item === 'object') items.push(item);
+        } catch (err) {
+          // Skip malformed lines
+        }
+      });
+      return items;
+    });
+  }
+
+  function fetchColdMember(cold) {
+    var sources = buildColdBundleSources(cold && cold.bundle);
+    if (!sources.length || !cold.length || typeof fetch !== 'function') {
+      return Promise.resolve([]);
+    }
+    var rangeEnd = cold.offset + cold.length - 1;
+    var index = 0;
+
+    function tryNext() {
+      if (index >= sources.length) {
+        return Promise.reject(new Error('Cold archive bundle not found'));
+      }
+      var url = sources[index++];
+      return fetch(url, { headers: { Range: 'bytes=' + cold.offset + '-' + rangeEnd } })
+        .then(function (response) {
+          if (!response || !response.ok) return tryNext();
+          return response.arrayBuffer().then(function (buffer) {
+            // Servers that ignore Range answer 200 with the whole bundle.
+            if (response.status !== 206) {
+              buffer = buffer.slice(cold.offset, cold.offset + cold.length);
+            }
+            return inflateJsonLines(buffer);
+          });
+        }, tryNext);
+    }
+
+    return tryNext();
+  }
+
+  function mergeArchiveItems(hotItems, coldItems) {
+    var seen = Object.create(null);
+    var merged = [];
+    hotItems.concat(coldItems).forEach(function (item) {
+      var key = (item.slug || item.source || item.title || '') + '|' + (item.date || '');
+      if (seen[key]) return;
+      seen[key] = true;
+      merged.push(item);
+    });
+    merged.sort(function (a, b) {
+      var left = String(a.date || '');
+      var right = String(b.date || '');
+      if (left === right) return 0;
+      return left < right ? 1 : -1;
+    });
+    return merged;
+  }
+
   function getArchiveManifest() {
     if (archiveManifestPromise) {
       return archiveManifestPromise;
@@ -128,11 +219,26 @@
       archiveMonthCache[sanitized] = empty;
       return empty;
     }
-    var promise = fetchSequential(sources)
-      .then(function (items) { return Array.isArray(items) ? items : []; })
-      .catch(function (err) {
-        console.warn('archive month load error', sanitized, err);
+    var monthEntry = findArchiveMonth(sanitized);
+    var hotPromise = monthEntry && monthEntry.tier === 'cold'
+      ? Promise.resolve([])
+      : fetchSequential(sources)
+        .then(function (items) { return Array.isArray(items) ? items : []; })
+        .catch(function (err) {
+          console.warn('archive month load error', sanitized, err);
+          return [];
+        });
+    var coldPromise = monthEntry && monthEntry.cold
+      ? fetchColdMember(monthEntry.cold).catch(function (err) {
+        console.warn('archive cold month load error', sanitized, err);
         return [];
+      })
+      : Promise.resolve([]);
+    var promise = Promise.all([hotPromise, coldPromise])
+      .then(function (results) {
+        if (!results[1].length) return results[0];
+        if (!results[0].length) return results[1];
+        return mergeArchiveItems(results[0], results[1]);
       });
     archiveMonthCache[sanitized] = promise;
     return promise;
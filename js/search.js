@@ -12,6 +12,13 @@
   };
 
   var POSTS_SOURCES = ['/data/posts.json', 'data/posts.json'];
+  // Prebuilt index written by autopost/search_index.py.
+  var INDEX_ROOTS = ['/data/search/', 'data/search/'];
+  // Keep in sync with TOKEN_SPLIT and the term lengths in autopost/search_index.py.
+  var TOKEN_SPLIT = /[\s\x00-\x2f\x3a-\x40\x5b-\x60\x7b-\x7f\u00a0-\u00bf\u00d7\u00f7\u2000-\u206f\u3000-\u303f]+/;
+  var MIN_TERM_LENGTH = 2;
+  var MAX_TERM_LENGTH = 32;
+  var MAX_INDEX_RESULTS = 100;
   var DEFAULT_IMAGE = basePath.resolve ? basePath.resolve('/images/logo.png') : '/images/logo.png';
 
   function getQuery() {
@@ -19,11 +26,19 @@
     return params.get('q') || '';
   }
 
-  function loadPosts() {
+  function fetchJson(sources, options) {
     if (!window.AventurOODataLoader || typeof window.AventurOODataLoader.fetchSequential !== 'function') {
       return Promise.reject(new Error('Data loader is not available'));
     }
-    return window.AventurOODataLoader.fetchSequential(POSTS_SOURCES);
+    return window.AventurOODataLoader.fetchSequential(sources, options);
+  }
+
+  function loadPosts() {
+    return fetchJson(POSTS_SOURCES);
+  }
+
+  function fetchIndexFile(path, options) {
+    return fetchJson(INDEX_ROOTS.map(function (root) { return root + path; }), options);
   }
 
   function escapeHtml(value) {
@@ -64,6 +79,102 @@
     return normalized ? normalized.split(' ') : [];
   }
 
+  function indexTerms(value) {
+    var seen = Object.create(null);
+    return normalizeText(value).split(TOKEN_SPLIT).filter(function (term) {
+      if (term.length < MIN_TERM_LENGTH || term.length > MAX_TERM_LENGTH || seen[term]) return false;
+      seen[term] = true;
+      return true;
+    });
+  }
+
+  function shardFile(key) {
+    if (/^[a-z0-9]+$/.test(key)) return key;
+    var bytes = unescape(encodeURIComponent(key));
+    var hex = '';
+    for (var i = 0; i < bytes.length; i += 1) {
+      hex += ('0' + bytes.charCodeAt(i).toString(16)).slice(-2);
+    }
+    return 'x-' + hex;
+  }
+
+  // Shards that can hold terms starting with ``term``: the deeper shards
+  // whose key starts with it and the shallower ones its own prefix names.
+  function shardsForTerm(shardKeys, term) {
+    return shardKeys.filter(function (key) {
+      return key.indexOf(term) === 0 || term.indexOf(key) === 0;
+    });
+  }
+
+  // Resolve ``terms`` (all must match, each as a word prefix) against the
+  // index; resolves to {total, posts} with the newest MAX_INDEX_RESULTS posts.
+  function searchIndex(terms) {
+    var revalidate = { cache: 'no-cache' };
+    return fetchIndexFile('manifest.json').then(function (manifest) {
+      var shardKeys = manifest && Array.isArray(manifest.shards) ? manifest.shards : null;
+      var docChunk = manifest && Number(manifest.doc_chunk);
+      if (!shardKeys || !docChunk) {
+        throw new Error('Search index is not available');
+      }
+
+      var needed = Object.create(null);
+      terms.forEach(function (term) {
+        shardsForTerm(shardKeys, term).forEach(function (key) { needed[key] = true; });
+      });
+      var keys = Object.keys(needed);
+
+      return Promise.all(keys.map(function (key) {
+        return fetchIndexFile('terms/' + shardFile(key) + '.json', revalidate);
+      })).then(function (shards) {
+        var matches = null;
+        terms.forEach(function (term) {
+          var docs = Object.create(null);
+          shards.forEach(function (shard) {
+            Object.keys(shard || {}).forEach(function (indexed) {
+              if (indexed.indexOf(term) !== 0 || !Array.isArray(shard[indexed])) return;
+              shard[indexed].forEach(function (id) { docs[id] = true; });
+            });
+          });
+          if (matches === null) {
+            matches = docs;
+            return;
+          }
+          Object.keys(matches).forEach(function (id) {
+            if (!docs[id]) delete matches[id];
+          });
+        });
+
+        var ids = Object.keys(matches || {}).map(Number).sort(function (a, b) { return b - a; });
+        var shown = ids.slice(0, MAX_INDEX_RESULTS);
+        var chunks = Object.create(null);
+        shown.forEach(function (id) { chunks[Math.floor(id / docChunk)] = true; });
+        var chunkNumbers = Object.keys(chunks);
+
+        return Promise.all(chunkNumbers.map(function (number) {
+          return fetchIndexFile('docs/' + number + '.json', revalidate);
+        })).then(function (loaded) {
+          var docs = Object.create(null);
+          loaded.forEach(function (chunk) {
+            Object.keys(chunk || {}).forEach(function (id) { docs[id] = chunk[id]; });
+          });
+          return {
+            total: ids.length,
+            posts: shown.map(function (id) { return docs[id]; }).filter(Boolean)
+          };
+        });
+      });
+    });
+  }
+
+  function scanPosts(tokens) {
+    return loadPosts().then(function (posts) {
+      var filtered = Array.isArray(posts) ? posts.filter(function (post) {
+        return matchesQuery(post, tokens);
+      }) : [];
+      return { total: filtered.length, posts: filtered };
+    });
+  }
+
   function formatDate(dateValue) {
     if (!dateValue) return '';
     var parsed = new Date(dateValue);
@@ -194,18 +305,23 @@
     var resultInfo = document.querySelector('.search-result');
     var resultsContainer = document.getElementById('search-results');
 
-    loadPosts()
-      .then(function (posts) {
-        var tokens = tokenize(query);
-        var filtered = Array.isArray(posts) ? posts.filter(function (post) {
-          return matchesQuery(post, tokens);
-        }) : [];
+    var tokens = tokenize(query);
+    var terms = indexTerms(query);
+    // The index needs whole terms; an empty query or one made only of
+    // one-letter words (and a site without an index) scans posts.json.
+    var search = terms.length
+      ? searchIndex(terms).catch(function () { return scanPosts(tokens); })
+      : scanPosts(tokens);
+
+    search
+      .then(function (results) {
+        var filtered = results.posts;
 
         if (resultInfo) {
           if (tokens.length) {
-            resultInfo.textContent = 'Search results for "' + query + '" (' + filtered.length + ' found).';
+            resultInfo.textContent = 'Search results for "' + query + '" (' + results.total + ' found).';
           } else {
-            resultInfo.textContent = 'Showing all posts (' + filtered.length + ').';
+            resultInfo.textContent = 'Showing all posts (' + results.total + ').';
           }
         }
 
@@ -0,0 +1,98 @@
+import contextlib
+import json
+import pathlib
+import tempfile
+import unittest
+from unittest import mock
+
+from autopost import apply_deltas, pull_news
+
+
+def _items(feed_url, count=2):
+    return [
+        {"title": f"{feed_url} {idx}", "link": f"{feed_url}/post-{idx}", "summary": "", "element": None}
+        for idx in range(count)
+    ]
+
+
+class ApplyDeltasTests(unittest.TestCase):
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.tmp_path = pathlib.Path(self._tmpdir.name)
+
+    def tearDown(self):
+        self._tmpdir.cleanup()
+
+    def _config(self, category, **overrides):
+        feeds = self.tmp_path / f"feeds_{category.lower()}.txt"
+        feeds.write_text(f"{category}|Misc|https://example.com/{category.lower()}\n", encoding="utf-8")
+        options = dict(
+            data_dir=self.tmp_path,
+            posts_json=self.tmp_path / "posts.json",
+            seen_db=self.tmp_path / "seen.json",
+            feeds=feeds,
+            category=category,
+            max_per_category=5,
+            max_per_feed=5,
+            max_total=0,
+            delta=True,
+            delta_dir=self.tmp_path / "deltas",
+        )
+        options.update(overrides)
+        return pull_news.PullNewsConfig(**options)
+
+    def _run(self, config):
+        patchers = [
+            mock.patch.object(pull_news, "fetch_bytes", side_effect=lambda url: url.encode("utf-8")),
+            mock.patch.object(pull_news, "parse_feed", side_effect=lambda xml: _items(xml.decode("utf-8"))),
+            mock.patch.object(pull_news, "extract_body_html", return_value=("<p>Body</p>", "")),
+            mock.patch.object(pull_news, "find_cover_from_item", return_value=""),
+        ]
+        with contextlib.ExitStack() as stack:
+            for patcher in patchers:
+                stack.enter_context(patcher)
+            return pull_news.run_pull_news(config)
+
+    def _posts(self):
+        return json.loads((self.tmp_path / "posts.json").read_text(encoding="utf-8"))
+
+    def test_parallel_runs_only_write_deltas_and_reducer_folds_them_once(self):
+        self._run(self._config("Travel"))
+        self._run(self._config("Lifestyle"))
+        self.assertFalse((self.tmp_path / "posts.json").exists())
+        self.assertFalse((self.tmp_path / "seen.json").exists())
+        self.assertEqual(len(apply_deltas.pending_deltas(self.tmp_path / "deltas")), 2)
+
+        result = apply_deltas.apply_deltas(self._config("Travel", delta=False))
+        self.assertEqual(result.added_count, 4)
+        self.assertEqual(len(self._posts()), 4)
+        seen = json.loads((self.tmp_path / "seen.json").read_text(encoding="utf-8"))
+        self.assertEqual(len(seen), 4)
+        self.assertEqual(apply_deltas.pending_deltas(self.tmp_path / "deltas"), [])
+
+        # Re-applying, even after forgetting which deltas were applied, changes nothing.
+        (self.tmp_path / "deltas" / apply_deltas.APPLIED_STATE_NAME).unlink()
+        again = apply_deltas.apply_deltas(self._config("Travel", delta=False))
+        self.assertEqual(again.added_count, 0)
+        self.assertEqual(len(self._posts()), 4)
+
+    def test_dropped_links_are_removed_and_never_return(self):
+        self._run(self._config("Travel"))
+        apply_deltas.apply_deltas(self._config("Travel", delta=False))
+
+        dropped_link = "https://example.com/travel/post-0"
+        pull_news.write_delta(
+            self.tmp_path / "deltas", [], dropped=[pull_news.link_hash(dropped_link)]
+        )
+        apply_deltas.apply_deltas(self._config("Travel", delta=False))
+        self.assertEqual([p["source"] for p in self._posts()], ["https://example.com/travel/post-1"])
+
+        self._run(self._config("Travel", delta=False))
+        self.assertNotIn(dropped_link, [p["source"] for p in self._posts()])
+
+        self.assertEqual(apply_deltas.prune_applied(self.tmp_path / "deltas"), 2)
+        self.assertEqual(list((self.tmp_path / "deltas").glob("2*.json")), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,160 @@
+import gzip
+import json
+import pathlib
+import tempfile
+import unittest
+from unittest import mock
+
+from autopost import archive_utils
+
+
+def _normalize(value: str) -> str:
+    return (value or "")[:10]
+
+
+def _entry(slug: str, date: str) -> dict:
+    return {"slug": slug, "title": slug.title(), "date": date}
+
+
+class ColdTierArchiveTests(unittest.TestCase):
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.root = pathlib.Path(self._tmpdir.name) / "archive"
+
+    def tearDown(self):
+        self._tmpdir.cleanup()
+
+    def _append(self, entries, cold_after_months=0):
+        archive_utils.append_entries_to_archive(
+            self.root,
+            entries,
+            normalize_date=_normalize,
+            default_month="2025-09",
+            cold_after_months=cold_after_months,
+        )
+
+    def test_compaction_moves_old_months_into_yearly_bundle(self):
+        self._append(
+            [
+                _entry("old-a", "2023-01-05"),
+                _entry("old-b", "2023-02-10"),
+                _entry("recent", "2025-08-01"),
+            ]
+        )
+
+        compacted = archive_utils.compact_archive(
+            self.root,
+            cold_after_months=12,
+            normalize_date=_normalize,
+            current_month="2025-09",
+        )
+
+        self.assertEqual(compacted, ["2023-02", "2023-01"])
+        self.assertFalse((self.root / "2023-01.json").exists())
+        self.assertTrue((self.root / "2025-08.json").exists())
+        manifest = json.loads((self.root / "index.json").read_text(encoding="utf-8"))
+        tiers = {month["key"]: month["tier"] for month in manifest["months"]}
+        self.assertEqual(tiers, {"2025-08": "hot", "2023-02": "cold", "2023-01": "cold"})
+        self.assertEqual(manifest["total_entries"], 3)
+
+        cold = next(m for m in manifest["months"] if m["key"] == "2023-01")
+        self.assertRegex(cold["bundle"], r"^cold/2023-[0-9a-f]{12}\.jsonl\.gz$")
+        with (self.root / cold["bundle"]).open("rb") as handle:
+            handle.seek(cold["offset"])
+            member = gzip.decompress(handle.read(cold["length"])).decode("utf-8")
+        self.assertEqual(json.loads(member.splitlines()[0])["slug"], "old-a")
+
+    def test_reader_merges_late_entries_with_cold_month(self):
+        self._append([_entry("old-a", "2023-01-05")])
+        archive_utils.compact_archive(
+            self.root,
+            cold_after_months=12,
+            normalize_date=_normalize,
+            current_month="2025-09",
+        )
+
+        self._append([_entry("late", "2023-01-20"), _entry("old-a", "2023-01-05")])
+        manifest = json.loads((self.root / "index.json").read_text(encoding="utf-8"))
+        self.assertEqual(manifest["months"][0]["tier"], "mixed")
+        self.assertEqual(manifest["months"][0]["count"], 2)
+
+        entries = archive_utils.read_archive_month(self.root, "2023-01", normalize_date=_normalize)
+        self.assertEqual([item["slug"] for item in entries], ["late", "old-a"])
+        self.assertEqual(
+            [item["slug"] for item in archive_utils.iter_archive_entries(self.root)],
+            ["late", "old-a"],
+        )
+
+    def test_append_with_cold_threshold_compacts_immediately(self):
+        self._append([_entry("ancient", "2001-03-01")], cold_after_months=6)
+
+        self.assertEqual(archive_utils.list_archive_months(self.root), ["2001-03"])
+        self.assertFalse((self.root / "2001-03.json").exists())
+        entries = archive_utils.read_archive_month(self.root, "2001-03")
+        self.assertEqual([item["slug"] for item in entries], ["ancient"])
+
+
+    def test_crash_before_manifest_keeps_old_bundle_readable(self):
+        self._append([_entry("old-a", "2023-01-05")])
+        archive_utils.compact_archive(
+            self.root,
+            cold_after_months=12,
+            normalize_date=_normalize,
+            current_month="2025-09",
+        )
+        first_bundle = archive_utils._load_cold_manifest(self.root)["2023-01"]["bundle"]
+
+        self._append([_entry("old-b", "2023-02-10")])
+        with mock.patch.object(archive_utils, "_write_cold_manifest", side_effect=OSError("crash")):
+            with self.assertRaises(OSError):
+                archive_utils.compact_archive(
+                    self.root,
+                    cold_after_months=12,
+                    normalize_date=_normalize,
+                    current_month="2025-09",
+                )
+        entries = archive_utils.read_archive_month(self.root, "2023-01")
+
+        archive_utils.compact_archive(
+            self.root,
+            cold_after_months=12,
+            normalize_date=_normalize,
+            current_month="2025-09",
+        )
+        bundles = sorted(path.name for path in (self.root / "cold").glob("*.jsonl.gz*"))
+        cold = archive_utils._load_cold_manifest(self.root)
+
+        self.assertEqual([item["slug"] for item in entries], ["old-a"])
+        self.assertNotEqual(cold["2023-02"]["bundle"], first_bundle)
+        self.assertEqual(cold["2023-01"]["bundle"], cold["2023-02"]["bundle"])
+        self.assertEqual(bundles, [cold["2023-01"]["bundle"].split("/")[-1]])
+        self.assertEqual(
+            [item["slug"] for item in archive_utils.iter_archive_entries(self.root)],
+            ["old-b", "old-a"],
+        )
+
+
+class MergeSortedTests(unittest.TestCase):
+    def _key(self, item):
+        return item["date"]
+
+    def test_merge_matches_stable_sort(self):
+        existing = [_entry("b", "2024-05-02"), _entry("c", "2024-05-01"), _entry("d", "2024-04-01")]
+        additions = [_entry("x", "2024-04-01"), _entry("a", "2024-06-01"), _entry("y", "2024-05-01")]
+
+        merged = archive_utils.merge_sorted(existing, additions, self._key)
+        expected = sorted(additions + existing, key=self._key, reverse=True)
+        self.assertEqual([e["slug"] for e in merged], [e["slug"] for e in expected])
+
+        merged = archive_utils.merge_sorted(existing, additions, self._key, prefer_existing=True)
+        expected = sorted(existing + additions, key=self._key, reverse=True)
+        self.assertEqual([e["slug"] for e in merged], [e["slug"] for e in expected])
+
+    def test_unsorted_existing_falls_back_to_full_sort(self):
+        existing = [_entry("old", "2020-01-01"), _entry("new", "2024-01-01")]
+        merged = archive_utils.merge_sorted(existing, [_entry("mid", "2022-01-01")], self._key)
+        self.assertEqual([e["slug"] for e in merged], ["new", "mid", "old"])
+
+
+if __name__ == "__main__":
+    unittest.main()
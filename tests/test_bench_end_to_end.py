@@ -0,0 +1,73 @@
+import unittest
+import urllib.error
+import urllib.request
+
+from benchmarks import bench_end_to_end
+from benchmarks.stub_origin import OriginProfile, StubOrigin, parse_latency
+
+
+class StubOriginTests(unittest.TestCase):
+    def test_serves_feeds_redirects_errors_and_conditional_requests(self):
+        profile = OriginProfile(feeds=2, articles=3, error_rate=0.5, redirect_rate=0.5, seed=3)
+        with StubOrigin(profile) as origin:
+            base = origin.base_url
+            universe = origin.universe
+            with urllib.request.urlopen(f"{base}/feeds/0.xml") as response:
+                etag = response.headers["ETag"]
+                self.assertIn(b"<rss", response.read())
+
+            request = urllib.request.Request(f"{base}/feeds/0.xml", headers={"If-None-Match": etag})
+            with self.assertRaises(urllib.error.HTTPError) as raised:
+                urllib.request.urlopen(request)
+            self.assertEqual(raised.exception.code, 304)
+
+            for article in universe.articles.values():
+                link = universe.link(base, article)
+                if article.error:
+                    with self.assertRaises(urllib.error.HTTPError):
+                        urllib.request.urlopen(link)
+                    continue
+                with urllib.request.urlopen(link) as response:
+                    self.assertEqual(response.geturl(), f"{base}/articles/{article.feed}/{article.index}")
+                    self.assertIn(article.marker.encode(), response.read())
+
+        self.assertTrue(any(a.error for a in universe.articles.values()))
+        self.assertGreater(origin.stats["status_301"], 0)
+
+    def test_latency_specs(self):
+        import random
+
+        rng = random.Random(1)
+        self.assertEqual(parse_latency("fixed:0.25")(rng), 0.25)
+        self.assertTrue(0.1 <= parse_latency("uniform:0.1,0.2")(rng) <= 0.2)
+        self.assertGreater(parse_latency("lognormal:0.01,0.5")(rng), 0)
+        with self.assertRaises(ValueError):
+            parse_latency("gamma:1")
+
+
+class EndToEndTests(unittest.TestCase):
+    def test_run_publishes_every_reachable_article_once(self):
+        profile = OriginProfile(
+            feeds=3,
+            articles=4,
+            error_rate=0.2,
+            feed_error_rate=0.3,
+            redirect_rate=0.3,
+            slow_rate=0.2,
+            slow_seconds=0.05,
+            oversize_rate=0.2,
+            oversize_bytes=50_000,
+            body_words=60,
+            seed=5,
+        )
+
+        row = bench_end_to_end.run(profile)
+
+        self.assertTrue(row["check"]["ok"], row["check"]["problems"])
+        self.assertEqual(row["items"], row["check"]["expected"])
+        self.assertGreater(row["items_per_sec"], 0)
+        self.assertGreater(row["origin"]["requests"], row["items"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+
+from autopost import common
+from benchmarks import bench_stages
+
+
+class StageBenchmarkTests(unittest.TestCase):
+    def test_every_stage_runs_on_the_fixture_corpus(self):
+        stages = bench_stages.build_stages()
+
+        self.assertEqual(
+            [stage.name for stage in stages],
+            [
+                "parse_feed",
+                "extract_article_html",
+                "absolutize",
+                "sanitize_article_html",
+                "limit_words_html",
+                "cover",
+                "normalize_post_entry",
+                "partition_writer",
+            ],
+        )
+        for stage in stages:
+            with self.subTest(stage=stage.name):
+                self.assertGreater(stage.units, 0)
+                row = bench_stages.measure(stage, min_time=0)
+                self.assertGreater(row["per_sec"], 0)
+
+    def test_compare_flags_slower_and_larger_stages_beyond_the_margin(self):
+        baseline = {
+            "extractor": bench_stages.extractor_name(),
+            "stages": {
+                "parse_feed": {"per_sec": 1000.0, "peak_kb": 500.0},
+                "cover": {"per_sec": 1000.0, "peak_kb": 10.0},
+                "absolutize": {"per_sec": 1000.0, "peak_kb": 100.0},
+            },
+        }
+        results = {
+            "parse_feed": {"per_sec": 700.0, "peak_kb": 900.0},
+            "cover": {"per_sec": 900.0, "peak_kb": 60.0},
+            "absolutize": {"per_sec": 800.0, "peak_kb": 120.0},
+            "limit_words_html": {"per_sec": 1.0, "peak_kb": 1.0},
+        }
+
+        failures = bench_stages.compare(results, baseline, margin=0.3)
+
+        self.assertEqual(len(failures), 2)
+        self.assertTrue(all(message.startswith("parse_feed:") for message in failures))
+
+    def test_extract_article_html_falls_back_to_page_text(self):
+        if bench_stages.extractor_name() != "text":
+            self.skipTest("an extractor library is installed")
+
+        body, first_img = common.extract_article_html("<html><script>x()</script><p>Hello <b>world</b></p></html>")
+
+        self.assertEqual((body, first_img), ("<p>Hello world</p>", ""))
+        self.assertEqual(common.extract_article_html(""), ("", ""))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,23 @@
+import argparse
+import unittest
+
+from benchmarks import bench_storage
+
+
+class StorageBenchmarkTests(unittest.TestCase):
+    def test_every_operation_reports_time_bytes_and_memory(self):
+        args = argparse.Namespace(months=3, batch=5, body_words=5)
+
+        for op in bench_storage.OPERATIONS:
+            with self.subTest(op=op):
+                row = bench_storage.run(op, 300, args)
+
+                self.assertEqual((row["op"], row["size"]), (op, 300))
+                self.assertGreater(row["seconds"], 0)
+                self.assertGreaterEqual(row["peak_rss_kb"], row["base_rss_kb"])
+                if row["bytes_written"] is not None:
+                    self.assertGreater(row["bytes_written"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,13 @@
+import contextlib
+import pathlib
+import tempfile
+import types
 import unittest
+import urllib.error
+from unittest import mock
 
-from autopost.common import limit_words_html
+from autopost import common, pull_news
+from autopost.common import canonical_url, limit_words_html
 
 
 class LimitWordsHtmlTests(unittest.TestCase):
@@ -36,5 +43,58 @@ class LimitWordsHtmlTests(unittest.TestCase):
         )
 
 
+class CanonicalUrlTests(unittest.TestCase):
+    def test_canonical_link_is_resolved_against_the_final_url(self):
+        html = (
+            "<html><head><title>x</title>"
+            "<link href='/world/story?ref=rss&amp;x=1' rel=\"Canonical\">"
+            "</head><body><link rel=canonical href=/not-in-head></body></html>"
+        )
+
+        self.assertEqual(
+            canonical_url(html, "https://news.example/amp/world/story"),
+            "https://news.example/world/story?ref=rss&x=1",
+        )
+
+    def test_missing_or_unusable_canonical_gives_empty_string(self):
+        self.assertEqual(canonical_url("<head><link rel='stylesheet' href='/a.css'></head>", "https://a.example/"), "")
+        self.assertEqual(canonical_url('<head><link rel="canonical" href="javascript:void(0)"></head>'), "")
+
+
+class ExtractBodyHtmlTests(unittest.TestCase):
+    def test_error_page_is_skipped(self):
+        page = "<html><body><h1>Page not found</h1><p>Try the search box.</p></body></html>"
+        response = types.SimpleNamespace(
+            status=404, html=page, data=page.encode("utf-8"), url="https://example.com/gone"
+        )
+        fake = types.SimpleNamespace(fetch_response=mock.Mock(return_value=response))
+        missing = urllib.error.HTTPError("https://example.com/gone", 404, "Not Found", {}, None)
+        items = [{"title": "Gone", "link": "https://example.com/gone", "summary": "", "element": None}]
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmp_path = pathlib.Path(tmpdir)
+            feed_file = tmp_path / "feeds.txt"
+            feed_file.write_text("Test|Sub|https://example.com/feed\n", encoding="utf-8")
+            config = pull_news.PullNewsConfig(
+                feeds=feed_file,
+                data_dir=tmp_path,
+                posts_json=tmp_path / "posts.json",
+                seen_db=tmp_path / "seen.json",
+            )
+            patchers = [
+                mock.patch.object(common, "_load_trafilatura", return_value=fake),
+                mock.patch.object(common, "http_get_page", side_effect=missing),
+                mock.patch.object(pull_news, "fetch_bytes", return_value=b"<xml>"),
+                mock.patch.object(pull_news, "parse_feed", return_value=items),
+                mock.patch.object(pull_news, "find_cover_from_item", return_value=""),
+            ]
+            with contextlib.ExitStack() as stack:
+                for patcher in patchers:
+                    stack.enter_context(patcher)
+                result = pull_news.run_pull_news(config)
+
+        fake.fetch_response.assert_called_once_with("https://example.com/gone", decode=True)
+        self.assertEqual(result.added_count, 0)
+        self.assertEqual(result.report.skips["extract"], 1)
+
 if __name__ == "__main__":
     unittest.main()
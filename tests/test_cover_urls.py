@@ -0,0 +1,86 @@
+import unittest
+import xml.etree.ElementTree as ET
+
+from autopost import common, cover_urls, pull_news
+from autopost.cover_urls import CoverRule, rewrite_cover_url
+from benchmarks import bench_cover_urls
+
+
+class RewriteCoverUrlTests(unittest.TestCase):
+    def test_rules_per_cdn(self):
+        cases = {
+            "https://i.guim.co.uk/img/media/a/master/3000.jpg?width=140&dpr=2":
+                "https://i.guim.co.uk/img/media/a/master/3000.jpg?width=1600&dpr=2&quality=85&auto=format&fit=max",
+            "https://res.cloudinary.com/demo/image/upload/c_fill,w_400,h_300/v17/news/cover.jpg":
+                "https://res.cloudinary.com/demo/image/upload/v17/news/cover.jpg",
+            "https://cdn.shopify.com/s/files/1/products/kettle_400x.jpg?v=1":
+                "https://cdn.shopify.com/s/files/1/products/kettle.jpg?v=1",
+            "https://example.com/wp-content/uploads/2025/09/robot-300x200.jpg?ver=3":
+                "https://example.com/wp-content/uploads/2025/09/robot.jpg?ver=3",
+            "https://media.example.com/images/thumb/320/photo.jpg?w=480&h=270":
+                "https://media.example.com/images/thumb/1600/photo.jpg?w=1600&h=270",
+        }
+        for url, expected in cases.items():
+            with self.subTest(url=url):
+                self.assertEqual(rewrite_cover_url(url, 1600), expected)
+
+    def test_leaves_date_paths_and_other_hosts_alone(self):
+        for url in (
+            "https://img.example.com/2025/09/14/photo.jpg",
+            "https://example.com/wp-content/uploads-300x200.d/photo.jpg",
+            "https://cdn.example.com/s/files/products/kettle_400x.jpg",
+            "data:image/gif;base64,R0lGODlhAQABAAAAACw=",
+        ):
+            with self.subTest(url=url):
+                self.assertEqual(rewrite_cover_url(url, 1600), url)
+
+    def test_new_cdn_is_one_rule(self):
+        imgix = CoverRule("imgix", hosts=("imgix.net",), query_require=("w",), query_defaults=(("auto", "format"),))
+        rules = (imgix,) + cover_urls.DEFAULT_RULES
+
+        self.assertEqual(
+            rewrite_cover_url("https://acme.imgix.net/a.jpg", 1600, rules),
+            "https://acme.imgix.net/a.jpg?w=1600&auto=format",
+        )
+        self.assertEqual(
+            rewrite_cover_url("https://acme.example.net/a.jpg", 1600, rules),
+            "https://acme.example.net/a.jpg",
+        )
+
+    def test_results_are_memoized(self):
+        rewrite_cover_url.cache_clear()
+        for _ in range(3):
+            rewrite_cover_url("https://example.com/a-300x200.jpg", 1600)
+
+        info = rewrite_cover_url.cache_info()
+        self.assertEqual((info.hits, info.misses), (2, 1))
+
+    def test_matches_the_replaced_helpers_on_the_benchmark_corpus(self):
+        corpus = bench_cover_urls.load_corpus(bench_cover_urls.DEFAULT_CORPUS)
+
+        row = bench_cover_urls.run(corpus, runs=1)
+
+        self.assertEqual(row["urls"], len(corpus))
+        self.assertGreater(row["new_rule_urls"], 0)
+
+
+class CoverCallersTests(unittest.TestCase):
+    def test_sanitize_img_url_upgrades_over_https(self):
+        self.assertEqual(
+            pull_news.sanitize_img_url("//cdn.example.org/wp-content/uploads/2024/11/hero-640x360.jpeg"),
+            "https://cdn.example.org/wp-content/uploads/2024/11/hero.jpeg",
+        )
+
+    def test_find_cover_from_item_keeps_date_paths(self):
+        item = ET.fromstring(
+            "<item><enclosure type='image/jpeg' url='https://img.example.com/images/2025/09/14/photo.jpg?width=240'/></item>"
+        )
+
+        self.assertEqual(
+            common.find_cover_from_item(item),
+            "https://img.example.com/images/2025/09/14/photo.jpg?width=1200",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
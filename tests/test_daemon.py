@@ -0,0 +1,153 @@
+import contextlib
+import json
+import pathlib
+import tempfile
+import unittest
+from unittest import mock
+
+from autopost import daemon, pull_news
+
+
+class FakeClock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class AutopostDaemonTests(unittest.TestCase):
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.tmp_path = pathlib.Path(self._tmpdir.name)
+        feeds = self.tmp_path / "feeds.txt"
+        feeds.write_text(
+            "News|World|https://example.com/busy\nNews|World|https://example.com/quiet\n",
+            encoding="utf-8",
+        )
+        self.config = pull_news.PullNewsConfig(
+            data_dir=self.tmp_path,
+            posts_json=self.tmp_path / "posts.json",
+            seen_db=self.tmp_path / "seen.json",
+            feeds=feeds,
+            category="News",
+            max_per_category=50,
+            max_per_feed=50,
+            max_total=0,
+        )
+        self.clock = FakeClock()
+        self.polls = {"busy": 0, "quiet": 0}
+        self._stack = contextlib.ExitStack()
+        for patcher in (
+            mock.patch.object(pull_news, "fetch_bytes", side_effect=lambda url: url.encode("utf-8")),
+            mock.patch.object(pull_news, "parse_feed", side_effect=self._parse_feed),
+            mock.patch.object(pull_news, "extract_body_html", return_value=("<p>Body</p>", "")),
+            mock.patch.object(pull_news, "find_cover_from_item", return_value=""),
+        ):
+            self._stack.enter_context(patcher)
+
+    def tearDown(self):
+        self._stack.close()
+        self._tmpdir.cleanup()
+
+    def _parse_feed(self, xml):
+        url = xml.decode("utf-8")
+        name = url.rsplit("/", 1)[-1]
+        self.polls[name] += 1
+        # The busy feed publishes three stories between polls, the quiet one none.
+        count = 3 * self.polls[name] if name == "busy" else 1
+        return [
+            {"title": f"{name} {idx}", "link": f"{url}/post-{idx}", "summary": "", "element": None}
+            for idx in range(count)
+        ]
+
+    def _daemon(self):
+        return daemon.AutopostDaemon(
+            self.config,
+            min_interval=60,
+            max_interval=3600,
+            flush_interval=300,
+            clock=self.clock,
+        )
+
+    def test_intervals_follow_publish_rate_and_flush_is_batched(self):
+        runner = self._daemon()
+        runner.tick()
+        self.assertEqual(self.polls, {"busy": 1, "quiet": 1})
+        self.assertFalse(self.config.posts_json.exists())
+
+        for _ in range(6):
+            self.clock.now += 600
+            runner.tick()
+
+        busy = runner.states["https://example.com/busy"]
+        quiet = runner.states["https://example.com/quiet"]
+        self.assertEqual(busy.interval, 200)
+        self.assertEqual(quiet.interval, 1920)  # doubled on every empty poll
+        self.assertGreater(self.polls["busy"], self.polls["quiet"])
+
+        posts = json.loads(self.config.posts_json.read_text(encoding="utf-8"))
+        self.assertEqual(len(posts), 3 * self.polls["busy"] + 1)
+        self.assertEqual(runner.pending, [])
+
+    def test_schedule_survives_restart(self):
+        runner = self._daemon()
+        runner.tick()
+        self.clock.now += 600
+        runner.tick()
+        runner.flush()
+
+        restarted = self._daemon()
+        self.assertEqual(
+            restarted.states["https://example.com/quiet"].interval,
+            runner.states["https://example.com/quiet"].interval,
+        )
+        self.assertEqual(restarted.due_feeds(self.clock.now), [])
+
+
+    def test_failing_feed_is_logged_and_backed_off(self):
+        def extract(link, meta=None):
+            if "/busy/" in link:
+                raise RuntimeError("parser crashed")
+            return ("<p>Body</p>", "")
+
+        runner = self._daemon()
+        with mock.patch.object(pull_news, "extract_body_html", side_effect=extract):
+            runner.tick()
+            runner.flush()
+
+        busy = runner.states["https://example.com/busy"]
+        posts = json.loads(self.config.posts_json.read_text(encoding="utf-8"))
+        self.assertEqual([post["title"] for post in posts], ["quiet 0"])
+        self.assertEqual(busy.interval, 120)
+        self.assertEqual(busy.next_due, self.clock.now + 120)
+
+    def test_limits_apply_per_quota_window_across_flushes_and_restarts(self):
+        self.config.max_per_category = 4
+        runner = self._daemon()
+        runner.quota_window = 3600
+        runner.tick()
+        for _ in range(3):
+            self.clock.now += 600
+            runner.tick()
+        runner.flush()
+        within_window = len(json.loads(self.config.posts_json.read_text(encoding="utf-8")))
+
+        restarted = self._daemon()
+        restarted.quota_window = 3600
+        self.clock.now += 600
+        restarted.tick()
+        restarted.flush()
+        after_restart = len(json.loads(self.config.posts_json.read_text(encoding="utf-8")))
+
+        self.clock.now += 3600
+        restarted.tick()
+        restarted.flush()
+        next_window = len(json.loads(self.config.posts_json.read_text(encoding="utf-8")))
+
+        self.assertEqual(within_window, 4)
+        self.assertEqual(after_restart, 4)
+        self.assertEqual(next_window, 8)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+import contextlib
+import pathlib
+import struct
+import tempfile
+import unittest
+from unittest import mock
+import xml.etree.ElementTree as ET
+
+from autopost import image_probe, pull_news
+
+
+def png(width, height):
+    return b"\x89PNG\r\n\x1a\n" + struct.pack(">I", 13) + b"IHDR" + struct.pack(">II", width, height) + b"\x08\x02\x00\x00\x00"
+
+
+def jpeg(width, height):
+    app0 = b"\xff\xe0" + struct.pack(">H", 16) + b"JFIF\x00" + b"\x01\x01\x00\x00\x01\x00\x01\x00\x00"
+    sof0 = b"\xff\xc0" + struct.pack(">HBHHB", 11, 8, height, width, 1) + b"\x01\x11\x00"
+    return b"\xff\xd8" + app0 + sof0 + b"\xff\xda"
+
+
+def webp_vp8x(width, height):
+    payload = b"\x00\x00\x00\x00" + (width - 1).to_bytes(3, "little") + (height - 1).to_bytes(3, "little")
+    return b"RIFF" + struct.pack("<I", 30) + b"WEBPVP8X" + struct.pack("<I", 10) + payload
+
+
+def webp_vp8l(width, height):
+    bits = (width - 1) | ((height - 1) << 14)
+    return b"RIFF" + struct.pack("<I", 30) + b"WEBPVP8L" + struct.pack("<I", 5) + b"\x2f" + bits.to_bytes(4, "little") + b"\x00" * 8
+
+
+class ImageSizeTests(unittest.TestCase):
+    def test_headers_of_supported_formats(self):
+        self.assertEqual(image_probe.image_size(png(640, 480)), (640, 480, "png"))
+        self.assertEqual(image_probe.image_size(b"GIF89a" + struct.pack("<HH", 320, 200)), (320, 200, "gif"))
+        self.assertEqual(image_probe.image_size(jpeg(1600, 900)), (1600, 900, "jpeg"))
+        self.assertEqual(image_probe.image_size(webp_vp8x(2048, 1152)), (2048, 1152, "webp"))
+        self.assertEqual(image_probe.image_size(webp_vp8l(800, 600)), (800, 600, "webp"))
+        self.assertIsNone(image_probe.image_size(b"<!doctype html><title>404</title>"))
+
+
+class ImageProberTests(unittest.TestCase):
+    def test_rewrite_that_404s_falls_back_and_real_area_wins(self):
+        responses = {
+            "https://cdn.example/photo.jpg": None,  # the size suffix was load-bearing
+            "https://cdn.example/photo-800x600.jpg": jpeg(800, 600),
+            "https://cdn.example/wide.png": png(1920, 1080),
+        }
+        fetched = []
+
+        def fetch(url):
+            fetched.append(url)
+            if url not in responses:
+                raise image_probe.ProbeError("unreachable")
+            return responses[url]
+
+        element = ET.fromstring(
+            '<item xmlns:media="http://search.yahoo.com/mrss/">'
+            '<media:content url="https://cdn.example/photo-800x600.jpg" width="2000" height="2000"/>'
+            '<media:thumbnail url="https://cdn.example/wide.png"/>'
+            "</item>"
+        )
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = pathlib.Path(tmpdir) / "probe.json"
+            prober = image_probe.ImageProber(path, fetch=fetch)
+            candidates = pull_news.media_candidates(element)
+            self.assertEqual(pull_news.probe_cover_url(candidates, prober), "https://cdn.example/wide.png")
+            self.assertEqual(
+                pull_news.probe_cover_url(candidates[:1] + ["https://down.example/a.jpg"], prober),
+                "https://cdn.example/photo-800x600.jpg",
+            )
+            prober.save()
+
+            fetched.clear()
+            reloaded = image_probe.ImageProber(path, fetch=fetch)
+            self.assertEqual(reloaded.best(["https://cdn.example/photo.jpg", "https://cdn.example/wide.png"]), "https://cdn.example/wide.png")
+            self.assertEqual(fetched, [])
+            # Unreachable hosts are not cached and get probed again.
+            self.assertEqual(reloaded.best(["https://down.example/a.jpg"]), "")
+            self.assertEqual(fetched, ["https://down.example/a.jpg"])
+
+    def test_item_cover_is_probed(self):
+        items = [{"title": "Quiet feed", "link": "https://example.com/quiet", "summary": "", "element": None}]
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmp_path = pathlib.Path(tmpdir)
+            feed_file = tmp_path / "feeds.txt"
+            feed_file.write_text("Test|Sub|https://example.com/feed\n", encoding="utf-8")
+            config = pull_news.PullNewsConfig(
+                feeds=feed_file,
+                data_dir=tmp_path,
+                posts_json=tmp_path / "posts.json",
+                seen_db=tmp_path / "seen.json",
+                image_probe=True,
+            )
+            best = mock.Mock(side_effect=lambda variants: variants[0])
+            patchers = [
+                mock.patch.object(pull_news, "fetch_bytes", return_value=b"<xml>"),
+                mock.patch.object(pull_news, "parse_feed", return_value=items),
+                mock.patch.object(pull_news, "extract_body_html", return_value=("<p>Body.</p>", "")),
+                mock.patch.object(pull_news, "find_cover_from_item", return_value="https://cdn.example/og.jpg"),
+                mock.patch.object(image_probe.ImageProber, "best", best),
+            ]
+            with contextlib.ExitStack() as stack:
+                for patcher in patchers:
+                    stack.enter_context(patcher)
+                result = pull_news.run_pull_news(config)
+
+        # The og:image find_cover_from_item found is among the probed candidates.
+        self.assertIn("https://cdn.example/og.jpg", best.call_args.args[0])
+        self.assertEqual(result.new_entries[0]["cover"], "https://cdn.example/og.jpg")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,136 @@
+import contextlib
+import json
+import pathlib
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+from unittest import mock
+
+from autopost import merge_shards, pull_news
+
+
+FEED_URLS = [f"https://example.com/feed-{idx}" for idx in range(4)]
+
+
+def _item(feed_url, idx):
+    element = ET.fromstring(f"<item><pubDate>2024-05-{10 + idx:02d}</pubDate></item>")
+    return {
+        "title": f"{feed_url.rsplit('/', 1)[-1]} {idx}",
+        "link": f"{feed_url}/post-{idx}",
+        "summary": "",
+        "element": element,
+    }
+
+
+class ShardedRunTests(unittest.TestCase):
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.tmp_path = pathlib.Path(self._tmpdir.name)
+        self.feeds = self.tmp_path / "feeds.txt"
+        self.feeds.write_text(
+            "".join(f"News|World|{url}\n" for url in FEED_URLS),
+            encoding="utf-8",
+        )
+
+    def tearDown(self):
+        self._tmpdir.cleanup()
+
+    def _config(self, name, **overrides):
+        data_dir = self.tmp_path / name
+        data_dir.mkdir(exist_ok=True)
+        options = dict(
+            data_dir=data_dir,
+            posts_json=data_dir / "posts.json",
+            seen_db=data_dir / "seen.json",
+            feeds=self.feeds,
+            category="News",
+            max_per_category=5,
+            max_per_feed=2,
+            max_total=0,
+            shard_dir=self.tmp_path / "shards",
+        )
+        options.update(overrides)
+        return pull_news.PullNewsConfig(**options)
+
+    def _patched(self):
+        stack = contextlib.ExitStack()
+        patchers = [
+            mock.patch.object(pull_news, "fetch_bytes", side_effect=lambda url: url.encode("utf-8")),
+            mock.patch.object(
+                pull_news,
+                "parse_feed",
+                side_effect=lambda xml: [_item(xml.decode("utf-8"), idx) for idx in range(3)],
+            ),
+            mock.patch.object(pull_news, "extract_body_html", return_value=("<p>Body</p>", "")),
+            mock.patch.object(pull_news, "find_cover_from_item", return_value=""),
+        ]
+        for patcher in patchers:
+            stack.enter_context(patcher)
+        return stack
+
+    def test_feed_shard_is_stable_and_in_range(self):
+        for url in FEED_URLS:
+            shard = pull_news.feed_shard(url, 3)
+            self.assertIn(shard, range(3))
+            self.assertEqual(shard, pull_news.feed_shard(url + "/", 3))
+
+    def test_parse_shard_rejects_out_of_range(self):
+        self.assertEqual(pull_news.parse_shard("1/4"), (1, 4))
+        self.assertIsNone(pull_news.parse_shard(""))
+        for value in ("4/4", "-1/2", "1", "a/b", "0/0"):
+            with self.assertRaises(ValueError):
+                pull_news.parse_shard(value)
+
+    def test_merged_shards_match_unsharded_run(self):
+        with self._patched():
+            shard_paths = []
+            for index in range(2):
+                config = self._config("merged", shard=f"{index}/2")
+                pull_news.run_pull_news(config)
+                self.assertFalse(config.posts_json.exists())
+                self.assertFalse(config.seen_db.exists())
+                shard_paths.append(config.shard_dir / f"news-shard-{index}-of-2.json")
+
+            merged = merge_shards.merge_shard_results(
+                list(reversed(shard_paths)), self._config("merged")
+            )
+            single = pull_news.run_pull_news(self._config("single"))
+
+        self.assertEqual(merged.added_count, 5)
+        self.assertEqual(
+            sorted(entry["source"] for entry in merged.new_entries),
+            sorted(entry["source"] for entry in single.new_entries),
+        )
+
+        merged_posts = json.loads((self.tmp_path / "merged" / "posts.json").read_text(encoding="utf-8"))
+        single_posts = json.loads((self.tmp_path / "single" / "posts.json").read_text(encoding="utf-8"))
+        self.assertEqual([p["source"] for p in merged_posts], [p["source"] for p in single_posts])
+        merged_seen = json.loads((self.tmp_path / "merged" / "seen.json").read_text(encoding="utf-8"))
+        self.assertEqual(len(merged_seen), 5)
+
+        # Merging the same shard files again never re-adds a published link.
+        again = merge_shards.merge_shard_results(shard_paths, self._config("merged"))
+        self.assertEqual(again.added_count, 3)
+        self.assertFalse(
+            {entry["source"] for entry in again.new_entries}
+            & {entry["source"] for entry in merged.new_entries}
+        )
+
+    def test_main_keeps_unreadable_shard_files(self):
+        with self._patched():
+            config = self._config("merged", shard="0/2")
+            pull_news.run_pull_news(config)
+        good = config.shard_dir / "news-shard-0-of-2.json"
+        partial = config.shard_dir / "news-shard-1-of-2.json"
+        partial.write_text('{"records": [{"link_hash": "abc", "entry": {', encoding="utf-8")
+
+        with mock.patch.object(merge_shards, "PullNewsConfig", lambda: self._config("merged")):
+            result = merge_shards.main([str(good), str(partial)])
+
+        self.assertGreater(result.added_count, 0)
+        self.assertFalse(good.exists())
+        self.assertTrue(partial.exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+import unittest
+from unittest import mock
+
+from autopost import near_dup
+
+WIRE = "Earthquake of magnitude 6.1 strikes off the coast of northern Japan, officials say"
+
+
+class NearDuplicateIndexTests(unittest.TestCase):
+    def test_syndicated_copy_matches_and_other_stories_do_not(self):
+        index = near_dup.NearDuplicateIndex.from_history(
+            [{"source": "https://wire.example/quake", "title": WIRE, "excerpt": "", "date": "2024-05-10"}],
+            {"old": {"url": "https://old.example/", "title": WIRE, "created": "2024-01-01"}},
+            since="2024-05-01",
+        )
+        self.assertEqual(len(index), 1)
+
+        self.assertEqual(
+            index.match("Earthquake of magnitude 6.1 strikes off the coast of northern Japan - Reuters"),
+            "https://wire.example/quake",
+        )
+        self.assertIsNone(index.match("Central bank holds interest rates steady as inflation cools"))
+        self.assertIsNone(index.match("Japan earthquake"))  # too short to compare
+        self.assertEqual(index.hits, 1)
+
+        index.add("https://example.com/rates", "Central bank holds interest rates steady as inflation cools")
+        self.assertEqual(
+            index.match("Central bank holds interest rates steady as inflation cools, again"),
+            "https://example.com/rates",
+        )
+
+    def test_python_signatures_match_vectorized_ones(self):
+        texts = [WIRE, "<p>Stocks <b>rise</b> as the Fed holds rates steady again</p>", "short"]
+        with mock.patch.object(near_dup, "_load_numpy", return_value=None):
+            expected = near_dup.signatures(texts)
+        self.assertIsNone(expected[2])
+        self.assertEqual(near_dup.signatures(texts), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
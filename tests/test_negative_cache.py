@@ -0,0 +1,56 @@
+import json
+import pathlib
+import tempfile
+import unittest
+
+from autopost.negative_cache import NegativeCache
+
+
+class FakeClock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class NegativeCacheTests(unittest.TestCase):
+    def test_backoff_doubles_and_success_clears(self):
+        clock = FakeClock()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = pathlib.Path(tmpdir) / "negative_cache" / "news.json"
+            cache = NegativeCache(path, backoff=100, max_backoff=300, clock=clock)
+            link = "https://Example.com/story"
+
+            self.assertEqual(cache.record_failure("k", link, "unavailable"), clock.now + 100)
+            self.assertEqual(cache.blocked("k", link), "unavailable")
+            clock.now += 100
+            self.assertIsNone(cache.blocked("k", link))
+            self.assertEqual(cache.record_failure("k", link, "unavailable"), clock.now + 200)
+            self.assertEqual(cache.record_failure("k", link, "unavailable"), clock.now + 300)
+            cache.save()
+
+            reloaded = NegativeCache(path, backoff=100, max_backoff=300, clock=clock)
+            self.assertEqual(reloaded.entries["k"]["failures"], 3)
+            self.assertEqual(reloaded.blocked("k", link), "unavailable")
+            self.assertEqual(reloaded.suppressed, {"example.com": 1})
+
+            reloaded.clear("k")
+            reloaded.save()
+            self.assertEqual(json.loads(path.read_text(encoding="utf-8")), {})
+
+    def test_stale_records_are_pruned_on_save(self):
+        clock = FakeClock()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = pathlib.Path(tmpdir) / "cache.json"
+            cache = NegativeCache(path, ttl=1000, clock=clock)
+            cache.record_failure("old", "https://example.com/old", "unavailable")
+            clock.now += 600
+            cache.record_failure("new", "https://example.com/new", "unavailable")
+            clock.now += 600
+            cache.save()
+            self.assertEqual(sorted(json.loads(path.read_text(encoding="utf-8"))), ["new"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+import datetime
+import json
+import pathlib
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+
+from autopost import prefilter
+
+
+def _item(title="Story", summary="Summary", element=None):
+    return {"title": title, "summary": summary, "element": element}
+
+
+class PrefilterTests(unittest.TestCase):
+    def test_default_rules_reject_media_paths_and_enclosures(self):
+        rules = prefilter.Prefilter()
+        self.assertEqual(
+            rules.reject(_item(), "https://example.com/news/video/clip-1"),
+            "url:/videos?/",
+        )
+        self.assertIsNone(rules.reject(_item(), "https://example.com/news/delivery-robots"))
+        self.assertIsNone(rules.reject(_item(), "https://example.com/lifestyle/live-well"))
+        self.assertIsNone(rules.reject(_item(), "https://example.com/live/concert-review"))
+        self.assertIsNone(rules.reject(_item(), "https://example.com/photos/desk-story"))
+
+        podcast = ET.fromstring('<item><enclosure url="x.mp3" type="audio/mpeg"/></item>')
+        self.assertEqual(
+            rules.reject(_item(element=podcast), "https://example.com/episode-3"),
+            "enclosure:audio/",
+        )
+        self.assertEqual(sum(rules.hits.values()), 2)
+
+    def test_sidecar_rules_extend_defaults(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            feeds = pathlib.Path(tmpdir) / "feeds_news.txt"
+            feeds.write_text("", encoding="utf-8")
+            prefilter.rules_path_for(feeds).write_text(
+                json.dumps(
+                    {
+                        "title_patterns": ["^WATCH:"],
+                        "domains": ["paywalled.example"],
+                        "require_description": True,
+                        "max_age_days": 7,
+                    }
+                ),
+                encoding="utf-8",
+            )
+            rules = prefilter.Prefilter.for_feeds(feeds)
+
+        rules.today = datetime.date(2024, 5, 20)
+        link = "https://example.com/story"
+        self.assertEqual(rules.reject(_item(title="WATCH: highlights"), link), "title:^WATCH:")
+        self.assertEqual(
+            rules.reject(_item(), "https://www.paywalled.example/a"), "domain:paywalled.example"
+        )
+        self.assertEqual(rules.reject(_item(summary=""), link), "empty_description")
+        self.assertEqual(
+            rules.reject(_item(), link, lambda: "2024-05-01"), "max_age_days:7"
+        )
+        self.assertIsNone(rules.reject(_item(), link, lambda: "2024-05-18"))
+        self.assertEqual(rules.reject(_item(), "https://example.com/podcast/ep-1"), "url:/podcasts?/")
+
+
+if __name__ == "__main__":
+    unittest.main()
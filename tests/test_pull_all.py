@@ -0,0 +1,166 @@
+import contextlib
+import dataclasses
+import io
+import json
+import pathlib
+import tempfile
+import unittest
+from unittest import mock
+
+from autopost import pull_all, pull_news
+
+
+class RunPullAllTests(unittest.TestCase):
+    def test_shared_feed_fetched_once_and_limits_kept_per_category(self):
+        shared_items = [
+            {"title": f"Shared {idx}", "link": f"https://example.com/shared-{idx}", "summary": "", "element": None}
+            for idx in range(4)
+        ]
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmp_path = pathlib.Path(tmpdir)
+            culture_feeds = tmp_path / "feeds_culture.txt"
+            culture_feeds.write_text("Culture|Essays|https://example.com/shared\n", encoding="utf-8")
+            lifestyle_feeds = tmp_path / "feeds_lifestyle.txt"
+            lifestyle_feeds.write_text(
+                "Lifestyle|Ideas|https://example.com/shared\n"
+                "Lifestyle|Home|https://example.com/home\n",
+                encoding="utf-8",
+            )
+
+            config = pull_news.PullNewsConfig(
+                data_dir=tmp_path,
+                posts_json=tmp_path / "posts.json",
+                seen_db=tmp_path / "seen.json",
+                max_per_feed=10,
+                max_total=0,
+            )
+            jobs = [
+                pull_all.CategoryJob("Culture", culture_feeds, max_per_category=2),
+                pull_all.CategoryJob("Lifestyle", lifestyle_feeds, max_per_category=3),
+            ]
+
+            fetched_urls = []
+
+            def fake_fetch_bytes(url):
+                fetched_urls.append(url)
+                return url.encode("utf-8")
+
+            def fake_parse_feed(xml):
+                return shared_items if xml.endswith(b"shared") else []
+
+            patchers = [
+                mock.patch.object(pull_news, "fetch_bytes", side_effect=fake_fetch_bytes),
+                mock.patch.object(pull_news, "parse_feed", side_effect=fake_parse_feed),
+                mock.patch.object(pull_news, "extract_body_html", return_value=("<p>Body</p>", "")),
+                mock.patch.object(pull_news, "find_cover_from_item", return_value=""),
+            ]
+            with contextlib.ExitStack() as stack:
+                for patcher in patchers:
+                    stack.enter_context(patcher)
+                result = pull_all.run_pull_all(jobs, config)
+
+            self.assertEqual(fetched_urls, ["https://example.com/shared", "https://example.com/home"])
+            self.assertEqual(result.added_count, 4)
+            data = json.loads(config.posts_json.read_text(encoding="utf-8"))
+            by_category = {}
+            for entry in data:
+                by_category.setdefault(entry["category"], []).append(entry["title"])
+            self.assertEqual(sorted(by_category["Culture"]), ["Shared 0", "Shared 1"])
+            self.assertEqual(sorted(by_category["Lifestyle"]), ["Shared 2", "Shared 3"])
+            seen = json.loads(config.seen_db.read_text(encoding="utf-8"))
+            self.assertEqual(len(seen), 4)
+
+    def test_resumed_entries_count_against_the_job_limits(self):
+        def fake_parse_feed(xml):
+            name = xml.decode("utf-8").rsplit("/", 1)[-1]
+            return [
+                {"title": f"{name} {idx}", "link": f"https://example.com/{name}/{idx}", "summary": "", "element": None}
+                for idx in range(4)
+            ]
+
+        def crash_on_b(link, meta=None):
+            if "/b/" in link:
+                raise RuntimeError("killed")
+            return ("<p>Body</p>", "")
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmp_path = pathlib.Path(tmpdir)
+            feeds = tmp_path / "feeds_culture.txt"
+            feeds.write_text("Culture|Essays|https://example.com/a\nCulture|Essays|https://example.com/b\n", encoding="utf-8")
+            config = pull_news.PullNewsConfig(
+                data_dir=tmp_path,
+                posts_json=tmp_path / "posts.json",
+                seen_db=tmp_path / "seen.json",
+                max_per_feed=2,
+                max_total=0,
+                checkpoint=True,
+            )
+            jobs = [pull_all.CategoryJob("Culture", feeds, max_per_category=3)]
+
+            def run(extract, resume):
+                patchers = [
+                    mock.patch.object(pull_news, "fetch_bytes", side_effect=lambda url: url.encode("utf-8")),
+                    mock.patch.object(pull_news, "parse_feed", side_effect=fake_parse_feed),
+                    mock.patch.object(pull_news, "extract_body_html", side_effect=extract),
+                    mock.patch.object(pull_news, "find_cover_from_item", return_value=""),
+                ]
+                with contextlib.ExitStack() as stack:
+                    for patcher in patchers:
+                        stack.enter_context(patcher)
+                    return pull_all.run_pull_all(jobs, dataclasses.replace(config, resume=resume))
+
+            with self.assertRaises(RuntimeError):
+                run(crash_on_b, resume=False)
+            result = run(lambda link, meta=None: ("<p>Body</p>", ""), resume=True)
+
+        self.assertEqual(
+            [entry["title"] for entry in result.new_entries],
+            ["a 0", "a 1", "b 0"],
+        )
+
+    def test_run_is_reported_and_recorded_in_metrics(self):
+        items = [{"title": "Story", "link": "https://example.com/story", "summary": "", "element": None}]
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmp_path = pathlib.Path(tmpdir)
+            feeds = tmp_path / "feeds_culture.txt"
+            feeds.write_text("Culture|Essays|https://example.com/feed\n", encoding="utf-8")
+            config = pull_news.PullNewsConfig(
+                data_dir=tmp_path,
+                posts_json=tmp_path / "posts.json",
+                seen_db=tmp_path / "seen.json",
+                run_report=True,
+                run_metrics=True,
+            )
+            patchers = [
+                mock.patch.object(pull_news, "fetch_bytes", return_value=b"<xml>"),
+                mock.patch.object(pull_news, "parse_feed", return_value=items),
+                mock.patch.object(pull_news, "extract_body_html", return_value=("<p>Body</p>", "")),
+                mock.patch.object(pull_news, "find_cover_from_item", return_value=""),
+            ]
+            with contextlib.ExitStack() as stack:
+                stack.enter_context(contextlib.redirect_stdout(io.StringIO()))
+                for patcher in patchers:
+                    stack.enter_context(patcher)
+                result = pull_all.run_pull_all([pull_all.CategoryJob("Culture", feeds)], config)
+
+            report = json.loads((tmp_path / "reports" / "pull_all.json").read_text(encoding="utf-8"))
+            lines = (tmp_path / "metrics" / "pull_all.jsonl").read_text(encoding="utf-8").splitlines()
+
+        self.assertIsNotNone(result.report)
+        self.assertIn("write", report["stages"])
+        self.assertEqual(len(lines), 1)
+        record = json.loads(lines[0])
+        self.assertEqual((record["run"], record["added"]), ("pull_all", 1))
+        self.assertEqual(record["feeds"]["https://example.com/feed"]["added"], 1)
+
+    def test_parse_job_argument(self):
+        job = pull_all._parse_job("Food & Drink=autopost/feeds_food_drink.txt:7")
+        self.assertEqual(job.category, "Food & Drink")
+        self.assertEqual(job.feeds, pathlib.Path("autopost/feeds_food_drink.txt"))
+        self.assertEqual(job.max_per_category, 7)
+        self.assertIsNone(pull_all._parse_job("News=feeds.txt").max_per_category)
+
+
+if __name__ == "__main__":
+    unittest.main()
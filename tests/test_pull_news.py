@@ -1,8 +1,10 @@
 import contextlib
 import json
+import os
 import pathlib
 import tempfile
 import unittest
+import xml.etree.ElementTree as ET
 from unittest import mock
 
 from autopost import pull_news
@@ -45,6 +47,84 @@ class ResolveCoverUrlTests(unittest.TestCase):
         )
         self.assertEqual(sanitized, expected)
 
+class NormalizePostEntryTests(unittest.TestCase):
+    def test_normalized_entry_is_stamped_and_skipped_next_time(self):
+        entry = {"title": "T", "category": "news/politics", "subcategory": ""}
+
+        normalized = pull_news._normalize_post_entry(entry)
+
+        self.assertEqual(normalized["category_slug"], "news/politics")
+        self.assertEqual(normalized["taxonomy_version"], pull_news.TAXONOMY_VERSION)
+        self.assertIs(pull_news._normalize_post_entry(normalized), normalized)
+
+    def test_taxonomy_change_renormalizes_stamped_entries(self):
+        entry = pull_news._normalize_post_entry({"title": "T", "category": "Travel"})
+
+        with mock.patch.object(pull_news, "TAXONOMY_VERSION", "changed"):
+            renormalized = pull_news._normalize_post_entry(entry)
+
+        self.assertIsNot(renormalized, entry)
+        self.assertEqual(renormalized["taxonomy_version"], "changed")
+        self.assertEqual(renormalized["category_slug"], "travel")
+
+    def test_stamp_is_not_persisted(self):
+        entries = [
+            pull_news._normalize_post_entry({"slug": "new", "title": "New", "category": "Travel", "date": "2025-09-02"}),
+            pull_news._normalize_post_entry({"slug": "old", "title": "Old", "category": "Travel", "date": "2025-08-01"}),
+        ]
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmp_path = pathlib.Path(tmpdir)
+            kept = pull_news._persist_posts(
+                iter(entries),
+                posts_json_path=tmp_path / "posts.json",
+                data_dir=tmp_path,
+                max_posts_persist=1,
+                archive_cold_after_months=0,
+                keep_index=True,
+            )
+            written = {
+                str(path.relative_to(tmp_path)): path.read_text(encoding="utf-8")
+                for path in tmp_path.rglob("*.json")
+            }
+
+        self.assertIn("archive/2025-08.json", written)
+        self.assertIn("posts/travel/2025-09.json", written)
+        for name, text in written.items():
+            self.assertNotIn("taxonomy_version", text, name)
+        self.assertEqual(kept[0]["taxonomy_version"], pull_news.TAXONOMY_VERSION)
+
+
+class TaxonomyRefreshTests(unittest.TestCase):
+    def tearDown(self):
+        pull_news._TAXONOMY_STAT = None
+        pull_news.refresh_taxonomy()
+
+    def test_taxonomy_rebuilt_only_when_contents_change(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            taxonomy = pathlib.Path(tmpdir) / "taxonomy.json"
+            taxonomy.write_text(
+                json.dumps({"categories": [{"slug": "news", "title": "Headlines"}]}),
+                encoding="utf-8",
+            )
+            with mock.patch.object(pull_news, "TAXONOMY_FILE", taxonomy):
+                pull_news._TAXONOMY_STAT = None
+                self.assertTrue(pull_news.refresh_taxonomy())
+                self.assertEqual(pull_news.taxonomy_title_for_slug("news"), "Headlines")
+                version = pull_news.TAXONOMY_VERSION
+
+                self.assertFalse(pull_news.refresh_taxonomy())
+                stat = taxonomy.stat()
+                os.utime(taxonomy, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+                self.assertFalse(pull_news.refresh_taxonomy())
+                taxonomy.write_text(
+                    json.dumps({"categories": [{"slug": "news", "title": "World News"}]}),
+                    encoding="utf-8",
+                )
+                self.assertTrue(pull_news.refresh_taxonomy())
+                self.assertEqual(pull_news.taxonomy_title_for_slug("news"), "World News")
+                self.assertNotEqual(pull_news.TAXONOMY_VERSION, version)
+
+
 class FeedUrlParsingTests(unittest.TestCase):
     def test_inline_comment_in_feed_url_stripped(self):
         with tempfile.TemporaryDirectory() as tmpdir:
@@ -180,5 +260,682 @@ class MaxPerCategoryLimitTests(unittest.TestCase):
             self.assertEqual(len(data), 2)
             self.assertFalse(any(entry.get("subcategory") == "World" for entry in data))
 
+class TimeBudgetTests(unittest.TestCase):
+    def test_run_stops_fetching_at_budget_and_commits_completed_work(self):
+        feeds = ["a", "b", "c"]
+        clock = {"now": 0.0}
+
+        def advance(seconds, result):
+            def _side_effect(*args, **kwargs):
+                clock["now"] += seconds
+                return result
+            return _side_effect
+
+        def fake_parse_feed(xml):
+            name = xml.decode("utf-8").rsplit("/", 1)[-1]
+            return [
+                {"title": f"{name} {idx}", "link": f"https://example.com/{name}/{idx}", "summary": "", "element": None}
+                for idx in range(2)
+            ]
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmp_path = pathlib.Path(tmpdir)
+            feed_file = tmp_path / "feeds.txt"
+            feed_file.write_text(
+                "".join(f"Test|Sub|https://example.com/{name}\n" for name in feeds),
+                encoding="utf-8",
+            )
+            config = pull_news.PullNewsConfig(
+                feeds=feed_file,
+                data_dir=tmp_path,
+                posts_json=tmp_path / "posts.json",
+                seen_db=tmp_path / "seen.json",
+                max_per_feed=5,
+                max_per_category=10,
+                max_total=0,
+                time_budget=100,
+                commit_reserve=0,
+            )
+
+            patchers = [
+                mock.patch.object(pull_news.time, "monotonic", side_effect=lambda: clock["now"]),
+                mock.patch.object(
+                    pull_news,
+                    "fetch_bytes",
+                    side_effect=lambda url: advance(10, url.encode("utf-8"))(),
+                ),
+                mock.patch.object(pull_news, "parse_feed", side_effect=fake_parse_feed),
+                mock.patch.object(
+                    pull_news,
+                    "extract_body_html",
+                    side_effect=advance(30, ("<p>Body</p>", "")),
+                ),
+                mock.patch.object(pull_news, "find_cover_from_item", return_value=""),
+            ]
+            with contextlib.ExitStack() as stack:
+                for patcher in patchers:
+                    stack.enter_context(patcher)
+                result = pull_news.run_pull_news(config)
+
+            self.assertEqual(result.added_count, 3)
+            self.assertEqual(
+                result.deferred_feeds,
+                ["https://example.com/b", "https://example.com/c"],
+            )
+            data = json.loads(config.posts_json.read_text(encoding="utf-8"))
+            self.assertEqual(len(data), 3)
+            seen = json.loads(config.seen_db.read_text(encoding="utf-8"))
+            self.assertEqual(len(seen), 3)
+
+
+class CheckpointResumeTests(unittest.TestCase):
+    def test_resume_replays_journal_without_refetching_articles(self):
+        def fake_parse_feed(xml):
+            name = xml.decode("utf-8").rsplit("/", 1)[-1]
+            return [
+                {"title": f"{name} {idx}", "link": f"https://example.com/{name}/{idx}", "summary": "", "element": None}
+                for idx in range(2)
+            ]
+
+        def crash_on_b(link, meta=None):
+            if "/b/" in link:
+                raise RuntimeError("killed")
+            return ("<p>Body</p>", "")
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmp_path = pathlib.Path(tmpdir)
+            feed_file = tmp_path / "feeds.txt"
+            feed_file.write_text(
+                "Test|Sub|https://example.com/a\nTest|Sub|https://example.com/b\n",
+                encoding="utf-8",
+            )
+            config = pull_news.PullNewsConfig(
+                feeds=feed_file,
+                data_dir=tmp_path,
+                posts_json=tmp_path / "posts.json",
+                seen_db=tmp_path / "seen.json",
+                category="Test",
+                max_per_feed=5,
+                max_per_category=10,
+                max_total=0,
+                checkpoint=True,
+            )
+
+            def run(extract):
+                patchers = [
+                    mock.patch.object(pull_news, "fetch_bytes", side_effect=lambda url: url.encode("utf-8")),
+                    mock.patch.object(pull_news, "parse_feed", side_effect=fake_parse_feed),
+                    mock.patch.object(pull_news, "extract_body_html", side_effect=extract),
+                    mock.patch.object(pull_news, "find_cover_from_item", return_value=""),
+                ]
+                with contextlib.ExitStack() as stack:
+                    for patcher in patchers:
+                        stack.enter_context(patcher)
+                    return pull_news.run_pull_news(config)
+
+            with self.assertRaises(RuntimeError):
+                run(crash_on_b)
+            journal = tmp_path / "journal" / "test.jsonl"
+            self.assertEqual(len(journal.read_text(encoding="utf-8").splitlines()), 2)
+            self.assertFalse(config.posts_json.exists())
+
+            extracted = []
+
+            def record_extract(link, meta=None):
+                extracted.append(link)
+                return ("<p>Body</p>", "")
+
+            config.resume = True
+            result = run(record_extract)
+
+            self.assertEqual(extracted, ["https://example.com/b/0", "https://example.com/b/1"])
+            self.assertEqual(result.added_count, 4)
+            data = json.loads(config.posts_json.read_text(encoding="utf-8"))
+            self.assertEqual(len(data), 4)
+            self.assertFalse(journal.exists())
+
+    def test_crash_between_posts_and_seen_db_does_not_duplicate_posts(self):
+        items = [
+            {"title": f"Story {idx}", "link": f"https://example.com/story-{idx}", "summary": "", "element": None}
+            for idx in range(2)
+        ]
+        real_write = pull_news.atomic_write_text
+
+        for streaming in (False, True):
+            with self.subTest(streaming=streaming), tempfile.TemporaryDirectory() as tmpdir:
+                tmp_path = pathlib.Path(tmpdir)
+                feed_file = tmp_path / "feeds.txt"
+                feed_file.write_text("Test|Sub|https://example.com/feed\n", encoding="utf-8")
+                config = pull_news.PullNewsConfig(
+                    feeds=feed_file,
+                    data_dir=tmp_path,
+                    posts_json=tmp_path / "posts.json",
+                    seen_db=tmp_path / "seen.json",
+                    category="Test",
+                    checkpoint=True,
+                    streaming=streaming,
+                )
+
+                def crash_on_seen(path, text):
+                    if pathlib.Path(path) == config.seen_db:
+                        raise OSError("killed")
+                    real_write(path, text)
+
+                def run(write):
+                    patchers = [
+                        mock.patch.object(pull_news, "fetch_bytes", return_value=b"<xml>"),
+                        mock.patch.object(pull_news, "parse_feed", return_value=items),
+                        mock.patch.object(pull_news, "extract_body_html", return_value=("<p>Body</p>", "")),
+                        mock.patch.object(pull_news, "find_cover_from_item", return_value=""),
+                        mock.patch.object(pull_news, "atomic_write_text", side_effect=write),
+                    ]
+                    with contextlib.ExitStack() as stack:
+                        for patcher in patchers:
+                            stack.enter_context(patcher)
+                        return pull_news.run_pull_news(config)
+
+                with self.assertRaises(OSError):
+                    run(crash_on_seen)
+                self.assertEqual(len(json.loads(config.posts_json.read_text(encoding="utf-8"))), 2)
+
+                config.resume = True
+                result = run(real_write)
+                data = json.loads(config.posts_json.read_text(encoding="utf-8"))
+                partition = json.loads((tmp_path / "posts" / "all" / f"{pull_news.today_iso()[:7]}.json").read_text(encoding="utf-8"))
+
+            self.assertEqual(result.added_count, 2)
+            self.assertEqual(sorted(entry["source"] for entry in data), [item["link"] for item in items])
+            self.assertEqual(len(partition), 2)
+
+
+class FreshnessModeTests(unittest.TestCase):
+    def _run(self, tmp_path, feeds, **overrides):
+        def fake_parse_feed(xml):
+            name = xml.decode("utf-8").rsplit("/", 1)[-1]
+            return [
+                {
+                    "title": f"{name} {idx}",
+                    "link": f"https://example.com/{name}/{idx}",
+                    "summary": "",
+                    "element": ET.fromstring(f"<item><pubDate>{date}</pubDate></item>"),
+                }
+                for idx, date in enumerate(feeds[name])
+            ]
+
+        feed_file = tmp_path / "feeds.txt"
+        feed_file.write_text(
+            "".join(f"Test|Sub|https://example.com/{name}\n" for name in feeds),
+            encoding="utf-8",
+        )
+        options = dict(
+            feeds=feed_file,
+            data_dir=tmp_path,
+            posts_json=tmp_path / "posts.json",
+            seen_db=tmp_path / "seen.json",
+            max_per_feed=5,
+            max_total=0,
+            freshness=True,
+        )
+        options.update(overrides)
+        extracted = []
+
+        def fake_extract(link, meta=None):
+            extracted.append(link)
+            return ("<p>Body</p>", "")
+
+        patchers = [
+            mock.patch.object(pull_news, "fetch_bytes", side_effect=lambda url: url.encode("utf-8")),
+            mock.patch.object(pull_news, "parse_feed", side_effect=fake_parse_feed),
+            mock.patch.object(pull_news, "extract_body_html", side_effect=fake_extract),
+            mock.patch.object(pull_news, "find_cover_from_item", return_value=""),
+        ]
+        with contextlib.ExitStack() as stack:
+            for patcher in patchers:
+                stack.enter_context(patcher)
+            result = pull_news.run_pull_news(pull_news.PullNewsConfig(**options))
+        return result, extracted
+
+    def test_freshest_items_win_and_only_winners_are_extracted(self):
+        feeds = {
+            "stale": ["2024-01-03", "2024-01-02", "2024-01-01"],
+            "fresh": ["2024-05-02", "2024-05-01"],
+        }
+        with tempfile.TemporaryDirectory() as tmpdir:
+            result, extracted = self._run(pathlib.Path(tmpdir), feeds, max_per_category=3)
+
+        expected = [
+            "https://example.com/fresh/0",
+            "https://example.com/fresh/1",
+            "https://example.com/stale/0",
+        ]
+        self.assertEqual(extracted, expected)
+        self.assertEqual([entry["source"] for entry in result.new_entries], expected)
+
+    def test_undated_items_rank_after_dated_ones(self):
+        feeds = {
+            "undated": ["", ""],
+            "dated": ["2024-05-02", "2024-05-01"],
+        }
+        with tempfile.TemporaryDirectory() as tmpdir:
+            _, extracted = self._run(pathlib.Path(tmpdir), feeds, max_per_category=3)
+
+        self.assertEqual(
+            extracted,
+            ["https://example.com/dated/0", "https://example.com/dated/1", "https://example.com/undated/0"],
+        )
+
+    def test_equal_dates_alternate_between_feeds(self):
+        feeds = {
+            "busy": ["2024-05-01"] * 4,
+            "other": ["2024-05-01"] * 2,
+        }
+        with tempfile.TemporaryDirectory() as tmpdir:
+            _, extracted = self._run(pathlib.Path(tmpdir), feeds, max_per_category=4)
+
+        self.assertEqual(
+            extracted,
+            [
+                "https://example.com/busy/0",
+                "https://example.com/other/0",
+                "https://example.com/busy/1",
+                "https://example.com/other/1",
+            ],
+        )
+
+
+class PrefilterIntegrationTests(unittest.TestCase):
+    def test_rejected_items_are_never_downloaded(self):
+        items = [
+            {"title": "Clip", "link": "https://example.com/video/clip", "summary": "", "element": None},
+            {"title": "Story", "link": "https://example.com/story", "summary": "", "element": None},
+        ]
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmp_path = pathlib.Path(tmpdir)
+            feed_file = tmp_path / "feeds.txt"
+            feed_file.write_text("Test|Sub|https://example.com/feed\n", encoding="utf-8")
+            config = pull_news.PullNewsConfig(
+                feeds=feed_file,
+                data_dir=tmp_path,
+                posts_json=tmp_path / "posts.json",
+                seen_db=tmp_path / "seen.json",
+                prefilter=True,
+            )
+            extract = mock.Mock(return_value=("<p>Body</p>", ""))
+            patchers = [
+                mock.patch.object(pull_news, "fetch_bytes", return_value=b"<xml>"),
+                mock.patch.object(pull_news, "parse_feed", return_value=items),
+                mock.patch.object(pull_news, "extract_body_html", extract),
+                mock.patch.object(pull_news, "find_cover_from_item", return_value=""),
+            ]
+            with contextlib.ExitStack() as stack:
+                for patcher in patchers:
+                    stack.enter_context(patcher)
+                result = pull_news.run_pull_news(config)
+
+        self.assertEqual([call.args[0] for call in extract.call_args_list], ["https://example.com/story"])
+        self.assertEqual(result.prefilter_hits, {"url:/videos?/": 1})
+
+
+class NegativeCacheIntegrationTests(unittest.TestCase):
+    def test_unavailable_items_are_not_refetched_until_retry(self):
+        items = [
+            {"title": "Broken", "link": "https://broken.example/story", "summary": "", "element": None},
+            {"title": "Down", "link": "https://down.example/story", "summary": "", "element": None},
+            {"title": "Fine", "link": "https://example.com/story", "summary": "", "element": None},
+        ]
+
+        def fake_extract(link, meta=None):
+            if "broken" in link:
+                return ("<p>This content is not available</p>", "")
+            if "down" in link:
+                return ("", "")  # what a 5xx or a timeout extracts to
+            return ("<p>Body</p>", "")
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmp_path = pathlib.Path(tmpdir)
+            feed_file = tmp_path / "feeds.txt"
+            feed_file.write_text("Test|Sub|https://example.com/feed\n", encoding="utf-8")
+            config = pull_news.PullNewsConfig(
+                feeds=feed_file,
+                data_dir=tmp_path,
+                posts_json=tmp_path / "posts.json",
+                seen_db=tmp_path / "seen.json",
+                negative_cache=True,
+            )
+            extract = mock.Mock(side_effect=fake_extract)
+            patchers = [
+                mock.patch.object(pull_news, "fetch_bytes", return_value=b"<xml>"),
+                mock.patch.object(pull_news, "parse_feed", return_value=items),
+                mock.patch.object(pull_news, "extract_body_html", extract),
+                mock.patch.object(pull_news, "find_cover_from_item", return_value=""),
+            ]
+            with contextlib.ExitStack() as stack:
+                for patcher in patchers:
+                    stack.enter_context(patcher)
+                first = pull_news.run_pull_news(config)
+                second = pull_news.run_pull_news(config)
+
+            cache = json.loads((tmp_path / "negative_cache" / "all.json").read_text(encoding="utf-8"))
+
+        self.assertEqual(first.added_count, 1)
+        self.assertEqual(first.suppressed_hosts, {})
+        self.assertEqual(second.added_count, 0)
+        self.assertEqual(second.suppressed_hosts, {"broken.example": 1, "down.example": 1})
+        self.assertEqual(extract.call_count, 3)
+        record = cache[pull_news.link_hash("https://broken.example/story")]
+        self.assertEqual((record["reason"], record["failures"]), ("unavailable", 1))
+        record = cache[pull_news.link_hash("https://down.example/story")]
+        self.assertEqual((record["reason"], record["failures"]), ("extract", 1))
+
+
+class NearDuplicateIntegrationTests(unittest.TestCase):
+    def test_syndicated_story_is_fetched_once(self):
+        wire = "Earthquake of magnitude 6.1 strikes off the coast of northern Japan"
+
+        local = {
+            "alpha": "City council approves new budget for public parks",
+            "beta": "Local team wins regional football final after extra time",
+        }
+
+        def fake_parse_feed(xml):
+            name = xml.decode("utf-8").rsplit("/", 1)[-1]
+            return [
+                {"title": f"{wire} - {name}", "link": f"https://{name}.example/quake", "summary": "", "element": None},
+                {"title": local[name], "link": f"https://{name}.example/local", "summary": "", "element": None},
+            ]
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmp_path = pathlib.Path(tmpdir)
+            feed_file = tmp_path / "feeds.txt"
+            feed_file.write_text(
+                "Test|Sub|https://example.com/alpha\nTest|Sub|https://example.com/beta\n",
+                encoding="utf-8",
+            )
+            config = pull_news.PullNewsConfig(
+                feeds=feed_file,
+                data_dir=tmp_path,
+                posts_json=tmp_path / "posts.json",
+                seen_db=tmp_path / "seen.json",
+                max_per_feed=5,
+                max_per_category=10,
+                near_dup=True,
+            )
+            extract = mock.Mock(return_value=("<p>Body</p>", ""))
+            patchers = [
+                mock.patch.object(pull_news, "fetch_bytes", side_effect=lambda url: url.encode("utf-8")),
+                mock.patch.object(pull_news, "parse_feed", side_effect=fake_parse_feed),
+                mock.patch.object(pull_news, "extract_body_html", extract),
+                mock.patch.object(pull_news, "find_cover_from_item", return_value=""),
+            ]
+            with contextlib.ExitStack() as stack:
+                for patcher in patchers:
+                    stack.enter_context(patcher)
+                result = pull_news.run_pull_news(config)
+
+        self.assertEqual(
+            [entry["source"] for entry in result.new_entries],
+            ["https://alpha.example/quake", "https://alpha.example/local", "https://beta.example/local"],
+        )
+        self.assertEqual(result.near_duplicates, 1)
+        self.assertEqual(extract.call_count, 3)
+
+
+class UrlCacheIntegrationTests(unittest.TestCase):
+    def test_aliases_of_published_stories_are_skipped(self):
+        canonical = "https://news.example/world/story"
+        feeds = {
+            "first": [
+                {"title": "Story", "link": "https://redirect.example/r/1", "summary": "", "element": None},
+                {"title": "Story again", "link": "https://news.example/amp/world/story", "summary": "", "element": None},
+            ],
+            "second": [
+                {"title": "Story", "link": "https://news.example/world/story/?utm_source=feed", "summary": "", "element": None},
+                {"title": "Story", "link": "https://news.example/feeds/world/story-123", "summary": "", "element": None},
+            ],
+        }
+
+        def fake_extract(link, meta=None):
+            extracted.append(link)
+            if meta is not None:
+                meta["final_url"] = "https://news.example/feeds/world/story-123" if "redirect" in link else link
+                meta["canonical_url"] = canonical
+            return ("<p>Body</p>", "")
+
+        extracted = []
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmp_path = pathlib.Path(tmpdir)
+            feed_file = tmp_path / "feeds.txt"
+            config = pull_news.PullNewsConfig(
+                feeds=feed_file,
+                data_dir=tmp_path,
+                posts_json=tmp_path / "posts.json",
+                seen_db=tmp_path / "seen.json",
+                url_cache=True,
+            )
+            results = []
+            for name in ("first", "second"):
+                feed_file.write_text(f"Test|Sub|https://example.com/{name}\n", encoding="utf-8")
+                patchers = [
+                    mock.patch.object(pull_news, "fetch_bytes", side_effect=lambda url: url.encode("utf-8")),
+                    mock.patch.object(
+                        pull_news, "parse_feed", side_effect=lambda xml: feeds[xml.decode("utf-8").rsplit("/", 1)[-1]]
+                    ),
+                    mock.patch.object(pull_news, "extract_body_html", side_effect=fake_extract),
+                    mock.patch.object(pull_news, "find_cover_from_item", return_value=""),
+                ]
+                with contextlib.ExitStack() as stack:
+                    for patcher in patchers:
+                        stack.enter_context(patcher)
+                    results.append(pull_news.run_pull_news(config))
+
+        self.assertEqual([result.added_count for result in results], [1, 0])
+        # The AMP copy is fetched once and discarded; in the second run the
+        # canonical URL and the redirect target are skipped without a fetch.
+        self.assertEqual(extracted, ["https://redirect.example/r/1", "https://news.example/amp/world/story"])
+        self.assertEqual([result.canonical_duplicates for result in results], [1, 2])
+
+
+class RunReportIntegrationTests(unittest.TestCase):
+    def test_report_covers_stages_feeds_and_skips(self):
+        items = [
+            {"title": "Broken", "link": "https://broken.example/story", "summary": "", "element": None},
+            {"title": "Fine", "link": "https://example.com/story", "summary": "", "element": None},
+            {"title": "Clip", "link": "https://example.com/video/clip", "summary": "", "element": None},
+        ]
+
+        def fake_extract(link, meta=None):
+            if meta is not None:
+                meta["bytes"] = 1000
+                meta["timings"] = {"article_fetch": (0.5, 0.01), "extraction": (0.1, 0.1)}
+            if "broken" in link:
+                return ("<p>This content is not available</p>", "")
+            return ("<p>Body</p>", "")
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmp_path = pathlib.Path(tmpdir)
+            feed_file = tmp_path / "feeds.txt"
+            feed_file.write_text("Test|Sub|https://example.com/feed\n", encoding="utf-8")
+            config = pull_news.PullNewsConfig(
+                feeds=feed_file,
+                data_dir=tmp_path,
+                posts_json=tmp_path / "posts.json",
+                seen_db=tmp_path / "seen.json",
+                prefilter=True,
+                run_report=True,
+            )
+            patchers = [
+                mock.patch.object(pull_news, "fetch_bytes", return_value=b"<xml>"),
+                mock.patch.object(pull_news, "parse_feed", return_value=items),
+                mock.patch.object(pull_news, "extract_body_html", side_effect=fake_extract),
+                mock.patch.object(pull_news, "find_cover_from_item", return_value=""),
+            ]
+            with contextlib.ExitStack() as stack:
+                for patcher in patchers:
+                    stack.enter_context(patcher)
+                first = pull_news.run_pull_news(config)
+                second = pull_news.run_pull_news(config)
+
+            written = json.loads((tmp_path / "reports" / "all.json").read_text(encoding="utf-8"))
+            metrics = (tmp_path / "metrics" / "all.jsonl").read_text(encoding="utf-8").splitlines()
+
+        report = first.report.to_dict()
+        self.assertEqual(written["skips"], second.report.to_dict()["skips"])
+        self.assertEqual(
+            set(report["stages"]),
+            {"feed_fetch", "parse", "article_fetch", "extraction", "sanitize", "cover", "write"},
+        )
+        self.assertEqual(report["stages"]["article_fetch"], {"wall": 1.0, "cpu": 0.02, "calls": 2})
+        self.assertEqual(report["bytes_downloaded"]["feeds"], 5)
+        self.assertEqual(report["bytes_downloaded"]["articles"], 2000)
+        feed = report["feeds"]["https://example.com/feed"]
+        self.assertEqual(feed["bytes"], 2005)
+        self.assertEqual(feed["stages"]["extraction"]["calls"], 2)
+        self.assertEqual(report["hosts"]["broken.example"]["bytes"], 1000)
+        self.assertEqual(report["caches"]["seen"], {"hits": 0, "misses": 3})
+        self.assertEqual(report["skips"]["unavailable"], 1)
+        self.assertEqual(sum(v for k, v in report["skips"].items() if k.startswith("prefilter:")), 1)
+        self.assertIsNotNone(report["peak_memory_bytes"])
+        self.assertEqual(written["caches"]["seen"], {"hits": 1, "misses": 2})
+        self.assertEqual(len(metrics), 2)
+        sample = json.loads(metrics[0])["feeds"]["https://example.com/feed"]
+        self.assertEqual(
+            {key: sample[key] for key in ("items", "new", "fetched", "added", "errors", "bytes")},
+            {"items": 3, "new": 3, "fetched": 2, "added": 1, "errors": 1, "bytes": 2005},
+        )
+
+
+class StreamingModeTests(unittest.TestCase):
+    def _run(self, tmp_path, streaming):
+        feed_file = tmp_path / "feeds.txt"
+        feed_file.write_text("Lifestyle|Sub|https://example.com/feed\n", encoding="utf-8")
+        existing = [
+            {
+                "slug": f"old-{idx}",
+                "title": f"Old {idx}",
+                "category": "Crypto" if idx % 2 else "Lifestyle",
+                "date": f"2024-{12 - idx:02d}-01",
+                "body": "<p>Old</p>",
+            }
+            for idx in range(6)
+        ]
+        (tmp_path / "posts.json").write_text(json.dumps(existing), encoding="utf-8")
+        items = [
+            {"title": f"Item {idx}", "link": f"https://example.com/item-{idx}", "summary": "", "element": None}
+            for idx in range(2)
+        ]
+        config = pull_news.PullNewsConfig(
+            feeds=feed_file,
+            data_dir=tmp_path,
+            posts_json=tmp_path / "posts.json",
+            seen_db=tmp_path / "seen.json",
+            max_per_category=5,
+            max_posts_persist=5,
+            archive_cold_after_months=0,
+            streaming=streaming,
+        )
+        patchers = [
+            mock.patch.object(pull_news, "fetch_bytes", return_value=b"<xml>"),
+            mock.patch.object(pull_news, "parse_feed", return_value=items),
+            mock.patch.object(pull_news, "extract_body_html", return_value=("<p>Body</p>", "")),
+            mock.patch.object(pull_news, "find_cover_from_item", return_value=""),
+        ]
+        with contextlib.ExitStack() as stack:
+            for patcher in patchers:
+                stack.enter_context(patcher)
+            result = pull_news.run_pull_news(config)
+
+        outputs = {}
+        for path in sorted(tmp_path.rglob("*.json")):
+            payload = json.loads(path.read_text(encoding="utf-8"))
+            if isinstance(payload, dict):
+                payload.pop("generated_at", None)
+                for month in payload.get("months", []):
+                    month.pop("archived_at", None)
+            elif path.parent.name == "archive" or "archive" in path.parts:
+                for entry in payload:
+                    entry.pop("archived_at", None)
+            outputs[str(path.relative_to(tmp_path))] = payload
+        return result, outputs
+
+    def test_streaming_output_matches_in_memory_run(self):
+        with tempfile.TemporaryDirectory() as mem_dir, tempfile.TemporaryDirectory() as stream_dir:
+            mem_result, mem_outputs = self._run(pathlib.Path(mem_dir), streaming=False)
+            stream_result, stream_outputs = self._run(pathlib.Path(stream_dir), streaming=True)
+
+        self.assertEqual(mem_result.added_count, 2)
+        self.assertEqual(stream_result.added_count, 2)
+        self.assertEqual(stream_result.posts_index, [])
+        self.assertEqual(len(mem_outputs["posts.json"]), 5)
+        self.assertIn("archive/2024-08.json", mem_outputs)
+        self.assertEqual(mem_outputs, stream_outputs)
+
+    def test_failed_write_leaves_existing_partitions_untouched(self):
+        def entries():
+            for idx in range(3):
+                yield {"slug": f"new-{idx}", "title": f"New {idx}", "category": "Lifestyle", "date": f"2025-0{idx + 1}-01"}
+            raise json.JSONDecodeError("bad", "", 0)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmp_path = pathlib.Path(tmpdir)
+            pull_news._persist_posts(
+                iter([{"slug": "kept", "title": "Kept", "category": "Lifestyle", "date": "2025-02-01"}]),
+                posts_json_path=tmp_path / "posts.json",
+                data_dir=tmp_path,
+                max_posts_persist=0,
+                archive_cold_after_months=0,
+                keep_index=False,
+            )
+            before = {str(path): path.read_text(encoding="utf-8") for path in (tmp_path / "posts").rglob("*.json")}
+
+            with self.assertRaises(json.JSONDecodeError):
+                pull_news._persist_posts(
+                    entries(),
+                    posts_json_path=tmp_path / "posts.json",
+                    data_dir=tmp_path,
+                    max_posts_persist=0,
+                    archive_cold_after_months=0,
+                    keep_index=False,
+                )
+            after = {str(path): path.read_text(encoding="utf-8") for path in (tmp_path / "posts").rglob("*.json")}
+            leftovers = list(tmp_path.glob("posts.partial"))
+
+        self.assertEqual(after, before)
+        self.assertEqual(leftovers, [])
+
+    def test_near_duplicates_are_checked_against_streamed_posts(self):
+        story = "Earthquake of magnitude 6.1 strikes off the coast of northern Japan"
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmp_path = pathlib.Path(tmpdir)
+            feed_file = tmp_path / "feeds.txt"
+            feed_file.write_text("Test|Sub|https://example.com/feed\n", encoding="utf-8")
+            published = [{"slug": "quake", "title": story, "category": "Test", "date": pull_news.today_iso(),
+                          "source": "https://wire.example/quake"}]
+            (tmp_path / "posts.json").write_text(json.dumps(published), encoding="utf-8")
+            config = pull_news.PullNewsConfig(
+                feeds=feed_file,
+                data_dir=tmp_path,
+                posts_json=tmp_path / "posts.json",
+                seen_db=tmp_path / "seen.json",
+                near_dup=True,
+                streaming=True,
+            )
+            items = [{"title": f"{story} - Local", "link": "https://local.example/quake", "summary": "", "element": None}]
+            extract = mock.Mock(return_value=("<p>Body</p>", ""))
+            patchers = [
+                mock.patch.object(pull_news, "fetch_bytes", return_value=b"<xml>"),
+                mock.patch.object(pull_news, "parse_feed", return_value=items),
+                mock.patch.object(pull_news, "extract_body_html", extract),
+                mock.patch.object(pull_news, "find_cover_from_item", return_value=""),
+            ]
+            with contextlib.ExitStack() as stack:
+                for patcher in patchers:
+                    stack.enter_context(patcher)
+                result = pull_news.run_pull_news(config)
+
+        self.assertEqual(result.added_count, 0)
+        self.assertEqual(result.near_duplicates, 1)
+        extract.assert_not_called()
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,87 @@
+import json
+import pathlib
+import tempfile
+import unittest
+
+from autopost import run_metrics
+from autopost.run_report import RunReport
+
+FEED = "https://example.com/rss"
+
+
+def _run(at, **sample):
+    values = {"latency": 0.2, "wall": 1.0, "bytes": 100, "items": 10, "new": 1, "fetched": 1, "added": 1, "errors": 0}
+    values.update(sample)
+    return {"at": f"2025-09-{at:02d}T00:00:00+00:00", "run": "news", "duration": 5.0, "added": 1, "feeds": {FEED: values}}
+
+
+class FindRegressionsTests(unittest.TestCase):
+    def test_steady_feed_is_not_flagged(self):
+        runs = [_run(day) for day in range(1, 15)]
+
+        self.assertEqual(run_metrics.find_regressions(runs), [])
+
+    def test_slower_feed_is_flagged(self):
+        runs = [_run(day) for day in range(1, 11)] + [_run(day, latency=1.5) for day in range(11, 14)]
+
+        flags = run_metrics.find_regressions(runs)
+
+        self.assertEqual([(flag.feed, flag.kind) for flag in flags], [(FEED, "latency")])
+
+    def test_small_absolute_slowdown_is_ignored(self):
+        runs = [_run(day, latency=0.05) for day in range(1, 11)] + [_run(day, latency=0.2) for day in range(11, 14)]
+
+        self.assertEqual(run_metrics.find_regressions(runs), [])
+
+    def test_failing_feed_is_flagged(self):
+        runs = [_run(day) for day in range(1, 11)] + [_run(day, errors=1, fetched=0) for day in range(11, 14)]
+
+        flags = run_metrics.find_regressions(runs)
+
+        self.assertEqual([flag.kind for flag in flags], ["errors"])
+
+    def test_feed_without_new_items_is_stale(self):
+        runs = [_run(day) for day in range(1, 6)] + [_run(day, new=0, added=0) for day in range(6, 10)]
+
+        self.assertEqual(run_metrics.find_regressions(runs, stale_runs=5), [])
+        flags = run_metrics.find_regressions(runs, stale_runs=4)
+        self.assertEqual([flag.kind for flag in flags], ["stale"])
+
+
+class MetricsStoreTests(unittest.TestCase):
+    def test_append_keeps_the_last_runs_in_order(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = pathlib.Path(tmpdir) / "metrics" / "news.jsonl"
+            for day in (3, 1, 2, 4):
+                run_metrics.append_run(path, _run(day), keep=3)
+            with path.open("a", encoding="utf-8") as handle:
+                handle.write('{"torn')
+
+            lines = path.read_text(encoding="utf-8").splitlines()
+            runs = run_metrics.load_runs([path, pathlib.Path(tmpdir) / "missing.jsonl"])
+
+        self.assertEqual(len(lines), 4)
+        self.assertEqual([run["at"][8:10] for run in runs], ["01", "02", "04"])
+
+    def test_run_record_summarizes_the_report(self):
+        report = RunReport()
+        report.record("feed_fetch", 0.4, 0.01, feed=FEED)
+        report.record("article_fetch", 1.0, 0.1, feed=FEED)
+        report.add_bytes("feeds", 500, feed=FEED)
+        for name, count in (("items", 12), ("new", 3), ("fetched", 3), ("added", 2), ("failed", 1)):
+            report.count(name, FEED, count)
+        report.count("feed_errors", "https://broken.example/rss")
+
+        record = run_metrics.run_record(report, "news", 2)
+
+        self.assertEqual(record["run"], "news")
+        self.assertEqual(
+            record["feeds"][FEED],
+            {"latency": 0.4, "wall": 1.4, "bytes": 500, "items": 12, "new": 3, "fetched": 3, "added": 2, "errors": 1},
+        )
+        self.assertEqual(record["feeds"]["https://broken.example/rss"]["errors"], 1)
+        json.dumps(record)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import json
+import pathlib
+import tempfile
+import unittest
+
+from autopost.run_report import RunReport, timed
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class RunReportTests(unittest.TestCase):
+    def test_stages_are_attributed_to_feed_and_host(self):
+        wall, cpu = FakeClock(), FakeClock()
+        report = RunReport(clock=wall, cpu_clock=cpu)
+        report.start()
+        with report.stage("feed_fetch", feed="https://a.example/rss", host="a.example"):
+            wall.now += 2.0
+            cpu.now += 0.5
+        report.record("extraction", 1.0, 1.0, feed="https://a.example/rss", host="b.example")
+        report.record("extraction", 0.5, 0.5)
+        wall.now += 1.0
+        report.finish()
+
+        data = report.to_dict()
+
+        self.assertEqual(data["wall_seconds"], 3.0)
+        self.assertEqual(data["cpu_seconds"], 0.5)
+        self.assertEqual(data["stages"]["extraction"], {"wall": 1.5, "cpu": 1.5, "calls": 2})
+        feed = data["feeds"]["https://a.example/rss"]
+        self.assertEqual((feed["wall"], feed["calls"]), (3.0, 2))
+        self.assertEqual(feed["stages"]["feed_fetch"], {"wall": 2.0, "cpu": 0.5, "calls": 1})
+        self.assertEqual(data["hosts"]["b.example"], {"wall": 1.0, "cpu": 1.0, "calls": 1, "bytes": 0})
+        self.assertIsNone(data["peak_memory_bytes"])
+
+    def test_bytes_caches_and_skips_are_counted(self):
+        report = RunReport()
+        report.add_bytes("articles", 100, feed="https://a.example/rss", host="a.example")
+        report.add_bytes("images", 30)
+        self.assertTrue(report.cache("seen", True))
+        self.assertFalse(report.cache("seen", False))
+        report.cache("seen", True)
+        report.skip("seen")
+        report.skip("near_duplicate", 0)
+
+        data = report.to_dict()
+
+        self.assertEqual(data["bytes_downloaded"], {"articles": 100, "images": 30})
+        self.assertEqual(data["feeds"]["https://a.example/rss"]["bytes"], 100)
+        self.assertEqual(data["caches"], {"seen": {"hits": 2, "misses": 1}})
+        self.assertEqual(data["skips"], {"seen": 1})
+
+    def test_trace_memory_records_peak_and_write_is_json(self):
+        report = RunReport(trace_memory=True)
+        report.start()
+        blob = [bytes(1024) for _ in range(64)]
+        report.finish()
+        del blob
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = pathlib.Path(tmpdir) / "reports" / "run.json"
+            report.write(path)
+            data = json.loads(path.read_text(encoding="utf-8"))
+
+        self.assertGreater(data["peak_memory_bytes"], 64 * 1024)
+
+    def test_timed_without_report_is_a_no_op(self):
+        with timed(None, "parse"):
+            value = 1
+        self.assertEqual(value, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
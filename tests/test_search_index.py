@@ -0,0 +1,166 @@
+import contextlib
+import json
+import pathlib
+import tempfile
+import unittest
+from unittest import mock
+
+from autopost import pull_news, search_index
+
+
+def _post(index, title, body=""):
+    return {
+        "slug": f"story-{index}",
+        "title": title,
+        "category": "News",
+        "subcategory": "World",
+        "category_slug": "news/world",
+        "date": f"2025-09-{index + 1:02d}",
+        "excerpt": f"Excerpt {index}",
+        "cover": f"https://img.example.com/{index}.jpg",
+        "source": f"https://example.com/story/{index}",
+        "body": f"<p>{body}</p>",
+    }
+
+
+def _keyed(posts):
+    return [(post["source"], post) for post in posts]
+
+
+def _lookup(root, term):
+    """Resolve ``term`` as a word prefix the way js/search.js does."""
+
+    manifest = json.loads((root / "manifest.json").read_text(encoding="utf-8"))
+    ids = set()
+    for key in manifest["shards"]:
+        if not (key.startswith(term) or term.startswith(key)):
+            continue
+        shard = json.loads((root / "terms" / f"{search_index.shard_file(key)}.json").read_text(encoding="utf-8"))
+        for indexed, postings in shard.items():
+            if indexed.startswith(term):
+                ids.update(postings)
+    return ids
+
+
+class TokenizeTests(unittest.TestCase):
+    def test_terms_are_folded_and_split_at_punctuation(self):
+        self.assertEqual(
+            search_index.tokenize("Crème brûlée — Trump’s “AI” plan, U.S. 2024"),
+            ["creme", "brulee", "trump", "ai", "plan", "2024"],
+        )
+
+    def test_shard_file_names_are_ascii(self):
+        self.assertEqual(search_index.shard_file("th"), "th")
+        self.assertEqual(search_index.shard_file("éc"), "x-c3a963")
+
+
+class SearchIndexTests(unittest.TestCase):
+    def test_build_then_incremental_add_and_drop(self):
+        posts = [_post(2, "Markets rally"), _post(1, "Election results", "turnout"), _post(0, "Market crash")]
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = pathlib.Path(tmpdir) / "search"
+            first = search_index.update_search_index(root, _keyed(posts))
+            ids = json.loads((root / "ids.json").read_text(encoding="utf-8"))["ids"]
+            market = _lookup(root, "market")
+
+            unchanged = search_index.update_search_index(root, _keyed(posts))
+
+            posts = [_post(3, "Turnout record")] + posts[:2]
+            second = search_index.update_search_index(root, _keyed(posts))
+            turnout = _lookup(root, "turnout")
+            market_after = _lookup(root, "market")
+            docs = json.loads((root / "docs" / "0.json").read_text(encoding="utf-8"))
+
+        # Oldest first, so the newest story has the highest id.
+        self.assertEqual([ids[f"https://example.com/story/{i}"] for i in range(3)], [0, 1, 2])
+        self.assertEqual(first["added"], 3)
+        self.assertEqual(market, {0, 2})
+        self.assertEqual(unchanged["written"], 0)
+        self.assertEqual((second["added"], second["removed"], second["docs"]), (1, 1, 3))
+        self.assertEqual(turnout, {1, 3})
+        self.assertEqual(market_after, {2})
+        self.assertEqual(sorted(docs), ["1", "2", "3"])
+        self.assertEqual(docs["3"]["slug"], "story-3")
+        self.assertNotIn("body", docs["3"])
+
+    def test_large_shards_are_split_without_losing_terms(self):
+        words = ["the", "then", "there", "theory", "thin", "think", "thorn", "th"]
+        posts = [_post(i, f"{words[i % len(words)]} story", " ".join(words)) for i in range(40)]
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = pathlib.Path(tmpdir) / "search"
+            search_index.update_search_index(root, _keyed(posts), shard_bytes=200)
+            manifest = json.loads((root / "manifest.json").read_text(encoding="utf-8"))
+            results = {term: _lookup(root, term) for term in ("th", "the", "ther", "thin", "thorn")}
+
+        self.assertIn("the", manifest["shards"])
+        for term, ids in results.items():
+            self.assertEqual(ids, set(range(40)), term)
+
+    def test_archive_mode_keeps_trimmed_posts_until_dropped(self):
+        archived = [_post(0, "Old volcano eruption")]
+        live = [_post(1, "New volcano warning")]
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = pathlib.Path(tmpdir) / "search"
+            search_index.update_search_index(root, _keyed(live), archived=_keyed(archived))
+            both = _lookup(root, "volcano")
+
+            search_index.update_search_index(root, [], archived=iter(()))
+            trimmed = _lookup(root, "volcano")
+
+            search_index.update_search_index(root, [], archived=iter(()), dropped=[live[0]["source"]])
+            dropped = _lookup(root, "volcano")
+
+        self.assertEqual(both, {0, 1})
+        self.assertEqual(trimmed, {0, 1})
+        self.assertEqual(dropped, {0})
+
+    def test_unreadable_state_rebuilds_from_scratch(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = pathlib.Path(tmpdir) / "search"
+            search_index.update_search_index(root, _keyed([_post(0, "Alpha"), _post(1, "Beta")]))
+            (root / "ids.json").write_text("{", encoding="utf-8")
+
+            stats = search_index.update_search_index(root, _keyed([_post(2, "Gamma")]))
+            docs = json.loads((root / "docs" / "0.json").read_text(encoding="utf-8"))
+
+        self.assertEqual((stats["added"], stats["docs"]), (1, 1))
+        self.assertEqual(list(docs), ["0"])
+
+
+class PipelineIndexTests(unittest.TestCase):
+    def test_run_updates_the_index(self):
+        items = [
+            {"title": "Glacier melt accelerates", "link": "https://example.com/glacier", "summary": "", "element": None},
+        ]
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmp_path = pathlib.Path(tmpdir)
+            feed_file = tmp_path / "feeds.txt"
+            feed_file.write_text("Test|Sub|https://example.com/feed\n", encoding="utf-8")
+            config = pull_news.PullNewsConfig(
+                feeds=feed_file,
+                data_dir=tmp_path,
+                posts_json=tmp_path / "posts.json",
+                seen_db=tmp_path / "seen.json",
+                search_index=True,
+            )
+            patchers = [
+                mock.patch.object(pull_news, "fetch_bytes", return_value=b"<xml>"),
+                mock.patch.object(pull_news, "parse_feed", return_value=items),
+                mock.patch.object(pull_news, "extract_body_html", return_value=("<p>Ice sheets thin.</p>", "")),
+                mock.patch.object(pull_news, "find_cover_from_item", return_value=""),
+            ]
+            with contextlib.ExitStack() as stack:
+                for patcher in patchers:
+                    stack.enter_context(patcher)
+                pull_news.run_pull_news(config)
+
+            root = tmp_path / "search"
+            manifest = json.loads((root / "manifest.json").read_text(encoding="utf-8"))
+            hits = _lookup(root, "glac") & _lookup(root, "ice")
+
+        self.assertEqual(manifest["docs"], 1)
+        self.assertEqual(hits, {0})
+
+
+if __name__ == "__main__":
+    unittest.main()
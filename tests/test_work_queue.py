@@ -0,0 +1,132 @@
+import contextlib
+import json
+import pathlib
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+from unittest import mock
+
+from autopost import pull_news, work_queue
+
+
+def _items(feed_url, count=3):
+    items = []
+    for idx in range(count):
+        element = ET.fromstring(
+            f'<item xmlns:dc="http://purl.org/dc/elements/1.1/"><pubDate>2024-05-1{idx}</pubDate>'
+            f"<dc:creator>Writer {idx}</dc:creator></item>"
+        )
+        items.append(
+            {"title": f"{feed_url} {idx}", "link": f"{feed_url}/post-{idx}", "summary": "", "element": element}
+        )
+    return items
+
+
+class WorkQueueTests(unittest.TestCase):
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.tmp_path = pathlib.Path(self._tmpdir.name)
+        feeds = self.tmp_path / "feeds.txt"
+        feeds.write_text(
+            "News|World|https://example.com/a\nNews|World|https://example.com/b\n",
+            encoding="utf-8",
+        )
+        self.config = pull_news.PullNewsConfig(
+            data_dir=self.tmp_path,
+            posts_json=self.tmp_path / "posts.json",
+            seen_db=self.tmp_path / "seen.json",
+            feeds=feeds,
+            category="News",
+            max_per_category=3,
+            max_per_feed=2,
+            max_total=0,
+        )
+        self.queue = work_queue.WorkQueue(self.tmp_path / "queue.sqlite3")
+        self._stack = contextlib.ExitStack()
+        for patcher in (
+            mock.patch.object(pull_news, "fetch_bytes", side_effect=lambda url: url.encode("utf-8")),
+            mock.patch.object(pull_news, "parse_feed", side_effect=lambda xml: _items(xml.decode("utf-8"))),
+            mock.patch.object(pull_news, "extract_body_html", return_value=("<p>Body</p>", "")),
+            mock.patch.object(pull_news, "find_cover_from_item", return_value=""),
+        ):
+            self._stack.enter_context(patcher)
+
+    def tearDown(self):
+        self._stack.close()
+        self.queue.close()
+        self._tmpdir.cleanup()
+
+    def test_plan_applies_limits_and_is_idempotent(self):
+        self.assertEqual(work_queue.plan(self.queue, self.config), 3)
+        self.assertEqual(work_queue.plan(self.queue, self.config), 0)
+        self.assertEqual(self.queue.counts(), {"queued": 3})
+
+    def test_expired_lease_is_requeued_and_late_result_discarded(self):
+        work_queue.plan(self.queue, self.config)
+        stale = self.queue.lease("slow-worker", lease_seconds=-1)
+        self.assertEqual(stale.item["link"], "https://example.com/a/post-0")
+
+        processed = work_queue.work(self.queue, "fast-worker", config=self.config)
+        self.assertEqual(processed, 3)
+        self.assertFalse(self.queue.complete(stale, "slow-worker", {"title": "late"}))
+        self.assertEqual(self.queue.counts(), {"done": 3})
+
+        result = work_queue.finalize(self.queue, self.config)
+        self.assertEqual(
+            [entry["source"] for entry in result.new_entries],
+            [
+                "https://example.com/a/post-0",
+                "https://example.com/a/post-1",
+                "https://example.com/b/post-0",
+            ],
+        )
+        self.assertEqual(result.new_entries[0]["author"], "Writer 0")
+        seen = json.loads((self.tmp_path / "seen.json").read_text(encoding="utf-8"))
+        self.assertEqual(len(seen), 3)
+        # Published units are dropped; their links are in the seen DB.
+        self.assertEqual(self.queue.counts(), {})
+
+    def test_failing_unit_is_retried_then_marked_failed(self):
+        work_queue.plan(self.queue, self.config)
+        with mock.patch.object(pull_news, "build_entry", side_effect=RuntimeError("boom")):
+            work_queue.work(self.queue, "worker", config=self.config)
+        self.assertEqual(self.queue.counts(), {"failed": 3})
+
+    def test_skipped_units_are_requeued_then_backed_off_after_finalize(self):
+        work_queue.plan(self.queue, self.config)
+        with mock.patch.object(pull_news, "extract_body_html", return_value=("", "")):
+            work_queue.work(self.queue, "worker", config=self.config)
+        self.assertEqual(self.queue.counts(), {"skipped": 3})
+
+        # A unit that ended skipped is planned again, unlike one still queued.
+        self.assertEqual(work_queue.plan(self.queue, self.config), 3)
+        self.assertEqual(self.queue.counts(), {"queued": 3})
+        with mock.patch.object(pull_news, "extract_body_html", return_value=("", "")):
+            work_queue.work(self.queue, "worker", config=self.config)
+
+        result = work_queue.finalize(self.queue, self.config)
+        negative = json.loads((self.tmp_path / "negative_cache" / "news.json").read_text(encoding="utf-8"))
+
+        self.assertEqual(result.added_count, 0)
+        self.assertEqual(self.queue.counts(), {})
+        self.assertEqual(sorted(record["reason"] for record in negative.values()), ["extract"] * 3)
+        # Backed off like a scheduled run: the next plan takes other items.
+        planned = work_queue.plan(self.queue, self.config)
+        links = {self.queue.lease("worker").item["link"] for _ in range(planned)}
+        self.assertEqual(
+            links,
+            {"https://example.com/a/post-2", "https://example.com/b/post-1", "https://example.com/b/post-2"},
+        )
+
+    def test_unit_that_keeps_losing_its_lease_is_marked_failed(self):
+        work_queue.plan(self.queue, self.config)
+        leased = [self.queue.lease("dying-worker", lease_seconds=-1) for _ in range(work_queue.MAX_ATTEMPTS)]
+        self.assertEqual({unit.link_hash for unit in leased}, {leased[0].link_hash})
+        self.assertEqual(leased[-1].attempts, work_queue.MAX_ATTEMPTS)
+
+        self.assertEqual(self.queue.requeue_expired(), 0)
+        self.assertEqual(self.queue.counts(), {"failed": 1, "queued": 2})
+
+
+if __name__ == "__main__":
+    unittest.main()